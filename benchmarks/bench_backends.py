@@ -0,0 +1,58 @@
+"""
+Latency and memory of the inference backends of the NER models.
+
+Reports the p50 and p99 latencies of `redact` on short messages, the documents per second of `redact_batch` and
+the size of the loaded models for each backend. The ONNX backends need `pip install hexanonyme[onnx]`, the
+graphs are exported on the first run.
+
+Usage:
+    python -m benchmarks.bench_backends --requests 200
+    python -m benchmarks.bench_backends --backends torch onnx-int8 --torch-threads 4
+"""
+import argparse
+import time
+
+from hexanonyme import ModelRegistry, RedactAnonymizer
+from benchmarks.bench_batch import SAMPLE_DOCS, make_corpus
+from benchmarks.bench_concurrency import percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--requests", type=int, default=200, help="Number of redacted messages per backend.")
+    parser.add_argument("--docs", type=int, default=256, help="Number of documents of the batch run.")
+    parser.add_argument("--torch-threads", type=int, default=None, help="Intra-op threads of torch.")
+    args = parser.parse_args()
+
+    if args.torch_threads is not None:
+        import torch
+        torch.set_num_threads(args.torch_threads)
+
+    corpus = make_corpus(args.docs)
+    print(f"{'backend':<10} {'load (s)':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'docs/s':>8} {'size (MB)':>10}")
+    for backend in args.backends:
+        # A registry per backend, so that the footprint only counts its models
+        registry = ModelRegistry()
+        start = time.perf_counter()
+        # The models are loaded on first use, `warmup` loads them inside the timed section
+        anonymizer = RedactAnonymizer(registry=registry, backend=backend).warmup()
+        load_time = time.perf_counter() - start
+
+        latencies = []
+        for i in range(10 + args.requests):
+            start = time.perf_counter()
+            anonymizer.redact(SAMPLE_DOCS[i % len(SAMPLE_DOCS)])
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies = latencies[10:]  # Warm up
+
+        start = time.perf_counter()
+        anonymizer.redact_batch(corpus, batch_size=32)
+        rate = len(corpus) / (time.perf_counter() - start)
+
+        print(f"{backend:<10} {load_time:8.1f} {percentile(latencies, 50):9.1f} {percentile(latencies, 99):9.1f} "
+              f"{rate:8.1f} {registry.memory_footprint() / 2 ** 20:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of the batched API.
+
+Measures documents per second of `ReplaceAnonymizer.replace_batch` and `RedactAnonymizer.redact_batch`
+for several batch sizes, and of the single text methods called in a loop as a reference.
+
+Usage:
+    python -m benchmarks.bench_batch --docs 512 --batch-sizes 1 8 32 128
+"""
+import argparse
+import time
+
+from hexanonyme import RedactAnonymizer, ReplaceAnonymizer
+
+SAMPLE_DOCS = [
+    "Bonjour, je m'appelle Jean Dupont.",
+    "Merci de rappeler Mme Martin au 06 12 34 56 78.",
+    "Votre colis sera livré le 12/03/2024 au 5 rue de la Paix, 75002 Paris.",
+    "Ok, merci.",
+    "Pouvez-vous écrire à claire.durand@example.fr avant vendredi ?",
+    "Le contrat entre la société Renault et M. Pierre Lefèvre a été signé à Lyon le 3 janvier 2023.",
+]
+
+
+def make_corpus(n_docs):
+    return [SAMPLE_DOCS[i % len(SAMPLE_DOCS)] for i in range(n_docs)]
+
+
+def docs_per_second(function, corpus):
+    start = time.perf_counter()
+    function(corpus)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=512, help="Number of documents in the corpus.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs)
+    anonymizers = {
+        "replace": ReplaceAnonymizer(faker=False),
+        "redact": RedactAnonymizer(),
+    }
+
+    for name, anonymizer in anonymizers.items():
+        single = anonymizer.replace if name == "replace" else anonymizer.redact
+        batch = anonymizer.replace_batch if name == "replace" else anonymizer.redact_batch
+
+        # Warm up the pipelines so the first measure does not include lazy initialisations
+        batch(corpus[:8], batch_size=8)
+
+        rate = docs_per_second(lambda docs: [single(doc) for doc in docs], corpus)
+        print(f"{name:<8} loop          {rate:10.1f} docs/s")
+        for batch_size in args.batch_sizes:
+            rate = docs_per_second(lambda docs: batch(docs, batch_size=batch_size), corpus)
+            print(f"{name:<8} batch_size={batch_size:<4}{rate:10.1f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Throughput of `replace` on repetitive traffic, without cache and with a cache of whole texts or of sentences.
+
+Each message is a templated notification followed by a signature shared by every message, so whole texts repeat
+every few messages while most sentences repeat every time.
+
+Usage:
+    python -m benchmarks.bench_cache --docs 500
+    python -m benchmarks.bench_cache --docs 500 --sqlite /tmp/entities.db
+"""
+import argparse
+import time
+
+from hexanonyme import MemoryCache, ReplaceAnonymizer, SqliteCache
+from benchmarks.bench_batch import SAMPLE_DOCS
+
+SIGNATURE = "Cordialement, le service client. Ce message est confidentiel."
+
+
+def make_traffic(n_docs):
+    return [f"{SAMPLE_DOCS[i % len(SAMPLE_DOCS)]} Dossier numéro {i % 50}. {SIGNATURE}" for i in range(n_docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500, help="Number of messages.")
+    parser.add_argument("--sqlite", default=None, help="Path of a SQLite cache used instead of the in-memory one.")
+    args = parser.parse_args()
+
+    traffic = make_traffic(args.docs)
+    print(f"{'cache':<10} {'docs/s':>10} {'hit rate':>9}")
+    for name, cache, cache_sentences in [("none", None, False), ("texts", True, False), ("sentences", True, True)]:
+        if cache:
+            cache = SqliteCache(args.sqlite) if args.sqlite else MemoryCache()
+            cache.clear()
+        # Loads the models before the timed loop, without going through the cache
+        anonymizer = ReplaceAnonymizer(faker=False, cache=cache, cache_sentences=cache_sentences).warmup()
+
+        start = time.perf_counter()
+        for text in traffic:
+            anonymizer.replace(text)
+        rate = len(traffic) / (time.perf_counter() - start)
+        hit_rate = cache.stats()["hit_rate"] if cache else 0.0
+        print(f"{name:<10} {rate:10.1f} {hit_rate:9.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Single document latency with the NER models run one after the other or at the same time.
+
+Reports the p50 and p99 latencies of `replace` on short chat messages, with `concurrent_models` off and on.
+
+Usage:
+    python -m benchmarks.bench_concurrency --requests 200
+"""
+import argparse
+import statistics
+import time
+
+from hexanonyme import ReplaceAnonymizer
+from benchmarks.bench_batch import SAMPLE_DOCS
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def measure(anonymizer, requests):
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        anonymizer.replace(SAMPLE_DOCS[i % len(SAMPLE_DOCS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Number of anonymized messages per mode.")
+    parser.add_argument("--torch-threads", type=int, default=None, help="Intra-op threads of torch.")
+    args = parser.parse_args()
+
+    if args.torch_threads is not None:
+        import torch
+        torch.set_num_threads(args.torch_threads)
+
+    print(f"{'mode':<11} {'mean (ms)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for concurrent_models in [False, True]:
+        anonymizer = ReplaceAnonymizer(faker=False, concurrent_models=concurrent_models)
+        measure(anonymizer, 10)  # Warm up
+        latencies = measure(anonymizer, args.requests)
+        mode = "concurrent" if concurrent_models else "sequential"
+        print(f"{mode:<11} {statistics.mean(latencies):10.1f} {percentile(latencies, 50):9.1f} "
+              f"{percentile(latencies, 99):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Cost of deanonymizing long documents.
+
+Compares the offset based single pass restoration (`restore_text`) with the former implementation, which called
+`text.replace(replacement, original, 1)` once per logged entity, and with the restoration of indexed placeholders
+moved around in the text (as in an LLM answer).
+
+Usage:
+    python -m benchmarks.bench_deanonymize --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+from hexanonyme.core.result import LogEntry, restore_text
+from hexanonyme.core.rewriter import rewrite_spans
+from benchmarks.bench_rewrite import make_document
+
+
+def anonymize(text, entities, placeholders):
+    spans = [(entity["start"], entity["end"], f"<PER_{i + 1}>" if placeholders else f"Nom{i:06d}")
+             for i, entity in enumerate(entities)]
+    anonymized_text, output_offsets = rewrite_spans(text, spans)
+    log = [LogEntry("PER", text[start:end], replacement, start, end, *offsets)
+           for (start, end, replacement), offsets in zip(spans, output_offsets)]
+    return anonymized_text, log
+
+
+def legacy_deanonymize(text, log):
+    for original, replacement in log:
+        text = text.replace(replacement, original, 1)
+    return text
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'entities':>9} {'legacy (ms)':>12} {'offsets (ms)':>13} {'moved (ms)':>11}")
+    for size in args.sizes:
+        text, entities = make_document(size)
+
+        anonymized_text, log = anonymize(text, entities, placeholders=False)
+        legacy, legacy_ms = timed(legacy_deanonymize, anonymized_text, log)
+        restored, offsets_ms = timed(restore_text, anonymized_text, log)
+        assert restored == legacy == text
+
+        anonymized_text, log = anonymize(text, entities, placeholders=True)
+        # The placeholders of the second half are moved to the beginning
+        middle = anonymized_text.index(log[len(log) // 2].replacement)
+        moved_text = anonymized_text[middle:] + anonymized_text[:middle]
+        restored, moved_ms = timed(restore_text, moved_text, log)
+        assert restored == text[log[len(log) // 2].start:] + text[:log[len(log) // 2].start]
+
+        print(f"{size:>9} {len(entities):>9} {legacy_ms:12.1f} {offsets_ms:13.1f} {moved_ms:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
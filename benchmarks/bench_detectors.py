@@ -0,0 +1,71 @@
+"""
+Speed of the regex detection of TEL and MAIL entities.
+
+Compares the single `finditer` scan of `PatternDetector` with the former implementation, which rebuilt the
+patterns on every call, ran `re.findall` once per label and looked up each match again with `text.index`.
+
+Usage:
+    python -m benchmarks.bench_detectors --size 10000000
+"""
+import argparse
+import random
+import re
+import time
+
+from hexanonyme.core.detectors import BUILTIN_PATTERNS, PatternDetector
+
+WORDS = ["merci", "de", "rappeler", "le", "client", "au", "sujet", "du", "dossier", "ou", "écrire", "à", "2024"]
+
+
+def make_text(size, seed=0):
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        part = " ".join(rng.choice(WORDS) for _ in range(12))
+        roll = rng.random()
+        if roll < 0.3:
+            part += f" 0{rng.randint(1, 9)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}"
+        elif roll < 0.5:
+            part += f" contact{rng.randint(0, 10**6)}@exemple.fr"
+        parts.append(part + ". ")
+        length += len(part) + 2
+    return "".join(parts)
+
+
+def legacy_find(text):
+    entities = []
+    for label in ["TEL", "MAIL"]:
+        for match in re.findall(f"({BUILTIN_PATTERNS[label]})", text):
+            entities.append({"entity_group": label, "score": 1, "word": match,
+                             "start": text.index(match), "end": text.index(match) + len(match)})
+    return entities
+
+
+def timeit(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000_000, help="Size of the text in characters.")
+    parser.add_argument("--legacy-size", type=int, default=1_000_000,
+                        help="Size of the prefix given to the legacy implementation, which is quadratic.")
+    args = parser.parse_args()
+
+    text = make_text(args.size)
+    detector = PatternDetector()
+
+    detector_time, entities = timeit(detector.find, text)
+    print(f"single scan   {len(text):>10} chars {len(entities):>8} entities {detector_time:8.3f} s"
+          f" {len(text) / detector_time / 1e6:8.1f} MB/s")
+
+    prefix = text[:args.legacy_size]
+    legacy_time, entities = timeit(legacy_find, prefix)
+    print(f"legacy        {len(prefix):>10} chars {len(entities):>8} entities {legacy_time:8.3f} s"
+          f" {len(prefix) / legacy_time / 1e6:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Scaling of the overlap resolution with the number of candidate spans.
+
+Compares `resolve_overlaps` (every strategy) with the former repeated pairwise scan on random spans
+spread over a document, as produced by three NER models plus the regexes on a long contract.
+
+Usage:
+    python -m benchmarks.bench_overlap --counts 10 100 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from hexanonyme.core.overlap import resolve_overlaps
+
+
+def make_spans(count, seed=0):
+    rng = random.Random(seed)
+    text_length = count * 20
+    spans = []
+    for _ in range(count):
+        start = rng.randrange(text_length)
+        spans.append({
+            "entity_group": rng.choice(["PER", "LOC", "ORG", "DATE"]),
+            "score": rng.random(),
+            "source": rng.choice(["model-a", "model-b", "model-c", "regex"]),
+            "start": start,
+            "end": start + rng.randint(1, 40),
+        })
+    return spans
+
+
+def legacy_resolve(list_of_dicts):
+    list_of_dicts = sorted(list_of_dicts, key=lambda x: x['start'])
+
+    def is_included(entity1, entity2):
+        return entity1['start'] >= entity2['start'] and entity1['end'] <= entity2['end']
+
+    changes_made = True
+    while changes_made:
+        changes_made = False
+        i = 0
+        while i < len(list_of_dicts):
+            current_entity = list_of_dicts[i]
+            for j in range(i + 1, len(list_of_dicts)):
+                if is_included(current_entity, list_of_dicts[j]):
+                    list_of_dicts.pop(i)
+                    changes_made = True
+                    break
+                elif is_included(list_of_dicts[j], current_entity):
+                    list_of_dicts.pop(j)
+                    changes_made = True
+                    break
+            else:
+                i += 1
+    return list_of_dicts
+
+
+def timeit(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=1_000,
+                        help="Do not run the legacy implementation with more spans.")
+    args = parser.parse_args()
+
+    print(f"{'spans':>8} {'legacy (s)':>11} {'longest (s)':>12} {'score (s)':>10} {'priority (s)':>13}")
+    for count in args.counts:
+        spans = make_spans(count)
+        if count <= args.skip_legacy_above:
+            legacy_time = f"{timeit(legacy_resolve, spans):11.4f}"
+        else:
+            legacy_time = f"{'-':>11}"
+        longest_time = timeit(resolve_overlaps, spans)
+        score_time = timeit(resolve_overlaps, spans, strategy="score")
+        priority_time = timeit(resolve_overlaps, spans, strategy="priority", priority=["regex", "model-a"])
+        print(f"{count:>8} {legacy_time} {longest_time:12.4f} {score_time:10.4f} {priority_time:13.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Scaling of `anonymize_corpus` with the number of worker processes.
+
+Each run starts a new pool, so the reported throughput includes the model loading of the workers unless
+the corpus is large enough to hide it.
+
+Usage:
+    python -m benchmarks.bench_parallel --docs 2000 --workers 1 2 4 8
+    python -m benchmarks.bench_parallel --entities TEL MAIL   # regex only, no model
+"""
+import argparse
+import os
+
+from hexanonyme.core.parallel import CorpusRunner
+from benchmarks.bench_batch import make_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="Number of documents in the corpus.")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Numbers of workers to compare (default: powers of two up to the number of CPUs).")
+    parser.add_argument("--mode", choices=["replace", "redact"], default="redact")
+    parser.add_argument("--entities", nargs="+", default=None)
+    parser.add_argument("--shard-size", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    workers_list = args.workers
+    if workers_list is None:
+        cpus = os.cpu_count() or 1
+        workers_list = [2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus]
+
+    corpus = make_corpus(args.docs)
+    anonymizer_kwargs = {"entities": args.entities} if args.entities else {}
+
+    baseline = None
+    print(f"{'workers':>7} {'docs/s':>10} {'speedup':>8} {'errors':>7}")
+    for workers in workers_list:
+        runner = CorpusRunner(mode=args.mode, workers=workers, shard_size=args.shard_size,
+                              batch_size=args.batch_size, **anonymizer_kwargs)
+        for _ in runner.run(corpus):
+            pass
+        rate = runner.stats.docs_per_second
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:10.1f} {rate / baseline:8.2f} {runner.stats.errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
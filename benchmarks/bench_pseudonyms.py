@@ -0,0 +1,60 @@
+"""
+Cost of the fake values per replaced entity.
+
+Measures `_replace_text` on a synthetic document whose entities (persons, cities, addresses, dates) are each
+mentioned several times, with a Faker call per occurrence (the former behaviour), with pooled Faker values, and with
+consistent pseudonyms (one fake value per distinct original value). Entity detection is not measured.
+
+Usage:
+    python -m benchmarks.bench_pseudonyms --entities 5000 --mentions 40
+"""
+import argparse
+import random
+import time
+
+from hexanonyme import ModelRegistry, ReplaceAnonymizer
+
+LABELS = ["PER", "LOC", "ADDRESS", "DATE"]
+
+
+def make_document(n_entities, mentions, seed=0):
+    rng = random.Random(seed)
+    values = [(rng.choice(LABELS), f"Valeur{i:06d}") for i in range(max(1, n_entities // mentions))]
+    parts, tokens, length = [], [], 0
+    for _ in range(n_entities):
+        label, value = rng.choice(values)
+        filler = "le dossier est en cours de traitement "
+        tokens.append({"entity_group": label, "word": value, "score": 1.0, "start": length + len(filler),
+                       "end": length + len(filler) + len(value)})
+        parts += [filler, value, ". "]
+        length += len(filler) + len(value) + 2
+    return "".join(parts), tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entities", type=int, default=5000, help="Number of entity occurrences.")
+    parser.add_argument("--mentions", type=int, default=40, help="Average number of mentions of each value.")
+    parser.add_argument("--pool-size", type=int, default=512)
+    args = parser.parse_args()
+
+    text, tokens = make_document(args.entities, args.mentions)
+    # No model is run: the detected entities are given directly
+    registry = ModelRegistry(loader=lambda model, task, device, **kwargs: None)
+
+    print(f"{'mode':<22} {'us/entity':>10} {'distinct fakes':>15}")
+    for name, kwargs in [("faker per occurrence", {}),
+                         ("pooled faker", {"faker_pool_size": args.pool_size}),
+                         ("pseudonyms", {"pseudonym_scope": "document"}),
+                         ("pooled pseudonyms", {"pseudonym_scope": "document", "faker_pool_size": args.pool_size})]:
+        anonymizer = ReplaceAnonymizer(LABELS, registry=registry, **kwargs)
+        if anonymizer.faker_pool is not None:
+            anonymizer.faker_pool.prefill()
+        start = time.perf_counter()
+        _, log = anonymizer._replace_text(text, tokens, anonymizer._pseudonym_map())
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {elapsed / len(tokens) * 1e6:10.1f} {len(set(entry.replacement for entry in log)):>15}")
+
+
+if __name__ == "__main__":
+    main()
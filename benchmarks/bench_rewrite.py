@@ -0,0 +1,78 @@
+"""
+Cost of rewriting the detected entities of long documents.
+
+Compares the offset based single pass rewriting (`rewrite_spans`) with the former implementation, which
+called `re.sub` on the whole text once per entity, on synthetic documents with one entity every ~60 characters.
+
+Usage:
+    python -m benchmarks.bench_rewrite --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import re
+import time
+
+from hexanonyme.core.rewriter import rewrite_spans
+
+FILLER = ["le", "dossier", "est", "en", "cours", "de", "traitement", "merci", "pour", "votre", "retour"]
+NAMES = ["Jean", "Marie", "Dupont", "Martin", "Lefèvre", "Durand", "Bernard", "Petit", "Moreau", "Laurent"]
+
+
+def make_document(size, seed=0):
+    """
+    Build a document of about `size` characters and the offsets of its entities.
+    """
+    rng = random.Random(seed)
+    parts, entities = [], []
+    length = 0
+    while length < size:
+        filler = " ".join(rng.choice(FILLER) for _ in range(8)) + " "
+        # Unique entities so that both implementations rewrite exactly the same spans
+        word = f"{rng.choice(NAMES)}{len(entities):06d}"
+        parts += [filler, word, " "]
+        entities.append({"entity_group": "PER", "word": word, "start": length + len(filler),
+                         "end": length + len(filler) + len(word)})
+        length += len(filler) + len(word) + 1
+    return "".join(parts), entities
+
+
+def legacy_rewrite(text, entities):
+    for entity in entities:
+        text = re.sub(entity["word"], "<PER>", text)
+    return text
+
+
+def offset_rewrite(text, entities):
+    return rewrite_spans(text, [(entity["start"], entity["end"], "<PER>") for entity in entities])[0]
+
+
+def timeit(function, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=1_000_000,
+                        help="Do not run the legacy implementation on larger documents.")
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'entities':>9} {'legacy (s)':>11} {'single pass (s)':>16}")
+    for size in args.sizes:
+        text, entities = make_document(size)
+        offset_time = timeit(offset_rewrite, text, entities)
+        if size <= args.skip_legacy_above:
+            assert legacy_rewrite(text, entities) == offset_rewrite(text, entities)
+            legacy_time = f"{timeit(legacy_rewrite, text, entities, repeat=1):11.4f}"
+        else:
+            legacy_time = f"{'-':>11}"
+        print(f"{len(text):>10} {len(entities):>9} {legacy_time} {offset_time:16.4f}")
+
+
+if __name__ == "__main__":
+    main()
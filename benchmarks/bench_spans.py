@@ -0,0 +1,65 @@
+"""
+Resolving nested entities ("longest") on lists of dictionaries versus the columnar `SpanTable`.
+
+For each number of entities, times the dictionary code of `resolve_overlaps` and the vectorized resolution of the
+table on the entities of three models. The table times include reading the offsets out of the dictionaries and
+giving the dictionaries back, as `resolve_overlaps` must; the "table only" column leaves them out, as if the
+entities were columnar from the start. `COLUMNAR_MIN_ENTITIES` is where the table starts to win.
+
+Usage:
+    python -m benchmarks.bench_spans --counts 10 100 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from hexanonyme.core.overlap import COLUMNAR_MIN_ENTITIES, _resolve_longest
+from hexanonyme.core.spans import SpanTable
+
+LABELS = ["PER", "LOC", "ORG", "DATE", "MISC", "ADDRESS"]
+
+
+def make_entities(count, seed=0):
+    # Entities of one model over a long document: a third are adjacent to the previous one
+    rng = random.Random(seed)
+    entities = []
+    position = 0
+    for _ in range(count):
+        position += rng.choice([0, 1, 5])
+        length = rng.randint(1, 12)
+        entities.append({"entity_group": rng.choice(LABELS), "score": rng.random(), "word": "x" * length,
+                         "start": position, "end": position + length})
+        position += length
+    return entities
+
+
+def timeit(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000],
+                        help="Number of entities of each model.")
+    args = parser.parse_args()
+
+    print(f"columnar from {COLUMNAR_MIN_ENTITIES} entities")
+    print(f"{'entities':>9} {'dicts (us)':>11} {'table (us)':>11} {'table only (us)':>16} {'speedup':>8}")
+    for count in args.counts:
+        candidates = make_entities(count) + make_entities(count, seed=1) + make_entities(count, seed=2)
+        repeat = max(3, min(200, 200000 // count))
+        table = SpanTable.from_entities(candidates)
+
+        dicts_us = timeit(lambda: _resolve_longest(candidates), repeat)
+        table_us = timeit(lambda: SpanTable.from_entities(candidates).resolve_longest().to_entities(), repeat)
+        only_us = timeit(table.resolve_longest, repeat)
+        print(f"{len(candidates):>9} {dicts_us:11.1f} {table_us:11.1f} {only_us:16.1f} {dicts_us / table_us:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
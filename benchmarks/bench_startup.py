@@ -0,0 +1,82 @@
+"""
+Startup latency: import time, construction and first call of the anonymizers.
+
+Each measure runs in a fresh interpreter, as a CLI tool or a serverless worker would, and the median over several
+runs is reported. The NER models are the offline stand-ins of `benchmarks.stand_in`, loaded with `model_dir`,
+so no download is timed. The "eager import" row imports Faker and transformers as `import hexanonyme` used to.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.stand_in import build_stand_in_models, model_directory
+
+TEXT = "Jean Dupont habite à Paris, appelez-le au 06 12 34 56 78 ou écrivez à jean.dupont@example.fr."
+
+# Each script prints the durations of its steps in seconds, as a JSON object
+PRELUDE = "import json, time\nstart = time.perf_counter()\ntimes = {}\n"
+SCENARIOS = {
+    "import hexanonyme": "import hexanonyme\ntimes['import'] = time.perf_counter() - start\n",
+    "eager import": ("import hexanonyme, faker, transformers, torch\n"
+                     "times['import'] = time.perf_counter() - start\n"),
+    "regex only redact": (
+        "from hexanonyme import RedactAnonymizer\n"
+        "times['import'] = time.perf_counter() - start\n"
+        "anonymizer = RedactAnonymizer(entities=['TEL', 'MAIL'])\n"
+        "times['construct'] = time.perf_counter() - start - sum(times.values())\n"
+        "anonymizer.redact(TEXT)\n"
+        "times['first call'] = time.perf_counter() - start - sum(times.values())\n"),
+    "replace, lazy": (
+        "from hexanonyme import ReplaceAnonymizer\n"
+        "times['import'] = time.perf_counter() - start\n"
+        "anonymizer = ReplaceAnonymizer(model_dir=MODEL_DIR, safetensors=SAFETENSORS)\n"
+        "times['construct'] = time.perf_counter() - start - sum(times.values())\n"
+        "anonymizer.replace(TEXT)\n"
+        "times['first call'] = time.perf_counter() - start - sum(times.values())\n"
+        "anonymizer.replace(TEXT)\n"
+        "times['second call'] = time.perf_counter() - start - sum(times.values())\n"),
+    "replace, warmup": (
+        "from hexanonyme import ReplaceAnonymizer\n"
+        "times['import'] = time.perf_counter() - start\n"
+        "anonymizer = ReplaceAnonymizer(model_dir=MODEL_DIR, safetensors=SAFETENSORS).warmup()\n"
+        "times['warmup'] = time.perf_counter() - start - sum(times.values())\n"
+        "anonymizer.replace(TEXT)\n"
+        "times['first call'] = time.perf_counter() - start - sum(times.values())\n"),
+}
+
+
+def run(script, model_dir, safetensors):
+    code = f"TEXT = {TEXT!r}\nMODEL_DIR = {model_dir!r}\nSAFETENSORS = {safetensors!r}\n" + PRELUDE + script
+    code += "print(json.dumps(times))\n"
+    env = dict(os.environ, HF_HUB_OFFLINE="1", TRANSFORMERS_VERBOSITY="error")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters per scenario.")
+    parser.add_argument("--model-dir", help="Root directory of the stand-in models.")
+    parser.add_argument("--safetensors", action="store_true", help="Load the weights with safetensors=True.")
+    args = parser.parse_args()
+
+    build_stand_in_models(args.model_dir)
+    model_dir = model_directory(args.model_dir)
+
+    print(f"{'scenario':<20} {'step':<12} {'median (ms)':>12} {'min (ms)':>10}")
+    for name, script in SCENARIOS.items():
+        runs = [run(script, model_dir, args.safetensors) for _ in range(args.runs)]
+        for step in runs[0]:
+            durations = [times[step] * 1000 for times in runs]
+            print(f"{name:<20} {step:<12} {statistics.median(durations):12.1f} {min(durations):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
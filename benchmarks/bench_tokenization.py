@@ -0,0 +1,36 @@
+"""
+Single document latency with each model tokenizing the text, and with one tokenization shared by the models.
+
+Usage:
+    python -m benchmarks.bench_tokenization --requests 200
+    python -m benchmarks.bench_tokenization --shared-encoder
+"""
+import argparse
+import statistics
+
+from hexanonyme import ReplaceAnonymizer
+from benchmarks.bench_concurrency import measure, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Number of anonymized messages per mode.")
+    parser.add_argument("--shared-encoder", action="store_true", help="Also run identical encoders once.")
+    args = parser.parse_args()
+
+    print(f"{'tokenization':<13} {'mean (ms)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for shared_tokenization in [False, True]:
+        anonymizer = ReplaceAnonymizer(faker=False, shared_tokenization=shared_tokenization,
+                                       shared_encoder=args.shared_encoder)
+        if shared_tokenization:
+            ensemble = anonymizer._get_ensemble()
+            print(f"models grouped by tokenizer: {ensemble.groups if ensemble else 'no shared tokenizer'}")
+        measure(anonymizer, 10)  # Warm up
+        latencies = measure(anonymizer, args.requests)
+        mode = "shared" if shared_tokenization else "per model"
+        print(f"{mode:<13} {statistics.mean(latencies):10.1f} {percentile(latencies, 50):9.1f} "
+              f"{percentile(latencies, 99):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
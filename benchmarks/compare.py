@@ -0,0 +1,91 @@
+"""
+Compare two result files of the benchmark suite.
+
+The scenarios are matched by name and size, and the ratio of their minimum times (new / old) is printed. Ratios
+beyond the threshold are flagged as regressions or improvements. The minimum is the least noisy statistic of a
+few runs on a shared machine; results measured with different environments are compared with a warning.
+
+Usage:
+    python -m benchmarks.compare old.json new.json --threshold 0.1 --fail
+"""
+import argparse
+import json
+import sys
+
+# Differences of the environments which make timings incomparable
+ENVIRONMENT_KEYS = ("python", "torch", "transformers", "faker", "platform", "processor", "threads", "seed")
+
+
+def load_results(path):
+    """
+    Read a result file of `benchmarks.suite`.
+
+    Args:
+        path (str): The JSON file.
+
+    Returns:
+        dict: The environment of the run.
+        dict: The result of each (scenario, size) pair.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return data.get("environment", {}), {(result["name"], result["size"]): result for result in data["results"]}
+
+
+def compare(old, new, threshold=0.1, statistic="min_ms"):
+    """
+    Compare the results of two runs.
+
+    Args:
+        old (dict): The results of the reference run, as returned by `load_results`.
+        new (dict): The results of the new run.
+        threshold (float): Relative change beyond which a scenario is flagged (default: 0.1, i.e. 10%).
+        statistic (str): The compared timing, "min_ms", "median_ms" or "mean_ms" (default: "min_ms").
+
+    Returns:
+        list: (name, size, old time, new time, ratio, status) tuples for the scenarios of both runs, the status
+            being "regression", "improvement" or "" within the threshold.
+    """
+    rows = []
+    for key in sorted(set(old) & set(new)):
+        before, after = old[key][statistic], new[key][statistic]
+        ratio = after / before if before else float("inf")
+        status = ""
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        rows.append((*key, before, after, ratio, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old", help="Results of the reference run.")
+    parser.add_argument("new", help="Results of the new run.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change flagged, 0.1 for 10%%.")
+    parser.add_argument("--statistic", choices=("min_ms", "median_ms", "mean_ms"), default="min_ms")
+    parser.add_argument("--fail", action="store_true", help="Exit with status 1 if any scenario regressed.")
+    args = parser.parse_args()
+
+    old_environment, old = load_results(args.old)
+    new_environment, new = load_results(args.new)
+    for key in ENVIRONMENT_KEYS:
+        if old_environment.get(key) != new_environment.get(key):
+            print(f"warning: different {key}: {old_environment.get(key)} != {new_environment.get(key)}",
+                  file=sys.stderr)
+    print(f"{old_environment.get('commit')} -> {new_environment.get('commit')}")
+
+    rows = compare(old, new, threshold=args.threshold, statistic=args.statistic)
+    print(f"{'scenario':<26} {'size':>7} {'old (ms)':>10} {'new (ms)':>10} {'ratio':>7}")
+    for name, size, before, after, ratio, status in rows:
+        print(f"{name:<26} {size:>7} {before:10.2f} {after:10.2f} {ratio:7.2f} {status}")
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key[0]:<26} {key[1]:>7} only in {'the old' if key in old else 'the new'} results")
+
+    if args.fail and any(status == "regression" for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
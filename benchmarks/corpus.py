@@ -0,0 +1,138 @@
+"""
+Seeded generator of synthetic French documents with known PII spans.
+
+Documents are made of templated sentences filled with Faker `fr_FR` values, mixed with sentences without PII. The
+same seed and size always give the same document, so benchmark results can be compared across commits.
+"""
+import datetime
+import random
+
+from faker import Faker
+
+MONTHS = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août", "septembre", "octobre", "novembre",
+          "décembre"]
+
+# Sentences with PII, the slots are filled with the value of their label
+TEMPLATES = [
+    "Je m'appelle {PER} et j'habite au {ADDRESS}.",
+    "Vous pouvez joindre {PER} au {TEL} ou par mail à {MAIL}.",
+    "Le rendez-vous est fixé au {DATE} à {LOC}.",
+    "{PER} travaille chez {ORG} depuis le {DATE}.",
+    "Merci de rappeler {PER} au {TEL} avant le {DATE}.",
+    "Le virement sera effectué sur le compte {IBAN}.",
+    "Le colis a été livré au {ADDRESS} le {DATE}.",
+    "Écrivez à {MAIL} pour toute question sur le dossier de {PER}.",
+    "La réunion entre {ORG} et {PER} aura lieu à {LOC}.",
+    "{PER} et {PER} sont partis en vacances à {LOC}.",
+]
+
+# Sentences without PII
+FILLERS = [
+    "Votre demande est en cours de traitement.",
+    "Nous revenons vers vous dans les meilleurs délais.",
+    "Le paiement a bien été reçu.",
+    "Merci pour votre réponse.",
+    "Le dossier est complet, aucune pièce supplémentaire n'est nécessaire.",
+    "La livraison est prévue dans la semaine.",
+    "Nous vous remercions de votre confiance.",
+    "Le service client reste à votre disposition pour toute information complémentaire.",
+]
+
+
+class CorpusGenerator:
+    """
+    Generates synthetic French documents with the offsets of their PII entities.
+
+    Args:
+        seed (int): Seed of Faker and of the choice of the sentences (default: 0).
+        pii_rate (float): Share of the sentences holding PII (default: 0.5).
+    """
+
+    def __init__(self, seed=0, pii_rate=0.5):
+        self.seed = seed
+        self.pii_rate = pii_rate
+
+    def _value(self, fake, rng, label):
+        if label == "PER":
+            return fake.name()
+        if label == "ADDRESS":
+            return fake.address().replace("\n", ", ")
+        if label == "TEL":
+            return fake.phone_number()
+        if label == "MAIL":
+            return fake.email()
+        if label == "DATE":
+            # Fixed bounds, the default ones depend on the current date
+            date = fake.date_between(start_date=datetime.date(1950, 1, 1), end_date=datetime.date(2024, 12, 31))
+            if rng.random() < 0.5:
+                return f"{date.day} {MONTHS[date.month - 1]} {date.year}"
+            return date.strftime("%d/%m/%Y")
+        if label == "LOC":
+            return fake.city()
+        if label == "ORG":
+            return fake.company()
+        if label == "IBAN":
+            return fake.iban()
+        raise ValueError(f"Unsupported label: {label}")
+
+    def document(self, size, index=0):
+        """
+        Generate a document of about `size` characters.
+
+        Args:
+            size (int): Minimum number of characters; the document ends with the sentence reaching it.
+            index (int): Index of the document, documents with different indexes differ (default: 0).
+
+        Returns:
+            str: The document.
+            list: Its entities, dictionaries with the entity_group, word, start and end of each PII value.
+        """
+        seed = f"{self.seed}-{index}-{size}"
+        fake = Faker("fr_FR")
+        fake.seed_instance(seed)
+        rng = random.Random(seed)
+
+        pieces, entities, length = [], [], 0
+        while length < size:
+            if length:
+                pieces.append(" ")
+                length += 1
+            if rng.random() >= self.pii_rate:
+                sentence = rng.choice(FILLERS)
+                pieces.append(sentence)
+                length += len(sentence)
+                continue
+
+            template = rng.choice(TEMPLATES)
+            cursor = 0
+            while True:
+                slot = template.find("{", cursor)
+                if slot < 0:
+                    break
+                end = template.index("}", slot)
+                literal = template[cursor:slot]
+                pieces.append(literal)
+                length += len(literal)
+
+                label = template[slot + 1:end]
+                value = self._value(fake, rng, label)
+                entities.append({"entity_group": label, "word": value, "start": length, "end": length + len(value)})
+                pieces.append(value)
+                length += len(value)
+                cursor = end + 1
+            pieces.append(template[cursor:])
+            length += len(template) - cursor
+        return "".join(pieces), entities
+
+    def documents(self, count, size):
+        """
+        Generate several documents of about `size` characters.
+
+        Args:
+            count (int): Number of documents.
+            size (int): Minimum number of characters of each document.
+
+        Returns:
+            list: The (document, entities) pairs.
+        """
+        return [self.document(size, index=i) for i in range(count)]
@@ -0,0 +1,90 @@
+"""
+Load test of `AsyncAnonymizer` with concurrent clients.
+
+By default the NER models are replaced by a local stand-in, a gazetteer lookup whose cost is a fixed overhead per
+call plus a cost per text, like a batched model. This measures the micro-batching itself without downloading any
+model. Use --real-models to load the NER models instead.
+
+Usage:
+    python -m benchmarks.loadtest_async --clients 64 --requests 2000
+    python -m benchmarks.loadtest_async --max-batch-size 1     # no batching, as a reference
+    python -m benchmarks.loadtest_async --real-models --clients 16 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from hexanonyme import AsyncAnonymizer, ModelRegistry
+from benchmarks.bench_batch import SAMPLE_DOCS
+
+GAZETTEER = {"PER": ["Jean Dupont", "Mme Martin", "Pierre Lefèvre"], "LOC": ["Paris", "Lyon"], "ORG": ["Renault"]}
+
+
+class StandInPipeline:
+    """
+    Local stand-in of a token classification pipeline, with the cost profile of a batched model.
+    """
+
+    def __init__(self, call_ms, text_ms):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+
+    def _classify(self, text):
+        return sorted(({"entity_group": label, "score": 0.9, "word": word, "start": match.start(), "end": match.end()}
+                       for label, words in GAZETTEER.items() for word in words
+                       for match in re.finditer(re.escape(word), text)), key=lambda x: x["start"])
+
+    def __call__(self, inputs, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        results = [self._classify(text) for text in texts]
+        return results[0] if isinstance(inputs, str) else results
+
+
+async def client(service, mode, requests):
+    for i in range(requests):
+        text = SAMPLE_DOCS[i % len(SAMPLE_DOCS)]
+        await (service.replace(text) if mode == "replace" else service.redact(text))
+
+
+async def run(args):
+    kwargs = {}
+    if not args.real_models:
+        kwargs["registry"] = ModelRegistry(loader=lambda model, task, device, **options: StandInPipeline(
+            args.call_ms, args.text_ms))
+    if args.mode == "replace":
+        kwargs["faker"] = False
+
+    async with AsyncAnonymizer(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                               **kwargs) as service:
+        # The first request creates the anonymizer and loads the models
+        await (service.replace("Bonjour.") if args.mode == "replace" else service.redact("Bonjour."))
+        service.metrics.reset()
+
+        per_client = args.requests // args.clients
+        start = time.perf_counter()
+        await asyncio.gather(*[client(service, args.mode, per_client) for _ in range(args.clients)])
+        elapsed = time.perf_counter() - start
+
+        metrics = service.metrics.snapshot()
+        print(f"{metrics['requests']} requests in {elapsed:.2f}s: {metrics['requests'] / elapsed:.1f} requests/s")
+        print(json.dumps(metrics, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64, help="Number of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total number of requests.")
+    parser.add_argument("--mode", choices=["replace", "redact"], default="replace")
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--call-ms", type=float, default=8, help="Fixed cost of a stand-in model call.")
+    parser.add_argument("--text-ms", type=float, default=1, help="Cost of each text in a stand-in model call.")
+    parser.add_argument("--real-models", action="store_true", help="Load the NER models instead of the stand-in.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
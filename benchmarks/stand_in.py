@@ -0,0 +1,146 @@
+"""
+Offline stand-ins of the NER models of the anonymizers.
+
+Each model of `BaseAnonymizer.models` is replaced by a small, randomly initialised CamemBERT token classification
+model with the same labels, and all of them share a BPE tokenizer trained on the synthetic corpus. The models are
+built once from a seed and saved on the disk, then loaded by the usual transformers pipeline, so the benchmarks run
+the real inference, aggregation and anonymization code without any download. Their predictions are a crude but
+deterministic imitation: capitalized tokens are tagged as persons, tokens with digits as dates, the others as "O".
+"""
+import hashlib
+import json
+import os
+
+from hexanonyme.core.backends import load_pipeline
+from hexanonyme.core.registry import ModelRegistry
+from benchmarks.corpus import CorpusGenerator
+
+ENTITY_LABELS = ["ADDRESS", "PER", "LOC", "DATE", "ORG", "MISC", "TEL", "MAIL"]
+
+# Labels of each model of the anonymizers
+MODEL_LABELS = {
+    "Jean-Baptiste/camembert-ner-with-dates": ["O", "I-LOC", "I-PER", "I-MISC", "I-ORG", "I-DATE"],
+    "DioulaD/birdi-finetuned-ner": ["O"] + [f"{prefix}-{label}" for label in ENTITY_LABELS for prefix in "BI"],
+    "DioulaD/birdi-finetuned-ner-address-v2": ["O"] + [f"{prefix}-{label}" for label in ENTITY_LABELS
+                                                       for prefix in "BI"],
+}
+
+DEFAULT_CONFIG = {"hidden_size": 64, "num_hidden_layers": 2, "num_attention_heads": 2, "intermediate_size": 128,
+                  "vocab_size": 4000, "signal": 1.0, "o_bias": 3.0, "seed": 0}
+
+DEFAULT_DIR = os.environ.get("HEXANONYME_STAND_IN_DIR",
+                             os.path.join(os.path.expanduser("~"), ".cache", "hexanonyme", "stand-in"))
+
+# Changed whenever the way the models are built changes, so that older builds are not reused
+BUILD_VERSION = 1
+
+
+def _train_tokenizer(vocab_size, seed):
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    special_tokens = ["<s>", "<pad>", "</s>", "<unk>"]
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.normalizer = normalizers.NFC()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    trainer = trainers.BpeTrainer(vocab_size=vocab_size, special_tokens=special_tokens, show_progress=False)
+    corpus = [text for text, _ in CorpusGenerator(seed=seed + 1).documents(200, 2000)]
+    tokenizer.train_from_iterator(corpus, trainer=trainer)
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", special_tokens=[("<s>", tokenizer.token_to_id("<s>")),
+                                              ("</s>", tokenizer.token_to_id("</s>"))])
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", pad_token="<pad>",
+                                   unk_token="<unk>", cls_token="<s>", sep_token="</s>", model_max_length=512)
+
+
+def _build_model(labels, tokenizer, config, seed):
+    import torch
+    from transformers import CamembertConfig, CamembertForTokenClassification
+
+    model_config = CamembertConfig(
+        vocab_size=len(tokenizer), hidden_size=config["hidden_size"], num_hidden_layers=config["num_hidden_layers"],
+        num_attention_heads=config["num_attention_heads"], intermediate_size=config["intermediate_size"],
+        max_position_embeddings=514, pad_token_id=tokenizer.pad_token_id, num_labels=len(labels),
+        id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)})
+    torch.manual_seed(seed)
+    model = CamembertForTokenClassification(model_config).eval()
+
+    # Capitalized tokens are pushed towards PER and tokens with digits towards DATE, along a direction of the
+    # embeddings read by the classifier, so that entities are found about where a real model would find some
+    per = labels.index("B-PER" if "B-PER" in labels else "I-PER")
+    date = labels.index("B-DATE" if "B-DATE" in labels else "I-DATE")
+    directions = torch.nn.functional.normalize(torch.randn(2, config["hidden_size"]), dim=1)
+    with torch.no_grad():
+        embeddings = model.base_model.embeddings.word_embeddings.weight
+        for token, index in tokenizer.get_vocab().items():
+            if token[:1].isupper():
+                embeddings[index] += config["signal"] * directions[0]
+            elif any(character.isdigit() for character in token):
+                embeddings[index] += config["signal"] * directions[1]
+        model.classifier.weight[per] += config["signal"] * directions[0]
+        model.classifier.weight[date] += config["signal"] * directions[1]
+        model.classifier.bias[0] += config["o_bias"]
+    return model
+
+
+def model_directory(directory=None, **config):
+    """
+    Directory of the stand-in models of a configuration.
+
+    Args:
+        directory (str): Root directory of the stand-in models (default: $HEXANONYME_STAND_IN_DIR or
+            ~/.cache/hexanonyme/stand-in).
+        **config: Options overriding `DEFAULT_CONFIG`.
+
+    Returns:
+        str: The directory, named after a hash of the configuration.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    digest = hashlib.sha256(json.dumps([BUILD_VERSION, config], sort_keys=True).encode("utf-8")).hexdigest()
+    return os.path.join(directory or DEFAULT_DIR, digest[:16])
+
+
+def build_stand_in_models(directory=None, **config):
+    """
+    Build and save the stand-in models of a configuration, unless they are already saved.
+
+    Args:
+        directory (str): Root directory of the stand-in models (default: see `model_directory`).
+        **config: Options overriding `DEFAULT_CONFIG`: hidden_size, num_hidden_layers, num_attention_heads,
+            intermediate_size, vocab_size, signal, o_bias and seed.
+
+    Returns:
+        dict: The path of the stand-in of each model name.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    root = model_directory(directory, **config)
+    paths = {name: os.path.join(root, name.replace("/", "--")) for name in MODEL_LABELS}
+    if os.path.exists(os.path.join(root, "config.json")):
+        return paths
+
+    tokenizer = _train_tokenizer(config["vocab_size"], config["seed"])
+    for i, (name, labels) in enumerate(MODEL_LABELS.items()):
+        model = _build_model(labels, tokenizer, config, config["seed"] + i)
+        model.save_pretrained(paths[name])
+        tokenizer.save_pretrained(paths[name])
+
+    # Written last, an interrupted build is started again
+    with open(os.path.join(root, "config.json"), "w", encoding="utf-8") as file:
+        json.dump({"build_version": BUILD_VERSION, **config}, file, indent=2)
+    return paths
+
+
+def stand_in_registry(directory=None, **config):
+    """
+    Model registry loading the stand-in models instead of the real ones.
+
+    Args:
+        directory (str): Root directory of the stand-in models (default: see `model_directory`).
+        **config: Options overriding `DEFAULT_CONFIG`.
+
+    Returns:
+        ModelRegistry: The registry, to give to the anonymizers.
+    """
+    paths = build_stand_in_models(directory, **config)
+    return ModelRegistry(loader=lambda model, task, device, **kwargs: load_pipeline(paths[model], task, device,
+                                                                                    **kwargs))
@@ -0,0 +1,287 @@
+"""
+Reproducible benchmark suite, running without network.
+
+Every scenario runs on documents of the synthetic French corpus (`benchmarks.corpus`) at several sizes:
+    - replace, redact: the anonymizers end to end, with the offline stand-ins of the NER models
+      (`benchmarks.stand_in`). Documents longer than one window of the models go through `replace_stream`
+      and `redact_stream`.
+    - resolve: `resolve_overlaps` on the gold entities as found by three models, with nested and duplicate spans.
+    - regex_default, regex_all: the pattern detector with its default patterns and with every built-in pattern,
+      with the recall of the TEL, MAIL and IBAN entities of the corpus.
+    - deanonymize_offsets, deanonymize_placeholders: `restore_text` on the anonymized text, and on a text whose
+      indexed placeholders were moved around.
+
+The results, with the versions, the platform and the seed, are written as JSON and can be compared across commits
+with `python -m benchmarks.compare`.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --scenarios resolve regex_all --sizes 10000 100000 --repeat 20
+"""
+import argparse
+from importlib import metadata
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.detectors import BUILTIN_PATTERNS, PatternDetector
+from hexanonyme.core.overlap import resolve_overlaps
+from hexanonyme.core.registry import ModelRegistry
+from hexanonyme.core.result import restore_text
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.stand_in import model_directory, stand_in_registry
+
+SCENARIOS = ("replace", "redact", "resolve", "regex_default", "regex_all", "deanonymize_offsets",
+             "deanonymize_placeholders")
+
+# Longest document given to `replace` and `redact` as a whole, the pipelines truncate longer texts
+MAX_DIRECT_SIZE = 1500
+
+# Labels of the corpus found by the regexes
+REGEX_LABELS = ("TEL", "MAIL", "IBAN")
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def _version(distribution):
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment(seed, threads):
+    """
+    Description of the run, stored with the results.
+
+    Args:
+        seed (int): Seed of the corpus and of the stand-in models.
+        threads (int): Number of torch threads.
+
+    Returns:
+        dict: The commit, the versions, the platform, the seed and the number of threads.
+    """
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "torch": _version("torch"),
+        "transformers": _version("transformers"),
+        "faker": _version("Faker"),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "threads": threads,
+        "seed": seed,
+    }
+
+
+def measure(function, repeat):
+    """
+    Time a function, after a first untimed call.
+
+    Args:
+        function (callable): The function, called without arguments.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        list: The duration of each timed call in milliseconds.
+    """
+    function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def _candidates(entities, seed):
+    # The gold entities as found by three models: some are cut, extended or found twice
+    rng = random.Random(seed)
+    candidates = []
+    for source in ("model-a", "model-b", "model-c"):
+        for entity in entities:
+            if rng.random() < 0.2:
+                continue
+            start, end = entity["start"], entity["end"]
+            if rng.random() < 0.3 and end - start > 2:
+                start += rng.randint(1, (end - start) // 2)
+            candidates.append({"entity_group": entity["entity_group"], "score": rng.random(), "source": source,
+                               "start": start, "end": end})
+    rng.shuffle(candidates)
+    return candidates
+
+
+def _recall(found, entities):
+    expected = {(entity["start"], entity["end"]) for entity in entities if entity["entity_group"] in REGEX_LABELS}
+    if not expected:
+        return None
+    return len(expected & {(entity["start"], entity["end"]) for entity in found}) / len(expected)
+
+
+def _gold_registry():
+    # No model is loaded: the deanonymization scenarios give the entities directly
+    return ModelRegistry(loader=lambda model, task, device, **kwargs: None)
+
+
+class Suite:
+    """
+    Runs the scenarios of the benchmark suite.
+
+    Args:
+        sizes (list): Sizes of the documents in characters.
+        repeat (int): Number of timed runs of each measure.
+        seed (int): Seed of the corpus and of the stand-in models (default: 0).
+        model_dir (str): Root directory of the stand-in models (default: see `benchmarks.stand_in.model_directory`).
+    """
+
+    def __init__(self, sizes, repeat, seed=0, model_dir=None):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.seed = seed
+        self.model_dir = model_dir
+        self.corpus = CorpusGenerator(seed=seed)
+        self._registry = None
+        self._anonymizers = {}
+
+    def _anonymizer(self, mode):
+        if mode not in self._anonymizers:
+            # Both anonymizers share the stand-in pipelines
+            if self._registry is None:
+                self._registry = stand_in_registry(self.model_dir, seed=self.seed)
+            registry = self._registry
+            if mode == "replace":
+                anonymizer = ReplaceAnonymizer(registry=registry)
+            else:
+                anonymizer = RedactAnonymizer(registry=registry)
+            self._anonymizers[mode] = anonymizer
+        return self._anonymizers[mode]
+
+    def _anonymize(self, mode, text):
+        anonymizer = self._anonymizer(mode)
+        if len(text) <= MAX_DIRECT_SIZE:
+            return lambda: getattr(anonymizer, mode)(text), mode
+        return lambda: "".join(getattr(anonymizer, f"{mode}_stream")(text)), f"{mode}_stream"
+
+    def scenario(self, name, size):
+        """
+        Run one scenario on a document of one size.
+
+        Args:
+            name (str): The scenario, one of `SCENARIOS`.
+            size (int): Size of the document in characters.
+
+        Returns:
+            dict: The timings of the scenario and what was measured.
+        """
+        text, entities = self.corpus.document(size)
+        extra = {}
+        if name in ("replace", "redact"):
+            function, extra["method"] = self._anonymize(name, text)
+        elif name == "resolve":
+            candidates = _candidates(entities, self.seed)
+            function = lambda: resolve_overlaps(candidates)
+            extra["candidates"] = len(candidates)
+        elif name in ("regex_default", "regex_all"):
+            detector = PatternDetector() if name == "regex_default" else PatternDetector(list(BUILTIN_PATTERNS))
+            function = lambda: detector.find(text)
+            extra["recall"] = _recall(detector.find(text), entities)
+        elif name in ("deanonymize_offsets", "deanonymize_placeholders"):
+            placeholders = name == "deanonymize_placeholders"
+            anonymizer = ReplaceAnonymizer(sorted({entity["entity_group"] for entity in entities}),
+                                           registry=_gold_registry(), indexed_placeholders=placeholders,
+                                           detector=PatternDetector(list(BUILTIN_PATTERNS)))
+            anonymized_text, log = anonymizer._replace_text(text, entities)
+            if placeholders:
+                # The second half of the text is moved to the beginning, as in an LLM answer
+                middle = log[len(log) // 2].output_start
+                anonymized_text = anonymized_text[middle:] + anonymized_text[:middle]
+            function = lambda: restore_text(anonymized_text, log)
+        else:
+            raise ValueError(f"Unsupported scenario: {name}. Expected one of {SCENARIOS}")
+
+        durations = measure(function, self.repeat)
+        return {
+            "name": name,
+            "size": size,
+            "characters": len(text),
+            "entities": len(entities),
+            "repeat": self.repeat,
+            "min_ms": min(durations),
+            "median_ms": statistics.median(durations),
+            "mean_ms": statistics.mean(durations),
+            "chars_per_second": len(text) / (min(durations) / 1000) if min(durations) else None,
+            **extra,
+        }
+
+    def run(self, scenarios, progress=None):
+        """
+        Run scenarios on documents of every size.
+
+        Args:
+            scenarios (list): The scenarios.
+            progress (callable): Function called with the result of each scenario (default: None).
+
+        Returns:
+            list: The result of each scenario and size.
+        """
+        results = []
+        for name in scenarios:
+            for size in self.sizes:
+                result = self.scenario(name, size)
+                if progress is not None:
+                    progress(result)
+                results.append(result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Sizes of the documents in characters.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs of each measure.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus and of the stand-in models.")
+    parser.add_argument("--threads", type=int, default=1, help="Number of torch threads.")
+    parser.add_argument("--model-dir", help="Root directory of the stand-in models.")
+    parser.add_argument("--output", help="JSON file receiving the results.")
+    args = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+
+    suite = Suite(args.sizes, args.repeat, seed=args.seed, model_dir=args.model_dir)
+    if {"replace", "redact"} & set(args.scenarios):
+        print(f"stand-in models: {model_directory(args.model_dir, seed=args.seed)}", file=sys.stderr)
+
+    print(f"{'scenario':<26} {'size':>7} {'entities':>8} {'min (ms)':>10} {'median (ms)':>12} {'chars/s':>12}")
+
+    def progress(result):
+        print(f"{result['name']:<26} {result['size']:>7} {result['entities']:>8} {result['min_ms']:10.2f} "
+              f"{result['median_ms']:12.2f} {result['chars_per_second'] or 0:12.0f}")
+
+    results = suite.run(args.scenarios, progress=progress)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(args.seed, args.threads), "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,42 @@
-from .core.anonymizer.replace_anonymizer import ReplaceAnonymizer
-from .core.anonymizer.redact_anonymizer import RedactAnonymizer
+import importlib
 
-__all__ = ['ReplaceAnonymizer', 'RedactAnonymizer']
\ No newline at end of file
+# Exported names are imported on first access (PEP 562), so `import hexanonyme` stays fast and the heavy
+# dependencies (Faker, transformers, torch) are only imported by the features using them
+_EXPORTS = {
+    'ReplaceAnonymizer': '.core.anonymizer.replace_anonymizer',
+    'RedactAnonymizer': '.core.anonymizer.redact_anonymizer',
+    'MemoryCache': '.core.cache',
+    'SqliteCache': '.core.cache',
+    'PatternDetector': '.core.detectors',
+    'get_detector': '.core.detectors',
+    'CorpusRunner': '.core.parallel',
+    'anonymize_corpus': '.core.parallel',
+    'PIIPrefilter': '.core.prefilter',
+    'Profiler': '.core.profiling',
+    'FakerPool': '.core.pseudonyms',
+    'PseudonymMap': '.core.pseudonyms',
+    'AnonymizationResult': '.core.result',
+    'LogEntry': '.core.result',
+    'ModelRegistry': '.core.registry',
+    'get_registry': '.core.registry',
+    'AsyncAnonymizer': '.core.service',
+}
+
+__all__ = ['ReplaceAnonymizer', 'RedactAnonymizer', 'ModelRegistry', 'get_registry', 'PatternDetector', 'get_detector',
+           'CorpusRunner', 'anonymize_corpus', 'MemoryCache', 'SqliteCache',
+           'AsyncAnonymizer', 'AnonymizationResult', 'LogEntry', 'FakerPool', 'PseudonymMap',
+           'PIIPrefilter', 'Profiler']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Later accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
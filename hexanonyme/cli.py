@@ -0,0 +1,99 @@
+"""
+Command line interface of hexanonyme.
+
+Usage:
+    hexanonyme input.jsonl output.jsonl --fields text title --entities PER LOC
+    hexanonyme input.csv output.csv --mode redact --workers 4 --checkpoint run.ckpt --log log.jsonl
+"""
+import argparse
+import sys
+
+from .core.files import FORMATS, anonymize_file
+from .core.parallel import MODES
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="hexanonyme", description="Anonymize the PII entities of JSONL, CSV, Parquet or text files.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("input", help="Input file, '-' for the standard input.")
+    parser.add_argument("output", help="Output file, '-' for the standard output.")
+    parser.add_argument("--fields", nargs="+", default=["text"],
+                        help="Fields or columns to anonymize, nested JSON fields as dotted paths. Ignored for text "
+                             "files, where every line is anonymized.")
+    parser.add_argument("--input-format", choices=FORMATS, help="Format of the input (default: from its extension).")
+    parser.add_argument("--output-format", choices=FORMATS,
+                        help="Format of the output (default: from its extension, else the input format).")
+    parser.add_argument("--mode", choices=MODES, default="replace")
+    parser.add_argument("--entities", nargs="+", help="Entity types to anonymize (default: all).")
+    parser.add_argument("--no-faker", action="store_true",
+                        help="Replace entities with <LABEL> instead of fake values.")
+    parser.add_argument("--indexed-placeholders", action="store_true",
+                        help="Replace entities with indexed placeholders such as <PER_1> or [REDACTED_1].")
+    parser.add_argument("--pseudonym-scope", choices=("document", "batch", "global"),
+                        help="Scope in which a value is always replaced by the same fake value.")
+    parser.add_argument("--prefilter", type=float, nargs="?", const=0.5, metavar="THRESHOLD",
+                        help="Only send the sentences which may contain PII to the models, with this recall "
+                             "threshold (0.5 when given without value).")
+    parser.add_argument("--device", help="Device of the NER models, e.g. cpu, cuda or 0.")
+    parser.add_argument("--backend", choices=("torch", "onnx", "onnx-int8"), default="torch")
+    parser.add_argument("--model-dir", help="Directory holding local copies of the models, one subdirectory per "
+                                            "model named after it with '/' replaced by '--'.")
+    parser.add_argument("--safetensors", action="store_true",
+                        help="Read the weights from memory-mapped safetensors files (torch backend only).")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--executor", choices=("process", "thread"),
+                        help="Workers type (default: thread with one worker, else process).")
+    parser.add_argument("--batch-size", type=int, default=8, help="Batch size of the NER models.")
+    parser.add_argument("--shard-size", type=int, default=32, help="Number of fields sent at once to a worker.")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Number of rows read at once and of each row group of Parquet files.")
+    parser.add_argument("--checkpoint", help="Checkpoint file. The run resumes from it if it exists.")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="Number of records between checkpoints.")
+    parser.add_argument("--log", help="JSONL file receiving the log of each anonymized field, with the original "
+                                      "values.")
+    parser.add_argument("--quiet", action="store_true", help="Do not report the progress on the standard error.")
+    return parser
+
+
+def _device(value):
+    if value is not None and value.isdigit():
+        return int(value)
+    return value
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    anonymizer_kwargs = {"device": _device(args.device), "backend": args.backend,
+                         "indexed_placeholders": args.indexed_placeholders, "prefilter": args.prefilter,
+                         "model_dir": args.model_dir, "safetensors": args.safetensors}
+    if args.entities:
+        anonymizer_kwargs["entities"] = args.entities
+    if args.mode == "replace":
+        anonymizer_kwargs["faker"] = not args.no_faker
+        anonymizer_kwargs["pseudonym_scope"] = args.pseudonym_scope
+
+    def progress(stats):
+        print(f"\r{stats.documents} fields, {stats.errors} errors, {stats.docs_per_second:.1f} fields/s",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = anonymize_file(args.input, args.output, fields=args.fields, input_format=args.input_format,
+                               output_format=args.output_format, mode=args.mode, log_path=args.log,
+                               checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every,
+                               chunk_size=args.chunk_size, workers=args.workers, executor=args.executor,
+                               shard_size=args.shard_size, batch_size=args.batch_size,
+                               progress=None if args.quiet else progress, **anonymizer_kwargs)
+    except (ValueError, ImportError, OSError) as error:
+        print(f"hexanonyme: error: {error}", file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        print(f"\n{stats.records} records ({stats.skipped} resumed from the checkpoint), {stats.errors} dropped",
+              file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,43 @@
-from transformers import pipeline
-import re
+from ..backends import BACKENDS
+from ..cache import cache_key
+from ..detectors import get_detector
+from ..ensemble import SharedTokenizationEnsemble
+from ..overlap import STRATEGIES, resolve_overlaps
+from ..plan import ExecutionPlan
+from ..prefilter import PIIPrefilter
+from ..profiling import NULL_CONTEXT
+from ..registry import get_registry
+from ..rewriter import entity_bounds
+from ..sentences import split_sentences
+from ..streaming import iter_chunks, shift_entity
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+ENTITY_TYPES = ["ADDRESS", "PER", "LOC", "DATE", "ORG", "MISC", "TEL", "MAIL"]
 
 class BaseAnonymizer:
-    def __init__(self):
-        self.entities = ["ADDRESS", "PER", "LOC", "DATE", "ORG", "MISC", "TEL", "MAIL"]
+    def __init__(self, registry=None, device=None, overlap_strategy="longest", model_priority=None, detector=None,
+                 concurrent_models=False, cache=None, cache_sentences=False, backend="torch",
+                 shared_tokenization=True, shared_encoder=False, prefilter=None, profiler=None, model_dir=None,
+                 safetensors=False):
+        # Pipelines are shared with every other anonymizer using the same registry
+        self.registry = registry if registry is not None else get_registry()
+        self.device = device
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Expected one of {BACKENDS}")
+        self.backend = backend
+        if safetensors and backend != "torch":
+            raise ValueError("safetensors is only supported by the torch backend")
+        self.safetensors = safetensors
+
+        # Local copies of the models, one subdirectory per model named after it with "/" replaced by "--"
+        self.model_dir = model_dir
+
+        # Regex patterns (TEL, MAIL and any registered pattern such as IBAN)
+        self.detector = detector if detector is not None else get_detector()
+        self.entities = list(self.supported_entities)
 
-    def load_pipelines(self):
         self.models = ["Jean-Baptiste/camembert-ner-with-dates",
                        "DioulaD/birdi-finetuned-ner",
                        "DioulaD/birdi-finetuned-ner-address-v2"]
@@ -14,19 +46,513 @@ class BaseAnonymizer:
                         ["ADDRESS", "PER", "LOC", "DATE", "ORG", "MISC", "TEL", "MAIL"],
                         ["ADDRESS", "PER", "LOC", "DATE", "ORG", "MISC", "TEL", "MAIL"]
                        ]
+        self.plan = None
+
+        # Pipelines of the plan, loaded on first use (see `classifier_filtres` and `warmup`)
+        self._classifier_filtres = None
+        self._load_lock = threading.Lock()
+
+        if overlap_strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported overlap strategy: {overlap_strategy}. Expected one of {STRATEGIES}")
+        self.overlap_strategy = overlap_strategy
+        self.model_priority = model_priority
+
+        # Thread pool running the models of the plan at the same time, created on first use
+        self.concurrent_models = concurrent_models
+        self._model_executor = None
+        self._model_executor_lock = threading.Lock()
+
+        # Entities of the texts (or sentences) already seen, inference is skipped on a hit
+        self.cache = cache
+        self.cache_sentences = cache_sentences
+
+        # Models with the same tokenizer reuse one encoding of the text, created on first use
+        self.shared_tokenization = shared_tokenization
+        self.shared_encoder = shared_encoder
+        self._ensemble = None
+
+        # Screening of the sentences, only the ones which may contain an entity are sent to the models
+        if prefilter is True:
+            prefilter = PIIPrefilter(detector=self.detector)
+        elif isinstance(prefilter, (int, float)) and prefilter is not False:
+            prefilter = PIIPrefilter(threshold=prefilter, detector=self.detector)
+        self.prefilter = prefilter or None
+
+        # Timings and counts of each call, see `Profiler`
+        self.profiler = profiler
 
-        #We iterate on every model to create a list of classifier
-        n = len(self.models)
+    @property
+    def supported_entities(self):
+        """
+        Entity types which can be anonymized: the labels of the NER models and of the registered patterns.
+        """
+        return ENTITY_TYPES + [label for label in self.detector.labels if label not in ENTITY_TYPES]
+
+    def build_plan(self):
+        """
+        Build the execution plan of the requested entities, without loading any model.
+
+        Returns:
+            ExecutionPlan: The plan, also stored in `plan`.
+        """
+        self.plan = ExecutionPlan(self.entities, self.models, self.filters, self.detector.labels)
+        return self.plan
+
+    def model_path(self, model):
+        """
+        Name or path from which a model is loaded.
+
+        Args:
+            model (str): Name of the model.
+
+        Returns:
+            str: Its local copy in `model_dir` if there is one, else the name, loaded from the Hugging Face Hub.
+        """
+        if self.model_dir is not None:
+            path = os.path.join(self.model_dir, model.replace("/", "--"))
+            if os.path.isdir(path):
+                return path
+        return model
+
+    def load_pipelines(self):
+        """
+        Build the execution plan of the requested entities and load the pipelines of its models.
+
+        Returns:
+            list: A list of [classifier, filter] pairs, one for each model of the plan.
+        """
+        self.build_plan()
+
+        #We iterate on every model of the plan to create a list of classifier
+        # The torch backend is the loader default, so its pipelines keep the same registry key as preloaded ones
+        backend_options = {} if self.backend == "torch" else {"backend": self.backend}
+        if self.safetensors:
+            backend_options["use_safetensors"] = True
+        n = len(self.plan.models)
         liste_classifier_filters = []
         for i in range(n):
-            classifier = pipeline(
-                "token-classification",
-                model = self.models[i],
-                aggregation_strategy = "simple"
+            classifier = self.registry.get(
+                self.model_path(self.plan.models[i]),
+                task = "token-classification",
+                device = self.device,
+                aggregation_strategy = "simple",
+                **backend_options
             )
-            liste_classifier_filters.append([classifier,self.filters[i]])
+            liste_classifier_filters.append([classifier,self.plan.filters[i]])
         return liste_classifier_filters
 
+    @property
+    def classifier_filtres(self):
+        """
+        [classifier, filter] pairs of the models of the plan, loaded on first access.
+        """
+        classifier_filtres = self._classifier_filtres
+        if classifier_filtres is None:
+            with self._load_lock:
+                if self._classifier_filtres is None:
+                    self._classifier_filtres = self.load_pipelines()
+                classifier_filtres = self._classifier_filtres
+        return classifier_filtres
+
+    @classifier_filtres.setter
+    def classifier_filtres(self, classifier_filtres):
+        self._classifier_filtres = classifier_filtres
+
+    def warmup(self, text="Bonjour, je m'appelle Jean Dupont et j'habite à Paris."):
+        """
+        Load the models of the plan and run them once, so that the first real call is not slowed down.
+
+        The models are otherwise loaded by the first call. The text is not looked up nor stored in the cache.
+
+        Args:
+            text (str): The text given to the models.
+
+        Returns:
+            BaseAnonymizer: The anonymizer itself.
+        """
+        self._infer_entities_batch([text])
+        return self
+
+    def _detect_entities(self, text):
+        """
+        Run every classifier and regex finder over a text and resolve the overlapping entities.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            list: A list of dictionaries, one per entity kept after dropping duplicates and included entities.
+        """
+        return self._detect_entities_batch([text])[0]
+
+    def _detect_entities_batch(self, texts, batch_size=1):
+        """
+        Detect the entities of a list of texts, looking them up in the cache first when there is one.
+
+        Each text is stripped of its surrounding whitespaces (or split into sentences with `cache_sentences`) and
+        looked up by a hash of its content and of the detection configuration. Only the units missing from the
+        cache are sent to the classifiers, once even if they are repeated, and their entities are stored.
+
+        Args:
+            texts (list): A list of input texts.
+            batch_size (int): Number of texts sent at once to each classifier.
+
+        Returns:
+            list: One list of entity dictionaries per input text.
+        """
+        if self.cache is None:
+            return self._infer_entities_batch(texts, batch_size=batch_size)
+
+        texts = list(texts)
+        units = []  # (index of the text, offset of the unit in the text, unit)
+        for i, text in enumerate(texts):
+            if self.cache_sentences:
+                spans = split_sentences(text)
+            else:
+                start = len(text) - len(text.lstrip())
+                spans = [(start, len(text.rstrip()))] if text.strip() else []
+            units.extend((i, start, text[start:end]) for start, end in spans)
+
+        signature = self._cache_signature()
+        keys = [cache_key(unit, signature) for _, _, unit in units]
+        with self._stage("cache"):
+            cached = self.cache.get_many(keys)
+
+        missing = {}
+        for key, (_, _, unit), entities in zip(keys, units, cached):
+            if entities is None:
+                missing.setdefault(key, unit)
+        inferred = {}
+        if missing:
+            for key, entities in zip(missing, self._infer_entities_batch(list(missing.values()), batch_size)):
+                # Scores of the models are numpy floats, stored as plain floats like in the cache
+                inferred[key] = [dict(entity, score=float(entity["score"])) for entity in entities]
+            with self._stage("cache"):
+                self.cache.put_many(inferred.items())
+
+        entities_per_text = [[] for _ in texts]
+        for key, (i, offset, _), entities in zip(keys, units, cached):
+            if entities is None:
+                entities = inferred[key]
+            entities_per_text[i].extend(shift_entity(entity, offset) for entity in entities)
+        return entities_per_text
+
+    def _cache_signature(self):
+        """
+        Signature of everything besides the text which changes the detected entities.
+
+        Returns:
+            str: The models, backend and filters of the plan, the patterns, the overlap resolution, the cache unit
+                and the prefilter.
+        """
+        prefilter = self.prefilter.signature if self.prefilter is not None else None
+        # Local copies of the models may differ from the published ones
+        models = self.plan.models if self.model_dir is None else [self.model_path(model) for model in self.plan.models]
+        return repr((models, self.backend, self.plan.filters, self.detector.signature,
+                     self.overlap_strategy, self.model_priority, self.cache_sentences, prefilter))
+
+    def _infer_entities_batch(self, texts, batch_size=1):
+        """
+        Run every classifier over a list of texts in batches and resolve the entities of each text.
+
+        Texts are sorted by length before being sent to the classifiers so that each batch gathers texts
+        of similar size and padding is kept to a minimum. Results are given back in the input order.
+        With `concurrent_models`, the classifiers run at the same time on a thread pool (torch releases the GIL
+        during inference) and their outputs are merged in the same order as in sequential mode.
+        Texts processed one at a time are encoded once for all the classifiers sharing a tokenizer
+        (see `SharedTokenizationEnsemble`), larger batches keep the padded batching of each pipeline.
+        With a prefilter, only the candidate segments of each text are sent to the classifiers, the regexes still
+        run on the whole text.
+
+        Args:
+            texts (list): A list of input texts.
+            batch_size (int): Number of texts sent at once to each classifier.
+
+        Returns:
+            list: One list of entity dictionaries per input text.
+        """
+        texts = list(texts)
+        entities_per_text = [[] for _ in texts]
+
+        # Inputs of the classifiers: (index of the text, offset in the text, segment)
+        if self.prefilter is None:
+            segments = [(i, 0, text) for i, text in enumerate(texts)]
+        else:
+            with self._stage("prefilter"):
+                segments = [(i, start, text[start:end]) for i, text in enumerate(texts)
+                            for start, end in self.prefilter.candidates(text)]
+        order = sorted(range(len(segments)), key=lambda i: len(segments[i][2]))
+        sorted_texts = [segments[i][2] for i in order]
+        if not sorted_texts:
+            # No text, or every sentence was skipped by the prefilter: the models are not needed, nor loaded
+            return self._add_patterns(texts, entities_per_text)
+
+        executor = None
+        if self.concurrent_models and len(self.classifier_filtres) > 1:
+            executor = self._get_model_executor()
+
+        ensemble = self._get_ensemble() if self.shared_tokenization and batch_size == 1 else None
+        profiler = self.profiler
+        call = profiler.current() if profiler is not None else None
+        if call is not None and profiler.count_tokens and self.classifier_filtres:
+            tokenizer = getattr(self.classifier_filtres[0][0], "tokenizer", None)
+            if tokenizer is not None:
+                profiler.count("tokens", sum(len(ids) for ids in tokenizer(sorted_texts)["input_ids"]))
+
+        with self._stage("inference"):
+            if ensemble is not None:
+                outputs_per_text = [ensemble(text, executor=executor) for text in sorted_texts]
+                outputs_per_model = [[outputs[m] for outputs in outputs_per_text]
+                                     for m in range(len(self.classifier_filtres))]
+            else:
+                def run_classifier(model, classifier_filtre):
+                    # The stages of the models running on the thread pool are recorded in the call of this thread
+                    with self._stage(f"model {model}", call):
+                        return classifier_filtre[0](sorted_texts, batch_size=batch_size)
+
+                if executor is not None:
+                    outputs_per_model = list(executor.map(run_classifier, self.plan.models, self.classifier_filtres))
+                else:
+                    outputs_per_model = list(map(run_classifier, self.plan.models, self.classifier_filtres))
+
+        with self._stage("merge"):
+            for model, [_, filtre], outputs in zip(self.plan.models, self.classifier_filtres, outputs_per_model):
+                entities_per_segment = [None] * len(segments)
+                for j, entities_classifier in zip(order, outputs):
+                    # Merge overlapping entities
+                    entities_classifier = self.merge_overlapping_entities(entities_classifier)
+                    entities_classifier = [entity for entity in entities_classifier
+                                           if entity["entity_group"] in filtre]
+                    for entity in entities_classifier:
+                        entity["source"] = model
+                    entities_per_segment[j] = entities_classifier
+                for (i, offset, _), entities_classifier in zip(segments, entities_per_segment):
+                    if offset:
+                        entities_classifier = [shift_entity(entity, offset) for entity in entities_classifier]
+                    entities_per_text[i] += entities_classifier
+
+        return self._add_patterns(texts, entities_per_text)
+
+    def _add_patterns(self, texts, entities_per_text):
+        """
+        Add the entities found by the regexes to the entities of the classifiers and resolve them.
+
+        Args:
+            texts (list): The input texts.
+            entities_per_text (list): The entities found by the classifiers in each text.
+
+        Returns:
+            list: One list of resolved entity dictionaries per input text.
+        """
+        for i, text in enumerate(texts):
+            with self._stage("regex"):
+                entities_per_text[i] += self.find_patterns(text)
+            with self._stage("resolve"):
+                entities_per_text[i] = self.drop_duplicates_and_included_entities(entities_per_text[i])
+        return entities_per_text
+
+    def _profile_call(self, name, texts):
+        """
+        Profile a call of a public method when the anonymizer has a profiler.
+
+        Args:
+            name (str): The method.
+            texts (list): The input texts.
+
+        Returns:
+            The context manager of the call, a null context without profiler.
+        """
+        if self.profiler is None:
+            return NULL_CONTEXT
+        return self.profiler.call(name, texts)
+
+    def _stage(self, name, call=None):
+        """
+        Time a stage of the current call when the anonymizer has a profiler.
+
+        Args:
+            name (str): The stage.
+            call (CallProfile): The call of a stage running on another thread (default: the call of this thread).
+
+        Returns:
+            The context manager of the stage, a null context without profiler.
+        """
+        if self.profiler is None:
+            return NULL_CONTEXT
+        return self.profiler.stage(name, call)
+
+    def _get_ensemble(self):
+        """
+        Ensemble of the classifiers of the plan sharing their tokenization, created on first use.
+
+        Returns:
+            SharedTokenizationEnsemble: The ensemble, None if no two classifiers share a tokenizer.
+        """
+        classifiers = [classifier for classifier, _ in self.classifier_filtres]
+        ensemble = self._ensemble
+        if ensemble is None or ensemble.classifiers != classifiers:
+            ensemble = SharedTokenizationEnsemble(classifiers, shared_encoder=self.shared_encoder)
+            self._ensemble = ensemble
+        return ensemble if any(len(group) > 1 for group in ensemble.groups) else None
+
+    def _get_model_executor(self):
+        """
+        Thread pool with one thread per model of the plan, created on first use.
+
+        Returns:
+            ThreadPoolExecutor: The thread pool.
+        """
+        with self._model_executor_lock:
+            if self._model_executor is None:
+                self._model_executor = ThreadPoolExecutor(max_workers=len(self.classifier_filtres),
+                                                          thread_name_prefix="hexanonyme-model")
+            return self._model_executor
+
+    def _stream_entities(self, source, window_size=2000, overlap=200, max_tokens=None):
+        """
+        Detect the entities of a text read from a stream, window after window.
+
+        The text is cut into overlapping windows of at most `window_size` characters and `max_tokens` tokens.
+        Each window starts with the last `overlap` characters already processed, as left context. The entities
+        of a window are moved to global offsets and merged with the ones found in the seam of the previous
+        window. A segment of text is yielded as soon as it can no longer contain an entity of the next window,
+        so only about one window of text is held in memory.
+
+        Args:
+            source (str, file-like object or iterable): The text, an open file or an iterable of text chunks.
+            window_size (int): Maximum number of characters of a window (default: 2000).
+            overlap (int): Number of characters shared by two consecutive windows (default: 200).
+            max_tokens (int): Maximum number of tokens of a window (default: None, the maximum input length
+                of the models).
+
+        Yields:
+            tuple: The segment of text, its entities with offsets relative to the segment, and the global offset
+                of the segment.
+        """
+        if not 0 <= overlap < window_size // 2:
+            raise ValueError("overlap must be positive and smaller than half of window_size")
+
+        chunks = iter_chunks(source, chunk_size=window_size)
+        exhausted = False
+        buffer = ""   # Text not yielded yet, starting at global offset `base`
+        context = ""  # End of the text already yielded
+        base = 0
+        carry = []    # Entities of the previous window which were not yielded
+
+        while True:
+            while not exhausted and len(buffer) < window_size:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    buffer += chunk
+
+            last = exhausted and len(buffer) <= window_size
+            if last and not buffer:
+                break
+            window = context + buffer[:window_size]
+            if not last:
+                window = window[:self._cut_window(window, len(context), max_tokens)]
+            window_start = base - len(context)
+            window_end = window_start + len(window)
+
+            # Entities starting in the context are cut, their beginning has already been yielded
+            entities = [shift_entity(entity, window_start, start=base)
+                        for entity in self._detect_entities(window) if entity["end"] + window_start > base]
+            entities = self.merge_overlapping_entities(sorted(carry + entities, key=lambda x: x["start"]))
+            entities = self.drop_duplicates_and_included_entities(entities)
+
+            commit = window_end
+            if not last:
+                # Do not split the text inside or right after an entity, it could go on in the next window
+                commit -= overlap
+                while any(entity["start"] < commit <= entity["end"] for entity in entities):
+                    commit = min(entity["start"] for entity in entities if entity["start"] < commit <= entity["end"])
+                if commit <= base:
+                    commit = window_end
+
+            segment = buffer[:commit - base]
+            yield segment, [shift_entity(entity, -base) for entity in entities if entity["end"] <= commit], base
+
+            carry = [entity for entity in entities if entity["start"] >= commit]
+            context = (context + segment)[-overlap:] if overlap else ""
+            buffer = buffer[commit - base:]
+            base = commit
+            if last:
+                break
+
+    def _cut_window(self, window, min_length, max_tokens=None):
+        """
+        Length of a window cut on a whitespace and within the token limit of the models.
+
+        Args:
+            window (str): The candidate window.
+            min_length (int): The window is kept longer than this length.
+            max_tokens (int): Maximum number of tokens (default: None, the maximum input length of the models).
+
+        Returns:
+            int: The length of the cut window.
+        """
+        cut = len(window)
+
+        tokenizer = next((classifier.tokenizer for classifier, _ in self.classifier_filtres
+                          if getattr(classifier, "tokenizer", None) is not None), None)
+        if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+            if max_tokens is None:
+                max_tokens = min(tokenizer.model_max_length, 100000) - tokenizer.num_special_tokens_to_add()
+            offsets = tokenizer(window, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            if len(offsets) > max_tokens:
+                cut = offsets[max_tokens][0]
+
+        space = max(window.rfind(" ", min_length, cut), window.rfind("\n", min_length, cut))
+        if space > min_length:
+            cut = space
+        return max(cut, min_length + 1)
+
+    def _index_placeholders(self, text, entities, template):
+        """
+        Give an indexed placeholder to each distinct value of the requested entity types.
+
+        Values are numbered by order of first appearance, per entity type if the template contains the label,
+        and a value repeated in the text gets the same placeholder each time.
+
+        Args:
+            text (str): The input text.
+            entities (list): List of dictionaries containing entity information.
+            template (str): Format of the placeholders, with the fields {label} and {index} (e.g. "<{label}_{index}>").
+
+        Returns:
+            dict: The placeholder of each (entity type, value) pair.
+        """
+        placeholders = {}
+        counters = {}
+        for entity in sorted(entities, key=lambda x: x["start"]):
+            label = entity["entity_group"]
+            if label not in self.entities:
+                continue
+            start, end = entity_bounds(text, entity)
+            if (label, text[start:end]) not in placeholders:
+                counter = label if "{label}" in template else None
+                counters[counter] = counters.get(counter, 0) + 1
+                placeholders[(label, text[start:end])] = template.format(label=label, index=counters[counter])
+        return placeholders
+
+    @staticmethod
+    def _group_by_label(entities):
+        """
+        Split a list of entities by label, in a single pass.
+
+        Args:
+            entities (list): A list of dictionaries, where each dictionary represents an entity.
+
+        Returns:
+            dict: The entities of each label, in the order of the list.
+        """
+        entities_by_label = {}
+        for entity in entities:
+            entities_by_label.setdefault(entity["entity_group"], []).append(entity)
+        return entities_by_label
+
     def merge_overlapping_entities(self, entities):
         """
         Merge overlaps over one entity.
@@ -56,80 +582,38 @@ class BaseAnonymizer:
             i = j
         return merged_entities
 
+    def find_patterns(self, text):
+        """
+        Find the entities of every registered pattern (TEL, MAIL, ...) in a single scan of the text.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an entity.
+        """
+        return self.detector.find(text)
+
     def find_telephone_number(self, text):
-        entities = []
-        multiples_regex_formats = ["((?:(?:\+|00)33[\s.-]{0,3}(?:\(0\)[\s.-]{0,3})?|0)[1-9](?:(?:[\s.-]?\d{2}){4}|\d{2}(?:[\s.-]?\d{3}){2}))"]
-        for regex_format in multiples_regex_formats:
-            all_matchs = re.findall(regex_format, text)
-            for match in all_matchs:
-                entity = {
-                    "entity_group": "TEL",
-                    "score": 1,
-                    "word": match,
-                    "start": text.index(match),
-                    "end": text.index(match) + len(match)
-                }
-                entities.append(entity)
-        return entities
+        return self.detector.find(text, labels=["TEL"])
 
     def find_email(self, text):
-        entities = []
-        multiples_regex_formats = ["([a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*)"]
-        for regex_format in multiples_regex_formats:
-            all_matchs = re.findall(regex_format, text)
-            for match in all_matchs:
-                entity = {
-                    "entity_group": "MAIL",
-                    "score": 1,
-                    "word": match,
-                    "start": text.index(match),
-                    "end": text.index(match) + len(match)
-                }
-                entities.append(entity)
-        return entities
+        return self.detector.find(text, labels=["MAIL"])
 
     def drop_duplicates_and_included_entities(self, list_of_dicts):
         """
         Drop duplicate entities and entities included in other entities from a list of dictionaries.
 
+        Nested entities are resolved according to `overlap_strategy` (see `resolve_overlaps`). With the default
+        "longest" strategy the including entity is kept, and the last one among identical entities.
+
         Args:
             list_of_dicts (list): A list of dictionaries, where each dictionary represents an entity.
 
         Returns:
             list: A list of dictionaries, where duplicate entities and entities included in other entities have been dropped.
         """
-
-        # Sort the list by 'start' position
-        list_of_dicts = sorted(list_of_dicts, key=lambda x: x['start'])
-
-        # Define a function to check if one entity is included in another
-        def is_included(entity1, entity2):
-            return entity1['start'] >= entity2['start'] and entity1['end'] <= entity2['end']
-
-        # Initialize a variable to keep track of whether changes were made
-        changes_made = True
-
-        # Continue processing until no more changes are made
-        while changes_made:
-            changes_made = False
-            i = 0
-
-            while i < len(list_of_dicts):
-                current_entity = list_of_dicts[i]
-
-                # Check if the current entity is included in another
-                for j in range(i + 1, len(list_of_dicts)):
-                    if is_included(current_entity, list_of_dicts[j]):
-                        # Remove the current entity from the list
-                        list_of_dicts.pop(i)
-                        changes_made = True
-                        break
-                    elif is_included(list_of_dicts[j], current_entity):
-                        # Remove the other entity (j) if it's included in the current entity
-                        list_of_dicts.pop(j)
-                        changes_made = True
-                        break
-                else:
-                    i += 1
-
-        return list_of_dicts
+        priority = self.model_priority
+        if priority is None:
+            priority = self.models + ["regex"]
+        return resolve_overlaps(list_of_dicts, strategy=self.overlap_strategy, priority=priority)
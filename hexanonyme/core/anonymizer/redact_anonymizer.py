@@ -1,105 +1,211 @@
 from .base_anonymizer import BaseAnonymizer
-import re
+from ..result import AnonymizationResult, LogEntry, restore_text
+from ..rewriter import entity_bounds, repeated_spans, rewrite_spans
 
 class RedactAnonymizer(BaseAnonymizer):
-    def __init__(self, entities=None):
-        super().__init__()
-        self.classifier_filtres = self.load_pipelines()
-
+    def __init__(self, entities=None, registry=None, device=None,
+                 overlap_strategy="longest", model_priority=None, detector=None, concurrent_models=False,
+                 cache=None, cache_sentences=False, backend="torch", shared_tokenization=True, shared_encoder=False,
+                 indexed_placeholders=False, prefilter=None, profiler=None, model_dir=None, safetensors=False):
+        super().__init__(registry=registry, device=device,
+                         overlap_strategy=overlap_strategy, model_priority=model_priority, detector=detector,
+                         concurrent_models=concurrent_models, cache=cache, cache_sentences=cache_sentences,
+                         backend=backend, shared_tokenization=shared_tokenization, shared_encoder=shared_encoder,
+                         prefilter=prefilter, profiler=profiler, model_dir=model_dir, safetensors=safetensors)
         if entities is not None:
           self.entities = entities
 
+        # [REDACTED_1], [REDACTED_2]... instead of [REDACTED], so that redactions can be restored once moved
+        self.indexed_placeholders = indexed_placeholders
+
+        # Only the models which can find one of the requested entities are loaded, by the first call or `warmup`
+        self.build_plan()
+
         # Log of removed PII entities
         self.log_redactions = []
+        self.log_redactions_batch = []
+        # `LogEntry` records of the last call, restored by offsets by `deanonymize`
+        self._last_log = []
 
-    def redact(self, text):
+    def redact(self, text, return_result=False):
         """
         Redact PII entities from the given text.
 
         Args:
             text (str): The input text to be anonymized.
+            return_result (bool): Whether an `AnonymizationResult` holding the text and its own log is returned.
+                The instance attribute `log_redactions` is then left untouched, so the anonymizer can be shared
+                by several threads (default: False).
 
         Returns:
-            str: The text with PII entities redacted.
+            str: The text with PII entities redacted (an `AnonymizationResult` with `return_result`).
         """
 
-        #Get entities from all classifiers
-        entities_total = []
-        for [classifier, filtre] in self.classifier_filtres:
-            # Get entities from both models
-            entities_classifier = classifier(text)
-            # Merge overlapping entities
-            entities_classifier = self.merge_overlapping_entities(entities_classifier)
-            entities_classifier = [entity for entity in entities_classifier if entity["entity_group"] in filtre]
-            entities_total += entities_classifier
+        with self._profile_call("redact", [text]):
+            entities = self._detect_entities(text)
+            redacted_text, log = self._redact_text(text, entities)
+        if return_result:
+            return AnonymizationResult(redacted_text, log)
+
+        self._last_log = log
+        self.log_redactions = self._legacy_log(log)
+        return redacted_text
+
+    def redact_batch(self, texts, batch_size=8, return_result=False):
+        """
+        Redact PII entities from several texts, sending them to the classifiers in batches.
 
-        entities_total += self.find_telephone_number(text)
-        entities_total += self.find_email(text)
+        The redacted texts and their logs are the same as the ones obtained by calling `redact` on each text.
+        The log of each text is stored in `log_redactions_batch`, in the input order.
+
+        Args:
+            texts (iterable): The input texts to be anonymized.
+            batch_size (int): Number of texts sent at once to each classifier (default: 8).
+            return_result (bool): Whether an `AnonymizationResult` is returned for each text, instead of storing the
+                logs in the instance (default: False).
+
+        Returns:
+            list: The texts with PII entities redacted (or their `AnonymizationResult`), in the input order.
+        """
+        texts = list(texts)
+        with self._profile_call("redact_batch", texts):
+            entities_per_text = self._detect_entities_batch(texts, batch_size=batch_size)
+
+            results = [AnonymizationResult(*self._redact_text(text, entities))
+                       for text, entities in zip(texts, entities_per_text)]
+        if return_result:
+            return results
+
+        self.log_redactions_batch = [self._legacy_log(result.log) for result in results]
+        if results:
+            self._last_log = results[-1].log
+            self.log_redactions = self.log_redactions_batch[-1]
+        return [result.text for result in results]
+
+    def redact_stream(self, source, window_size=2000, overlap=200, max_tokens=None):
+        """
+        Redact PII entities from a long text read from a stream, yielding the redacted text piece by piece.
 
-        entities = self.drop_duplicates_and_included_entities(entities_total)
+        The text is processed in overlapping windows so that it never has to be held in memory as a whole and
+        each window fits in the models. `log_redactions` holds positions in the whole text and is complete once
+        the iteration is over.
 
+        Args:
+            source (str, file-like object or iterable): The text, an open file or an iterable of text chunks.
+            window_size (int): Maximum number of characters of a window (default: 2000).
+            overlap (int): Number of characters shared by two consecutive windows (default: 200).
+            max_tokens (int): Maximum number of tokens of a window (default: None, the maximum input length
+                of the models).
+
+        Yields:
+            str: The successive pieces of the redacted text.
+        """
         self.log_redactions = []
+        self._last_log = []
+
+        # One profiled call for the whole stream, lasting until its last piece is read
+        with self._profile_call("redact_stream", [""]):
+            output_start = 0
+            for segment, entities, segment_start in self._stream_entities(source, window_size=window_size,
+                                                                          overlap=overlap, max_tokens=max_tokens):
+                if self.profiler is not None:
+                    self.profiler.count("characters", len(segment))
+                segment, log = self._redact_text(segment, entities)
+                self._last_log.extend(entry.shifted(segment_start, output_start) for entry in log)
+                output_start += len(segment)
+                for redaction in self._legacy_log(log):
+                    redaction["start"] += segment_start
+                    redaction["end"] += segment_start
+                    self.log_redactions.append(redaction)
+                yield segment
+
+    @staticmethod
+    def _legacy_log(log):
+        # Format of `log_redactions`
+        return [{"entity_group": entry.entity_group, "word": entry.original, "start": entry.start, "end": entry.end}
+                for entry in log]
+
+    def _redact_text(self, text, entities):
+        """
+        Redact the requested entity types from a text whose entities have already been detected.
 
-        for entity_type in self.entities:
-            text, redacted_entities = self._redact_entities(text, entities, entity_type)
-            self.log_redactions.extend(redacted_entities)
+        Args:
+            text (str): The input text to be processed.
+            entities (list): List of dictionaries containing entity information.
 
-        self.log_redactions = sorted(self.log_redactions, key=lambda x: x['start'])
-        return text
+        Returns:
+            str: The text with PII entities redacted.
+            list: The `LogEntry` of each removed PII entity, sorted by position.
+        """
+        with self._stage("rewrite"):
+            redacted_entities = []
+            # Split by label once, instead of scanning every entity for each entity type
+            entities_by_label = self._group_by_label(entities)
+            for entity_type in self.entities:
+                redacted_entities.extend(self._redact_entities(text, entities_by_label.get(entity_type, []),
+                                                               entity_type))
+
+            if self.indexed_placeholders:
+                placeholders = self._index_placeholders(text, entities, "[REDACTED_{index}]")
+                spans = [(entity["start"], entity["end"], placeholders[(entity["entity_group"], entity["word"])])
+                         for entity in redacted_entities]
+            else:
+                spans = [(entity["start"], entity["end"], "[REDACTED]") for entity in redacted_entities]
+
+            # Other occurrences of a redacted value are redacted too
+            for start, end, i in repeated_spans(text, spans):
+                redacted_entities.append(dict(redacted_entities[i], start=start, end=end))
+                spans.append((start, end, spans[i][2]))
+            redacted_text, output_offsets = rewrite_spans(text, spans)
+
+            log = [LogEntry(entity["entity_group"], entity["word"], replacement, entity["start"], entity["end"],
+                            *offsets)
+                   for entity, (_, _, replacement), offsets in zip(redacted_entities, spans, output_offsets)
+                   if offsets is not None]
+            log.sort(key=lambda entry: entry.start)
+        if self.profiler is not None:
+            self.profiler.count("entities", len(log))
+        return redacted_text, log
 
     def _redact_entities(self, text, entities, entity_type):
         """
-        Redact specific entity type in the text.
+        Select the entities of a specific entity type to be redacted.
 
         Args:
             text (str): The input text to be processed.
             entities (list): List of dictionaries containing entity information.
+            entity_type (str): The entity type to be redacted.
 
         Returns:
-            str: The text with the specified entities redacted.
-            list: List of removed PII entities with their positions and original values.
+            list: List of PII entities to be removed with their positions and original values.
         """
-        if entity_type in ["ADDRESS", "PER", "DATE", "LOC", "ORG", "MISC", "TEL", "MAIL"]:
+        if entity_type in self.supported_entities:
           entities = [entity for entity in entities if entity["entity_group"]==entity_type]
           redacted_entities = []
 
-          #print(f"Filter entities in _redact_entities function for {entity_type} is {entities}")
           for entity in entities:
-              start = entity["start"]
-              end = entity["end"]
-              word = entity["word"]
+              start, end = entity_bounds(text, entity)
               entity_group = entity["entity_group"]
 
-              # Replace the entity with a redaction marker (e.g., "[REDACTED]")
-              text = re.sub(word, "[REDACTED]", text)
-
               # Log the removed PII entity
-              redacted_entities.append({"entity_group": entity_group, "word": word, "start": start, "end": end})
+              redacted_entities.append({"entity_group": entity_group, "word": text[start:end], "start": start, "end": end})
 
-          return text, redacted_entities
+          return redacted_entities
 
         else:
           raise ValueError(f"Unsupported entity type: {entity_type}")
 
 
-    def deanonymize(self, redacted_text):
+    def deanonymize(self, redacted_text, log=None):
         """
         Restore original PII entities to the redacted text using redactions.
 
         Args:
             redacted_text (str): The redacted text to be deanonymized.
+            log (AnonymizationResult or list): The result of the redaction of this text, or its log
+                (default: None, the log of the last call).
 
         Returns:
             str: The deanonymized text with removed values restored.
         """
-
-        entity_index = 0
-
-        words = redacted_text.split()
-        for i, word in enumerate(words):
-            if '[REDACTED]' in word and entity_index < len(self.log_redactions):
-                words[i] = re.sub(r"\[REDACTED\]", self.log_redactions[entity_index]['word'], word)
-                entity_index += 1
-
-        reconstructed_sentence = ' '.join(words)
-        return reconstructed_sentence
\ No newline at end of file
+        return restore_text(redacted_text, self._last_log if log is None else log)
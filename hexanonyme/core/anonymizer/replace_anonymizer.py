@@ -1,6 +1,8 @@
 from .base_anonymizer import BaseAnonymizer
-from faker import Faker
-import re
+from ..pseudonyms import SCOPES, FakerPool, PseudonymMap
+from ..result import AnonymizationResult, LogEntry, restore_text
+from ..rewriter import entity_bounds, repeated_spans, rewrite_spans
+import threading
 
 
 class ReplaceAnonymizer(BaseAnonymizer):
@@ -11,105 +13,334 @@ class ReplaceAnonymizer(BaseAnonymizer):
         entities (list): List of entity types to be anonymized (default: ["PER", "LOC", "DATE", "ADDRESS"]).
         faker (bool): Whether to use Faker library for fake data generation (default: True).
         replacement_dict (dict): Dictionary of replacement values for specific entity types (default: {}).
+        registry (ModelRegistry): Registry holding the shared NER pipelines (default: the process-wide registry).
+        device (int or str): Device on which the NER models are loaded (default: None, transformers default).
+        overlap_strategy (str): How nested entities are resolved: "longest", "score" or "priority" (default: "longest").
+        model_priority (list): Models (and "regex") from the highest to the lowest priority, used by the "priority"
+            strategy (default: the models in loading order, then the regexes).
+        detector (PatternDetector): Regex detector of TEL, MAIL and the registered patterns (default: the process-wide
+            detector).
+        concurrent_models (bool): Whether the NER models run at the same time on a thread pool instead of one after
+            the other (default: False).
+        cache (EntityCache): Cache of the entities of the texts already seen, e.g. `MemoryCache` or `SqliteCache`
+            (default: None, no cache).
+        cache_sentences (bool): Whether the cache is looked up sentence by sentence, the models then see one
+            sentence at a time (default: False, whole texts).
+        backend (str): Inference backend of the NER models: "torch", "onnx" or "onnx-int8" for ONNX Runtime with
+            dynamic int8 quantization (default: "torch"). The ONNX backends need `pip install hexanonyme[onnx]`.
+        shared_tokenization (bool): Whether the models with the same tokenizer reuse one encoding of each text
+            (default: True). The entities are the same as without it.
+        shared_encoder (bool): Whether models whose encoders have identical weights run the encoder once and only
+            apply their own classification head (default: False).
+        indexed_placeholders (bool): Whether entities are replaced with unique indexed placeholders such as <PER_1>,
+            the same value getting the same placeholder, instead of fake or specified values (default: False).
+            The original values can then be restored even after the placeholders were moved, e.g. by an LLM.
+        pseudonym_scope (str): Scope in which each distinct value is always replaced by the same fake value:
+            "document", "batch" or "global" (default: None, a new fake value for every occurrence).
+        pseudonyms (PseudonymMap or str): Mapping of the "global" scope, or the path of a SQLite file persisting it
+            (default: None, a mapping in memory). Giving it implies the "global" scope.
+        faker_pool_size (int): Number of fake values pre-generated at once per entity type, refilled in the
+            background (default: None, Faker is called for each value).
+        prefilter (PIIPrefilter, bool or float): Screening of the sentences, only the ones which may contain an entity
+            are sent to the models. True or a threshold creates a `PIIPrefilter` (default: None, whole texts).
+        profiler (Profiler): Records the time of each stage, the token and entity counts of each call
+            (default: None, no instrumentation).
+        model_dir (str): Directory holding local copies of the models, each in a subdirectory named after the model
+            with "/" replaced by "--" (e.g. "DioulaD--birdi-finetuned-ner"). Models without a copy are loaded by name
+            (default: None).
+        safetensors (bool): Whether the weights must be read from safetensors files, which are memory-mapped instead
+            of being copied into memory (default: False, the transformers default). Torch backend only.
 
     Attributes:
-        log_replacements (list): List of tuples containing original words and their replacements.
+        log_replacements (list): List of tuples containing original words and their replacements, of the last call
+            without `return_result`.
+        log_replacements_batch (list): One list of replacements per text of the last `replace_batch` call.
     """
 
-    def __init__(self, entities=None, faker=True, replacement_dict=None):
-        super().__init__()
+    def __init__(self, entities=None, faker=True, replacement_dict=None, registry=None, device=None,
+                 overlap_strategy="longest", model_priority=None, detector=None, concurrent_models=False,
+                 cache=None, cache_sentences=False, backend="torch", shared_tokenization=True, shared_encoder=False,
+                 indexed_placeholders=False, pseudonym_scope=None, pseudonyms=None, faker_pool_size=None,
+                 prefilter=None, profiler=None, model_dir=None, safetensors=False):
+        super().__init__(registry=registry, device=device,
+                         overlap_strategy=overlap_strategy, model_priority=model_priority, detector=detector,
+                         concurrent_models=concurrent_models, cache=cache, cache_sentences=cache_sentences,
+                         backend=backend, shared_tokenization=shared_tokenization, shared_encoder=shared_encoder,
+                         prefilter=prefilter, profiler=profiler, model_dir=model_dir, safetensors=safetensors)
         self.faker = faker
         self.replacement_dict = replacement_dict or {}
-        self.classifier_filtres = self.load_pipelines()
-
+        self.indexed_placeholders = indexed_placeholders
         if entities is not None:
           self.entities = entities
 
-        fake_seed = 123
-        Faker.seed(fake_seed)
-        self.fake = Faker('fr_FR')
+        # Only the models which can find one of the requested entities are loaded, by the first call or `warmup`
+        self.build_plan()
+
+        # Faker is imported and its fr_FR provider built on first use
+        self._fake = None
+        self._fake_lock = threading.Lock()
+
+        # Fake values are taken from pools generated in bulk
+        self.faker_pool = None
+        if faker_pool_size:
+            generators = {label: getattr(self, f"_generate_random_{label.lower()}") for label in self.supported_entities
+                          if hasattr(self, f"_generate_random_{label.lower()}")}
+            self.faker_pool = FakerPool(generators, pool_size=faker_pool_size)
+
+        # Consistent pseudonyms: one fake value per distinct original value
+        if pseudonyms is not None and pseudonym_scope is None:
+            pseudonym_scope = "global"
+        if pseudonym_scope is not None and pseudonym_scope not in SCOPES:
+            raise ValueError(f"Unsupported pseudonym scope: {pseudonym_scope}. Expected one of {SCOPES}")
+        self.pseudonym_scope = pseudonym_scope
+        if isinstance(pseudonyms, str):
+            pseudonyms = PseudonymMap(pseudonyms)
+        self.pseudonyms = pseudonyms if pseudonyms is not None else PseudonymMap()
 
         self.log_replacements = []
+        self.log_replacements_batch = []
+        # `LogEntry` records of the last call, restored by offsets by `deanonymize`
+        self._last_log = []
 
 
-    def replace(self, text):
+    @property
+    def fake(self):
+        """
+        Seeded `fr_FR` Faker instance generating the fake values, created on first use.
+        """
+        fake = self._fake
+        if fake is None:
+            with self._fake_lock:
+                if self._fake is None:
+                    from faker import Faker
+
+                    fake_seed = 123
+                    Faker.seed(fake_seed)
+                    self._fake = Faker('fr_FR')
+                fake = self._fake
+        return fake
+
+    @fake.setter
+    def fake(self, fake):
+        self._fake = fake
+
+    def warmup(self, text="Bonjour, je m'appelle Jean Dupont et j'habite à Paris."):
+        """
+        Load the models of the plan and Faker, and run them once, so that the first real call is not slowed down.
+
+        Args:
+            text (str): The text given to the models.
+
+        Returns:
+            ReplaceAnonymizer: The anonymizer itself.
+        """
+        super().warmup(text)
+        if self.faker and self.faker_pool is not None:
+            self.faker_pool.prefill()
+        elif self.faker:
+            self.fake  # Creates the Faker instance
+        return self
+
+    def replace(self, text, return_result=False):
         """
         Replace entities in the given text with fake or specified values.
 
         Args:
             text (str): The input text to be anonymized.
+            return_result (bool): Whether an `AnonymizationResult` holding the text and its own log is returned.
+                The instance attribute `log_replacements` is then left untouched, so the anonymizer can be shared
+                by several threads (default: False).
 
         Returns:
-            str: The anonymized text with entities replaced.
+            str: The anonymized text with entities replaced (an `AnonymizationResult` with `return_result`).
         """
+        with self._profile_call("replace", [text]):
+            tokens = self._detect_entities(text)
+            anonymized_text, log = self._replace_text(text, tokens, self._pseudonym_map())
+        if return_result:
+            return AnonymizationResult(anonymized_text, log)
 
-        # Clear log_replacements before each run
-        self.log_replacements = []
+        self._last_log = log
+        self.log_replacements = [(entry.original, entry.replacement) for entry in log]
+        return anonymized_text
 
-        #Get entities from all classifiers
-        entities_total = []
-        for [classifier, filtre] in self.classifier_filtres:
-            # Get entities from both models
-            entities_classifier = classifier(text)
-            # Merge overlapping entities
-            entities_classifier = self.merge_overlapping_entities(entities_classifier)
-            entities_classifier = [entity for entity in entities_classifier if entity["entity_group"] in filtre]
-            entities_total += entities_classifier
+    def replace_batch(self, texts, batch_size=8, return_result=False):
+        """
+        Replace entities in several texts, sending them to the classifiers in batches.
 
-        entities_total += self.find_telephone_number(text)
-        entities_total += self.find_email(text)
+        The anonymized texts and their logs are the same as the ones obtained by calling `replace` on each
+        text in turn. The log of each text is stored in `log_replacements_batch`, in the input order.
 
-        tokens = self.drop_duplicates_and_included_entities(entities_total)
+        Args:
+            texts (iterable): The input texts to be anonymized.
+            batch_size (int): Number of texts sent at once to each classifier (default: 8).
+            return_result (bool): Whether an `AnonymizationResult` is returned for each text, instead of storing the
+                logs in the instance (default: False).
 
-        for entity_type in self.entities:
-          if entity_type in ["ADDRESS", "PER", "DATE", "LOC", "ORG", "MISC", "TEL", "MAIL"]:
-            text = self._replace_entities(text, tokens, entity_type)
-          else:
-            raise ValueError(f"Unsupported entity type: {entity_type}")
+        Returns:
+            list: The anonymized texts (or their `AnonymizationResult`), in the input order.
+        """
+        texts = list(texts)
+        with self._profile_call("replace_batch", texts):
+            tokens_per_text = self._detect_entities_batch(texts, batch_size=batch_size)
+
+            batch_pseudonyms = self._pseudonym_map()
+            results = []
+            for text, tokens in zip(texts, tokens_per_text):
+                pseudonyms = self._pseudonym_map() if self.pseudonym_scope == "document" else batch_pseudonyms
+                results.append(AnonymizationResult(*self._replace_text(text, tokens, pseudonyms)))
+        if return_result:
+            return results
+
+        self.log_replacements_batch = [[(entry.original, entry.replacement) for entry in result.log]
+                                       for result in results]
+        if results:
+            self._last_log = results[-1].log
+            self.log_replacements = self.log_replacements_batch[-1]
+        return [result.text for result in results]
+
+    def replace_stream(self, source, window_size=2000, overlap=200, max_tokens=None):
+        """
+        Replace entities in a long text read from a stream, yielding the anonymized text piece by piece.
+
+        The text is processed in overlapping windows so that it never has to be held in memory as a whole and
+        each window fits in the models. `log_replacements` is complete once the iteration is over.
+
+        Args:
+            source (str, file-like object or iterable): The text, an open file or an iterable of text chunks.
+            window_size (int): Maximum number of characters of a window (default: 2000).
+            overlap (int): Number of characters shared by two consecutive windows (default: 200).
+            max_tokens (int): Maximum number of tokens of a window (default: None, the maximum input length
+                of the models).
+
+        Yields:
+            str: The successive pieces of the anonymized text.
+        """
+        self.log_replacements = []
+        self._last_log = []
+
+        # The whole stream is one document, and one profiled call lasting until its last piece is read
+        with self._profile_call("replace_stream", [""]):
+            pseudonyms = self._pseudonym_map()
+            output_start = 0
+            for segment, tokens, segment_start in self._stream_entities(source, window_size=window_size,
+                                                                        overlap=overlap, max_tokens=max_tokens):
+                if self.profiler is not None:
+                    self.profiler.count("characters", len(segment))
+                segment, log = self._replace_text(segment, tokens, pseudonyms)
+                self._last_log.extend(entry.shifted(segment_start, output_start) for entry in log)
+                self.log_replacements.extend((entry.original, entry.replacement) for entry in log)
+                output_start += len(segment)
+                yield segment
+
+    def _pseudonym_map(self):
+        """
+        Pseudonym mapping of a new document or batch, according to `pseudonym_scope`.
 
-        return text
+        Returns:
+            PseudonymMap: The global mapping, a new mapping, or None without pseudonym scope.
+        """
+        if self.pseudonym_scope == "global":
+            return self.pseudonyms
+        if self.pseudonym_scope is not None:
+            return PseudonymMap()
+        return None
 
-    def _replace_entities(self, text, entities, entity_type):
+    def _replace_text(self, text, tokens, pseudonyms=None):
         """
-        Replace specific entity type in the text with a replacement value.
+        Replace the requested entity types in a text whose entities have already been detected.
+
+        Args:
+            text (str): The input text to be processed.
+            tokens (list): List of dictionaries containing entity information.
+            pseudonyms (PseudonymMap): Mapping giving the fake value of each distinct original value (default: None,
+                a new fake value for every occurrence).
+
+        Returns:
+            str: The anonymized text with entities replaced.
+            list: The `LogEntry` of each replaced entity, sorted by position.
+        """
+        with self._stage("rewrite"):
+            placeholders = None
+            if self.indexed_placeholders:
+                placeholders = self._index_placeholders(text, tokens, "<{label}_{index}>")
+
+            spans = []
+            entity_groups = []
+            # Split by label once, instead of scanning every entity for each entity type
+            tokens_by_label = self._group_by_label(tokens)
+            for entity_type in self.entities:
+              if entity_type in self.supported_entities:
+                entity_spans = self._replace_entities(text, tokens_by_label.get(entity_type, []), entity_type,
+                                                      placeholders, pseudonyms)
+                spans += entity_spans
+                entity_groups += [entity_type] * len(entity_spans)
+              else:
+                raise ValueError(f"Unsupported entity type: {entity_type}")
+
+            # Other occurrences of a detected value get the same replacement
+            for start, end, i in repeated_spans(text, spans):
+                spans.append((start, end, spans[i][2]))
+                entity_groups.append(entity_groups[i])
+
+            anonymized_text, output_offsets = rewrite_spans(text, spans)
+
+            log = [LogEntry(entity_group, text[start:end], replacement_value, start, end, *offsets)
+                   for (start, end, replacement_value), entity_group, offsets
+                   in zip(spans, entity_groups, output_offsets) if offsets is not None]
+            log.sort(key=lambda entry: entry.start)
+        if self.profiler is not None:
+            self.profiler.count("entities", len(log))
+        return anonymized_text, log
+
+    def _replace_entities(self, text, entities, entity_type, placeholders=None, pseudonyms=None):
+        """
+        Compute the replacement values of a specific entity type.
 
         Args:
             text (str): The input text to be processed.
             entities (list): List of dictionaries containing entity information.
+            entity_type (str): The entity type to be replaced.
+            placeholders (dict): Indexed placeholder of each (entity type, value) pair, used instead of fake or
+                specified values (default: None).
+            pseudonyms (PseudonymMap): Mapping giving the fake value of each distinct original value (default: None).
 
         Returns:
-            str: The text with the specified entities replaced by the corresponding replacement values.
+            list: List of (start, end, replacement value) tuples, one for each entity of the given type.
         """
         # Replace only supplied entity_type values
 
         entities = [entity for entity in entities if entity["entity_group"]==entity_type]
+        spans = []
         for entity in entities:
-            word = entity["word"]
-            if self.faker:
+            start, end = entity_bounds(text, entity)
+            if placeholders is not None:
+                replacement_value = placeholders[(entity["entity_group"], text[start:end])]
+            elif self.faker and pseudonyms is not None:
+                replacement_value = pseudonyms.get(entity_type, text[start:end],
+                                                   lambda: self._get_faker_value(entity_type))
+            elif self.faker:
                 replacement_value = self._get_faker_value(entity["entity_group"])
             else:
                 replacement_value = self.replacement_dict.get(entity["entity_group"], f"<{entity['entity_group']}>")
 
-            # Use regex to replace the word
-            text = re.sub(word, replacement_value, text)
-
-            self.log_replacements.append((word, replacement_value))
+            spans.append((start, end, replacement_value))
 
-        return text
+        return spans
 
-    def deanonymize(self, text):
+    def deanonymize(self, text, log=None):
         """
         Restore original words from the log of replacements in the given text.
 
         Args:
             text (str): The anonymized text to be deanonymized.
+            log (AnonymizationResult or list): The result of the anonymization of this text, or its log
+                (default: None, the log of the last call).
 
         Returns:
             str: The deanonymized text with replaced values restored.
         """
-        for original_word, replacement in self.log_replacements:
-            text = text.replace(replacement, original_word, 1)
-        return text
+        return restore_text(text, self._last_log if log is None else log)
 
     def _generate_random_loc(self):
         """
@@ -188,18 +419,53 @@ class ReplaceAnonymizer(BaseAnonymizer):
         """
         return self.fake.ascii_free_email()
 
+    def _generate_random_iban(self):
+        """
+        Generate a random IBAN using the Faker library.
+
+        Returns:
+            str: A randomly IBAN.
+        """
+        return self.fake.iban()
+
+    def _generate_random_nir(self):
+        """
+        Generate a random social security number using the Faker library.
+
+        Returns:
+            str: A randomly social security number.
+        """
+        return self.fake.ssn()
+
+    def _generate_random_siret(self):
+        """
+        Generate a random SIRET number using the Faker library.
+
+        Returns:
+            str: A randomly SIRET number.
+        """
+        return self.fake.siret()
+
     def _get_faker_value(self, entity_type):
         """
         Generate a random faker entity_type value
 
+        Registered pattern labels without a Faker generator are replaced by their replacement_dict value,
+        or by `<entity_type>`.
+
         Args:
             entity_type (str): The entity type to be generated (PER, LOC, ADDRESS, DATE).
 
         Returns:
             str: The generated random faker value.
         """
-        if entity_type in ["ADDRESS", "PER", "DATE", "LOC", "ORG", "MISC", "TEL", "MAIL"]:
-            function = getattr(self,"_generate_random_{}".format(entity_type.lower()))
-            return function()
+        if entity_type in self.supported_entities:
+            with self._stage("faker"):
+                if self.faker_pool is not None and entity_type in self.faker_pool:
+                    return self.faker_pool.take(entity_type)
+                function = getattr(self,"_generate_random_{}".format(entity_type.lower()), None)
+                if function is None:
+                    return self.replacement_dict.get(entity_type, f"<{entity_type}>")
+                return function()
         else:
             raise ValueError(f"Unsupported entity type: {entity_type}")
\ No newline at end of file
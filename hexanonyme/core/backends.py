@@ -0,0 +1,127 @@
+import os
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Exported graphs are kept here, so a model is exported (and quantized) once per machine
+DEFAULT_ONNX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hexanonyme", "onnx")
+
+ONNX_FILE = "model.onnx"
+QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def onnx_dir(model, root=None):
+    """
+    Directory of the ONNX export of a model.
+
+    Args:
+        model (str): Name or path of the model.
+        root (str): Root directory of the exports (default: $HEXANONYME_ONNX_DIR or ~/.cache/hexanonyme/onnx).
+
+    Returns:
+        str: The directory of the export. A local model which already holds an ONNX graph is its own export.
+    """
+    if os.path.isfile(os.path.join(model, ONNX_FILE)):
+        return model
+    root = root or os.environ.get("HEXANONYME_ONNX_DIR", DEFAULT_ONNX_DIR)
+    return os.path.join(root, model.replace("/", "--"))
+
+
+def _quantization_config():
+    import platform
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    # Dynamic quantization: weights are stored in int8, activations are quantized on the fly
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+
+def export_onnx(model, output_dir=None, quantize=False, local_files_only=False):
+    """
+    Export a token classification model to ONNX, optionally with dynamic int8 quantization.
+
+    The export is skipped if the graph is already in `output_dir`, so this can be run once while online to prepare
+    a machine which then loads the graphs offline.
+
+    Args:
+        model (str): Name or path of the model.
+        output_dir (str): Directory of the export (default: `onnx_dir(model)`).
+        quantize (bool): Whether the quantized graph is produced too (default: False).
+        local_files_only (bool): Whether the model must be read from local files only (default: False).
+
+    Returns:
+        str: The directory of the export, holding the graph, its config and the tokenizer.
+    """
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from transformers import AutoTokenizer
+
+    output_dir = output_dir or onnx_dir(model)
+    if not os.path.isfile(os.path.join(output_dir, ONNX_FILE)):
+        ort_model = ORTModelForTokenClassification.from_pretrained(model, export=True,
+                                                                   local_files_only=local_files_only)
+        ort_model.save_pretrained(output_dir)
+        AutoTokenizer.from_pretrained(model, local_files_only=local_files_only).save_pretrained(output_dir)
+
+    if quantize and not os.path.isfile(os.path.join(output_dir, QUANTIZED_FILE)):
+        quantizer = ORTQuantizer.from_pretrained(output_dir, file_name=ONNX_FILE)
+        quantizer.quantize(save_dir=output_dir, quantization_config=_quantization_config())
+    return output_dir
+
+
+def load_onnx_pipeline(model, task, device=None, quantize=False, local_files_only=None, **kwargs):
+    """
+    Build a `transformers` pipeline running the ONNX graph of a model with ONNX Runtime.
+
+    The model is exported on first use (see `export_onnx`). The pipeline post-processing is the transformers one,
+    so its entities are the same dictionaries as with the torch backend.
+
+    Args:
+        model (str): Name or path of the model.
+        task (str): The pipeline task (e.g. "token-classification").
+        device (int or str): "cuda" or a GPU index runs on the CUDA provider, the CPU provider is used otherwise.
+        quantize (bool): Whether the dynamically quantized int8 graph is used (default: False).
+        local_files_only (bool): Whether the model must be read from local files only (default: None, True when
+            $HF_HUB_OFFLINE is set).
+
+    Returns:
+        Pipeline: The loaded pipeline.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForTokenClassification
+    except ImportError as error:
+        raise ImportError("The ONNX backends require optimum and onnxruntime: pip install hexanonyme[onnx]") from error
+    from transformers import AutoTokenizer, pipeline
+
+    if local_files_only is None:
+        local_files_only = os.environ.get("HF_HUB_OFFLINE", "0") not in ("0", "")
+
+    directory = export_onnx(model, quantize=quantize, local_files_only=local_files_only)
+    provider = "CPUExecutionProvider"
+    if device is not None and (device == "cuda" or str(device).startswith("cuda:") or isinstance(device, int)):
+        provider = "CUDAExecutionProvider"
+
+    ort_model = ORTModelForTokenClassification.from_pretrained(
+        directory, file_name=QUANTIZED_FILE if quantize else ONNX_FILE, provider=provider)
+    tokenizer = AutoTokenizer.from_pretrained(directory)
+    return pipeline(task, model=ort_model, tokenizer=tokenizer, **kwargs)
+
+
+def load_pipeline(model, task, device=None, backend="torch", **kwargs):
+    """
+    Build a pipeline with the requested inference backend. This is the default loader of the model registry.
+
+    Args:
+        model (str): Name or path of the model.
+        task (str): The pipeline task (e.g. "token-classification").
+        device (int or str): Device on which the model is loaded. The backend default is used if None.
+        backend (str): "torch", "onnx" or "onnx-int8" (default: "torch").
+
+    Returns:
+        Pipeline: The loaded pipeline.
+    """
+    if backend == "torch":
+        from .registry import load_transformers_pipeline
+        return load_transformers_pipeline(model, task, device=device, **kwargs)
+    if backend in ("onnx", "onnx-int8"):
+        return load_onnx_pipeline(model, task, device=device, quantize=backend == "onnx-int8", **kwargs)
+    raise ValueError(f"Unsupported backend: {backend}. Expected one of {BACKENDS}")
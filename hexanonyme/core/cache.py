@@ -0,0 +1,265 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(text, signature):
+    """
+    Content address of a text detected with a given configuration.
+
+    Args:
+        text (str): The normalized text.
+        signature (str): Signature of the models, filters, patterns and overlap resolution used to detect it.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the signature and the text.
+    """
+    return hashlib.sha256(f"{signature}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _copy_entities(entities):
+    return [dict(entity) for entity in entities]
+
+
+class EntityCache:
+    """
+    Base class of the caches of detected entities, keyed by `cache_key`.
+
+    Values are the resolved entities of a text (never the fake replacements), with offsets relative to this text.
+    Subclasses implement `_get`, `_put`, `clear` and `__len__`.
+
+    Attributes:
+        hits (int): Number of lookups which found their entities.
+        misses (int): Number of lookups which did not.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks are not picklable, they are created again by `__setstate__`
+        state = self.__dict__.copy()
+        for name in ("_counter_lock", "_lock"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up the entities of a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            list: A copy of the cached entities, None if the key is missing or expired.
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        """
+        Look up the entities of several keys.
+
+        Args:
+            keys (list): The cache keys.
+
+        Returns:
+            list: For each key, a copy of the cached entities or None.
+        """
+        values = [self._get(key) for key in keys]
+        found = sum(value is not None for value in values)
+        with self._counter_lock:
+            self.hits += found
+            self.misses += len(values) - found
+        return values
+
+    def put(self, key, entities):
+        """
+        Store the entities of a key.
+
+        Args:
+            key (str): The cache key.
+            entities (list): The entities, with offsets relative to the cached text.
+        """
+        self.put_many([(key, entities)])
+
+    def put_many(self, items):
+        """
+        Store the entities of several keys.
+
+        Args:
+            items (iterable): (key, entities) pairs.
+        """
+        for key, entities in items:
+            self._put(key, entities)
+
+    def stats(self):
+        """
+        Counters of the cache.
+
+        Returns:
+            dict: The number of hits, misses and entries, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _put(self, key, entities):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryCache(EntityCache):
+    """
+    In-memory LRU cache of detected entities.
+
+    Args:
+        max_entries (int): Maximum number of cached texts (default: 100000). None for no limit.
+        max_bytes (int): Approximate maximum size of the cached entities in bytes (default: None, no limit).
+        ttl (float): Seconds after which an entry expires (default: None, never).
+    """
+
+    def __init__(self, max_entries=100000, max_bytes=None, ttl=None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (expiration, size, entities)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(key, entities):
+        # Rough footprint of the key, the list and the entity dictionaries
+        return len(key) + 64 + sum(240 + len(entity.get("word", "")) for entity in entities)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiration, size, entities = entry
+            if expiration is not None and expiration <= time.monotonic():
+                del self._entries[key]
+                self.size -= size
+                return None
+            self._entries.move_to_end(key)
+        return _copy_entities(entities)
+
+    def _put(self, key, entities):
+        expiration = time.monotonic() + self.ttl if self.ttl is not None else None
+        size = self._size(key, entities)
+        entities = _copy_entities(entities)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (expiration, size, entities)
+            self.size += size
+
+            while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries)
+                                     or (self.max_bytes is not None and self.size > self.max_bytes)):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"MemoryCache(entries={len(self)}, size={self.size}, hits={self.hits}, misses={self.misses})"
+
+
+class SqliteCache(EntityCache):
+    """
+    On-disk cache of detected entities in a SQLite database, persisted across runs and shareable between processes.
+
+    The database is opened in WAL mode and memory-mapped, so lookups of a warm cache are served from the page cache.
+    When `max_entries` is reached, the oldest entries are evicted first.
+
+    Args:
+        path (str): Path of the database file.
+        ttl (float): Seconds after which an entry expires (default: None, never).
+        max_entries (int): Maximum number of cached texts (default: None, no limit).
+        mmap_size (int): Number of bytes of the database memory-mapped by SQLite (default: 256 MiB).
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None, mmap_size=256 * 1024 * 1024):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS entities "
+                                 "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entities_created ON entities (created)")
+
+    def _get(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT value, created FROM entities WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and created + self.ttl <= time.time():
+                self._connection.execute("DELETE FROM entities WHERE key = ?", (key,))
+                return None
+        return json.loads(value)
+
+    def _put(self, key, entities):
+        self.put_many([(key, entities)])
+
+    def put_many(self, items):
+        # One transaction for all the entries of a batch
+        rows = [(key, json.dumps(entities, ensure_ascii=False), time.time()) for key, entities in items]
+        with self._lock:
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.executemany("INSERT OR REPLACE INTO entities (key, value, created) VALUES (?, ?, ?)",
+                                             rows)
+                if self.max_entries is not None:
+                    self._connection.execute("DELETE FROM entities WHERE key IN (SELECT key FROM entities "
+                                             "ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM entities")
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def __repr__(self):
+        return f"SqliteCache(path={self.path!r}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,150 @@
+import re
+import threading
+
+# Patterns must not contain named groups, the label of a match is given by the group of its pattern
+BUILTIN_PATTERNS = {
+    "MAIL": r"[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*",
+    "IBAN": r"\b[A-Z]{2}\d{2}(?:[ ]?[A-Z0-9]{4}){2,7}(?:[ ]?[A-Z0-9]{1,3})?\b",
+    "NIR": r"\b[12][\s.]?\d{2}[\s.]?(?:0[1-9]|1[0-2]|[2-9]\d)[\s.]?(?:\d{2}|2[AB])[\s.]?\d{3}[\s.]?\d{3}(?:[\s.]?\d{2})?\b",
+    "SIRET": r"\b\d{3}[ .]?\d{3}[ .]?\d{3}[ .]?\d{5}\b",
+    "TEL": r"(?:(?:\+|00)33[\s.-]{0,3}(?:\(0\)[\s.-]{0,3})?|0)[1-9](?:(?:[\s.-]?\d{2}){4}|\d{2}(?:[\s.-]?\d{3}){2})",
+}
+
+# Emails are tried before telephone numbers, an email address may start with a number
+DEFAULT_LABELS = ["MAIL", "TEL"]
+
+
+class PatternDetector:
+    """
+    Finds entities with regular expressions in a single scan of the text.
+
+    The patterns of every label are combined into one compiled alternation, scanned once with `finditer`, so
+    each match comes with its exact offsets. When several patterns match at the same position, the first
+    registered one wins.
+
+    Args:
+        labels (list): Labels of built-in patterns (see `BUILTIN_PATTERNS`) registered at creation
+            (default: ["MAIL", "TEL"]).
+    """
+
+    def __init__(self, labels=None):
+        self._patterns = {}
+        self._regex = None
+        self._lock = threading.Lock()
+
+        for label in (DEFAULT_LABELS if labels is None else labels):
+            self.register(label)
+
+    def __getstate__(self):
+        # A lock cannot be pickled, a detector sent to worker processes gets a new one
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def labels(self):
+        """
+        Labels of the registered patterns, by order of precedence.
+        """
+        return list(self._patterns)
+
+    @property
+    def signature(self):
+        """
+        Description of the registered patterns and their order, which changes whenever they do.
+        """
+        return repr(list(self._patterns.items()))
+
+    def register(self, label, pattern=None, flags=0, first=False):
+        """
+        Register the pattern of a label, replacing any previous pattern of this label.
+
+        Args:
+            label (str): The entity label (e.g. "IBAN"). It must be a valid Python identifier.
+            pattern (str): The regular expression, without named groups (default: the built-in pattern of the label).
+            flags (int): Regular expression flags applied to this pattern only (default: 0).
+            first (bool): Whether the pattern is tried before the already registered ones (default: False).
+        """
+        if pattern is None:
+            if label not in BUILTIN_PATTERNS:
+                raise ValueError(f"No built-in pattern for {label}. Expected one of {list(BUILTIN_PATTERNS)}")
+            pattern = BUILTIN_PATTERNS[label]
+        if not label.isidentifier():
+            raise ValueError(f"Invalid label: {label}")
+
+        with self._lock:
+            patterns = {key: value for key, value in self._patterns.items() if key != label}
+            if first:
+                patterns = {label: (pattern, flags), **patterns}
+            else:
+                patterns[label] = (pattern, flags)
+            self._compile(patterns)
+
+    def unregister(self, label):
+        """
+        Remove the pattern of a label.
+
+        Args:
+            label (str): The entity label.
+        """
+        with self._lock:
+            self._compile({key: value for key, value in self._patterns.items() if key != label})
+
+    def _compile(self, patterns):
+        alternatives = []
+        for label, (pattern, flags) in patterns.items():
+            # Flags are scoped to the pattern with an inline group
+            inline_flags = "".join(letter for flag, letter in [(re.IGNORECASE, "i"), (re.MULTILINE, "m"),
+                                                               (re.DOTALL, "s"), (re.VERBOSE, "x")] if flags & flag)
+            if inline_flags:
+                pattern = f"(?{inline_flags}:{pattern})"
+            alternatives.append(f"(?P<{label}>{pattern})")
+
+        regex = re.compile("|".join(alternatives)) if alternatives else None
+        self._patterns, self._regex = patterns, regex
+
+    def find(self, text, labels=None):
+        """
+        Find the entities of the registered patterns in a text.
+
+        Args:
+            text (str): The input text.
+            labels (list): Only the entities of these labels are returned (default: None, every label).
+
+        Returns:
+            list: A list of dictionaries, where each dictionary represents an entity, sorted by position.
+        """
+        regex = self._regex
+        if regex is None:
+            return []
+
+        entities = []
+        for match in regex.finditer(text):
+            label = match.lastgroup
+            if labels is None or label in labels:
+                entities.append({
+                    "entity_group": label,
+                    "score": 1,
+                    "source": "regex",
+                    "word": match.group(),
+                    "start": match.start(),
+                    "end": match.end()
+                })
+        return entities
+
+
+default_detector = PatternDetector()
+
+
+def get_detector():
+    """
+    Get the pattern detector shared by the anonymizers created without an explicit detector.
+
+    Returns:
+        PatternDetector: The process-wide pattern detector.
+    """
+    return default_detector
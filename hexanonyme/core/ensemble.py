@@ -0,0 +1,161 @@
+import hashlib
+
+
+def tokenizer_signature(tokenizer):
+    """
+    Hash of everything which determines the encodings of a tokenizer: its class, vocabulary, normalization,
+    pre-tokenization, special tokens and maximum length.
+
+    Args:
+        tokenizer (PreTrainedTokenizerBase): The tokenizer.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest. Two tokenizers with the same signature encode a text identically.
+    """
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # Serialization of the fast tokenizer: vocabulary, normalizer, pre-tokenizer and post-processor
+        description = backend.to_str()
+    else:
+        description = repr(sorted(tokenizer.get_vocab().items()))
+    description += repr((type(tokenizer).__name__, tokenizer.model_max_length, tokenizer.padding_side,
+                         tokenizer.truncation_side, tokenizer.all_special_tokens))
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def _is_token_classification_pipeline(classifier):
+    try:
+        from transformers import TokenClassificationPipeline
+    except ImportError:
+        return False
+    return isinstance(classifier, TokenClassificationPipeline)
+
+
+def _same_encoder(model, other):
+    import torch
+
+    if type(model.base_model) is not type(other.base_model):
+        return False
+    state, other_state = model.base_model.state_dict(), other.base_model.state_dict()
+    return state.keys() == other_state.keys() and all(torch.equal(state[key], other_state[key]) for key in state)
+
+
+class SharedTokenizationEnsemble:
+    """
+    Runs several token classification pipelines over the same text with a single tokenization.
+
+    Pipelines are grouped by tokenizer signature (see `tokenizer_signature`). The text is encoded once per group by
+    the pipeline preprocessing, and the encodings (with their offset mappings) are given to the forward pass and the
+    post-processing of every pipeline of the group, so the entities are the same as when each pipeline is called.
+    Classifiers which are not transformers token classification pipelines are called as usual.
+
+    With `shared_encoder`, pipelines of a group whose encoders have identical weights (several classification heads
+    fine-tuned on a frozen encoder) run the encoder once and only apply their own head.
+
+    Args:
+        classifiers (list): The pipelines, in the order of their outputs.
+        shared_encoder (bool): Whether identical encoders are run once (default: False).
+
+    Attributes:
+        groups (list): Indexes of the classifiers sharing a tokenization, one list per tokenizer. Classifiers which
+            cannot share it are alone in their group.
+    """
+
+    def __init__(self, classifiers, shared_encoder=False):
+        self.classifiers = list(classifiers)
+        self.shared_encoder = shared_encoder
+
+        groups = {}
+        for i, classifier in enumerate(self.classifiers):
+            if _is_token_classification_pipeline(classifier) and classifier.tokenizer.is_fast:
+                groups.setdefault(tokenizer_signature(classifier.tokenizer), []).append(i)
+            else:
+                groups[i] = [i]
+        self.groups = list(groups.values())
+
+        # Within a group, classifiers sharing the encoder of the first one of their subgroup
+        self.encoder_groups = []
+        for group in self.groups:
+            subgroups = []
+            for i in group:
+                model = getattr(self.classifiers[i], "model", None)
+                for subgroup in subgroups:
+                    first = self.classifiers[subgroup[0]].model
+                    if shared_encoder and hasattr(model, "classifier") and hasattr(first, "classifier") \
+                            and _same_encoder(first, model):
+                        subgroup.append(i)
+                        break
+                else:
+                    subgroups.append([i])
+            self.encoder_groups.append(subgroups)
+
+    def __call__(self, text, executor=None):
+        """
+        Classify the tokens of a text with every pipeline.
+
+        Args:
+            text (str): The input text.
+            executor (Executor): If given, the forward passes of the encoder groups run on it (default: None).
+
+        Returns:
+            list: The entities found by each pipeline, in the order of the classifiers.
+        """
+        tasks = []
+        for group, subgroups in zip(self.groups, self.encoder_groups):
+            first = self.classifiers[group[0]]
+            if len(group) == 1 or not _is_token_classification_pipeline(first):
+                tasks.append((group, None))
+                continue
+            preprocess_params, _, _ = first._sanitize_parameters()
+            preprocess_params = {**first._preprocess_params, **preprocess_params}
+            encodings = list(first.preprocess(text, **preprocess_params))
+            tasks.extend((subgroup, encodings) for subgroup in subgroups)
+
+        run = lambda task: self._run(text, *task)
+        results = executor.map(run, tasks) if executor is not None and len(tasks) > 1 else map(run, tasks)
+
+        outputs = [None] * len(self.classifiers)
+        for indexes, entities_per_classifier in results:
+            for i, entities in zip(indexes, entities_per_classifier):
+                outputs[i] = entities
+        return outputs
+
+    def _run(self, text, indexes, encodings):
+        if encodings is None:
+            return indexes, [self.classifiers[i](text) for i in indexes]
+
+        pipelines = [self.classifiers[i] for i in indexes]
+        model_outputs = [[] for _ in pipelines]
+        for model_inputs in encodings:
+            if len(pipelines) == 1:
+                # The forward pass pops the metadata of the encodings, it is given a copy
+                model_outputs[0].append(pipelines[0].forward(dict(model_inputs)))
+            else:
+                for outputs, output in zip(model_outputs, self._forward_shared_encoder(pipelines, model_inputs)):
+                    outputs.append(output)
+
+        entities = []
+        for pipeline, outputs in zip(pipelines, model_outputs):
+            _, _, postprocess_params = pipeline._sanitize_parameters()
+            entities.append(pipeline.postprocess(outputs, **{**pipeline._postprocess_params, **postprocess_params}))
+        return indexes, entities
+
+    @staticmethod
+    def _forward_shared_encoder(pipelines, model_inputs):
+        # Same outputs as `TokenClassificationPipeline._forward`, with the encoder run once for every head
+        import torch
+
+        model_inputs = dict(model_inputs)
+        metadata = {key: model_inputs.pop(key, None) for key in ("special_tokens_mask", "offset_mapping", "sentence",
+                                                                  "is_last", "word_ids", "word_to_chars_map")}
+        first = pipelines[0]
+        with first.device_placement(), torch.no_grad():
+            inputs = first._ensure_tensor_on_device(model_inputs, device=first.device)
+            hidden_states = first.model.base_model(**inputs)[0]
+
+            outputs = []
+            for pipeline in pipelines:
+                head = pipeline.model
+                logits = head.classifier(head.dropout(hidden_states) if hasattr(head, "dropout") else hidden_states)
+                outputs.append({"logits": logits.to("cpu"), **metadata, **model_inputs})
+        return outputs
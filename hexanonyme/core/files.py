@@ -0,0 +1,368 @@
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+
+from .parallel import CorpusRunner
+
+FORMATS = ("jsonl", "csv", "parquet", "txt")
+
+# File extensions of each format
+EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet", ".txt": "txt"}
+
+
+def detect_format(path):
+    """
+    Format of a file from its extension.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: "jsonl", "csv", "parquet" or "txt".
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Cannot guess the format of {path}, expected one of {FORMATS}")
+    return EXTENSIONS[extension]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Parquet files need pyarrow: pip install hexanonyme[parquet]") from error
+    return pyarrow
+
+
+def read_records(path, file_format, chunk_size=1000):
+    """
+    Read the records of a file one by one, without loading the whole file.
+
+    Args:
+        path (str): Path of the file, "-" for the standard input (except Parquet).
+        file_format (str): "jsonl", "csv", "parquet" or "txt".
+        chunk_size (int): Number of rows read at once from a Parquet file (default: 1000).
+
+    Yields:
+        dict or str: Each record, a dictionary (a line for "txt").
+    """
+    if file_format == "parquet":
+        pyarrow = _import_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield from batch.to_pylist()
+        return
+
+    file = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="" if file_format == "csv" else None)
+    try:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        elif file_format == "jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for line in file:
+                yield line.rstrip("\n")
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+class RecordWriter:
+    """
+    Writes records to a file as they come.
+
+    Args:
+        path (str): Path of the file, "-" for the standard output (except Parquet).
+        file_format (str): "jsonl", "csv", "parquet" or "txt".
+        append (bool): Whether records are appended to an existing file, e.g. when resuming (default: False).
+        chunk_size (int): Number of rows of each Parquet row group (default: 1000).
+    """
+
+    def __init__(self, path, file_format, append=False, chunk_size=1000):
+        if file_format == "parquet" and append:
+            raise ValueError("Parquet files cannot be appended to")
+        self.path = path
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self._csv_writer = None
+        self._write_header = not append
+        self._rows = []
+        self._parquet_writer = None
+
+        if file_format == "parquet":
+            self.file = None
+        elif path == "-":
+            self.file = sys.stdout
+        else:
+            self.file = open(path, "a" if append else "w", encoding="utf-8",
+                             newline="" if file_format == "csv" else None)
+
+    def write(self, record):
+        if self.file_format == "jsonl":
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif self.file_format == "txt":
+            self.file.write(record + "\n")
+        elif self.file_format == "csv":
+            if self._csv_writer is None:
+                self._csv_writer = csv.DictWriter(self.file, fieldnames=list(record))
+                if self._write_header:
+                    self._csv_writer.writeheader()
+            self._csv_writer.writerow(record)
+        else:
+            self._rows.append(record)
+            if len(self._rows) >= self.chunk_size:
+                self._write_row_group()
+
+    def _write_row_group(self):
+        pyarrow = _import_pyarrow()
+        table = pyarrow.Table.from_pylist(self._rows)
+        if self._parquet_writer is None:
+            self._parquet_writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        self._rows = []
+
+    def flush(self):
+        """
+        Write the buffered records to the disk.
+
+        Returns:
+            int: Size of the file in bytes (None for Parquet and the standard output).
+        """
+        if self.file is None or self.file is sys.stdout:
+            if self.file is not None:
+                self.file.flush()
+            return None
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        if self.file_format == "parquet":
+            if self._rows:
+                self._write_row_group()
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+        elif self.file is not sys.stdout:
+            self.file.close()
+
+
+def _get_field(record, field):
+    if field in record:
+        return record[field]
+    # Dotted path of a nested field, e.g. "author.name"
+    value = record
+    for key in field.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _set_field(record, field, value):
+    if field in record or "." not in field:
+        record[field] = value
+        return
+    *parents, key = field.split(".")
+    for parent in parents:
+        record = record[parent]
+    record[key] = value
+
+
+def _log_entries(log):
+    return [{"entity_group": entry.entity_group, "original": entry.original, "replacement": entry.replacement,
+             "start": entry.start, "end": entry.end, "output_start": entry.output_start,
+             "output_end": entry.output_end} for entry in log]
+
+
+class _Checkpoint:
+    # Number of records written and sizes of the output files, saved atomically
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def save(self, state):
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _truncate(path, size):
+    with open(path, "r+b") as file:
+        file.truncate(size)
+
+
+class FileStats:
+    """
+    Progress of a file anonymization.
+
+    Attributes:
+        records (int): Number of records processed, including the ones processed before a resume.
+        skipped (int): Number of records processed before the checkpoint and not anonymized again.
+        errors (int): Number of records dropped because one of their fields could not be anonymized.
+        corpus (CorpusStats): Progress of the anonymization of the fields.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.skipped = 0
+        self.errors = 0
+        self.corpus = None
+
+    def __repr__(self):
+        return f"FileStats(records={self.records}, skipped={self.skipped}, errors={self.errors}, corpus={self.corpus})"
+
+
+def anonymize_file(input_path, output_path, fields=("text",), input_format=None, output_format=None, mode="replace",
+                   log_path=None, checkpoint_path=None, checkpoint_every=1000, chunk_size=1000, workers=1,
+                   executor=None, shard_size=32, batch_size=8, progress=None, **anonymizer_kwargs):
+    """
+    Anonymize some fields of the records of a file, streaming the records from the input file to the output file.
+
+    Records are read lazily and anonymized in parallel by a `CorpusRunner`, then written in the input order as soon
+    as all their fields are anonymized, so memory does not grow with the file. A record whose field fails is dropped
+    and counted in the errors, it is never written with its original values.
+
+    With a checkpoint, the number of records written and the size of the output files are saved every
+    `checkpoint_every` records. Running again with the same checkpoint truncates the outputs to the last checkpoint
+    and resumes after its records. The checkpoint is removed once the file is complete.
+
+    Args:
+        input_path (str): Path of the input file, "-" for the standard input (except Parquet).
+        output_path (str): Path of the output file, "-" for the standard output (except Parquet).
+        fields (list): Fields (JSONL, Parquet) or columns (CSV) to anonymize, nested JSON fields as dotted paths.
+            Ignored for text files, where every line is anonymized (default: ["text"]).
+        input_format (str): "jsonl", "csv", "parquet" or "txt" (default: from the extension of the input file).
+        output_format (str): Format of the output file (default: from its extension, else the input format).
+        mode (str): "replace" or "redact" (default: "replace").
+        log_path (str): Path of a JSONL file receiving the log of each anonymized field (default: None). It holds
+            the original values and must be protected like the input.
+        checkpoint_path (str): Path of the checkpoint file (default: None, no checkpoint).
+        checkpoint_every (int): Number of records between two checkpoints (default: 1000).
+        chunk_size (int): Number of rows read at once and of each row group of Parquet files (default: 1000).
+        workers (int): Number of workers (default: 1).
+        executor (str): "process" or "thread" (default: "thread" with one worker, else "process").
+        shard_size (int): Number of fields sent at once to a worker (default: 32).
+        batch_size (int): Batch size of the NER pipelines (default: 8).
+        progress (callable): Called with the `CorpusStats` after each shard (default: None).
+        **anonymizer_kwargs: Arguments of `ReplaceAnonymizer` or `RedactAnonymizer` (e.g. entities).
+
+    Returns:
+        FileStats: Number of records processed, skipped and dropped.
+    """
+    input_format = input_format or detect_format(input_path)
+    if output_format is None:
+        output_format = detect_format(output_path) if output_path != "-" else input_format
+    for file_format in (input_format, output_format):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported format: {file_format}. Expected one of {FORMATS}")
+    if (input_format == "txt") != (output_format == "txt"):
+        raise ValueError("Text files can only be converted to text files")
+    if checkpoint_path is not None and (output_format == "parquet" or output_path == "-"):
+        raise ValueError("Checkpoints need an output file which can be appended to (JSONL, CSV or text)")
+    fields = list(fields)
+
+    checkpoint = _Checkpoint(checkpoint_path)
+    state = checkpoint.load()
+    stats = FileStats()
+    if state is not None:
+        # Everything written after the last checkpoint is written again
+        _truncate(output_path, state["output_size"])
+        if log_path is not None and state.get("log_size") is not None:
+            _truncate(log_path, state["log_size"])
+        stats.skipped = stats.records = state["records"]
+
+    records = read_records(input_path, input_format, chunk_size=chunk_size)
+    records = itertools.islice(records, stats.skipped, None)
+
+    writer = RecordWriter(output_path, output_format, append=state is not None, chunk_size=chunk_size)
+    log_file = None
+    if log_path is not None:
+        log_file = open(log_path, "a" if state is not None else "w", encoding="utf-8")
+
+    # Records waiting for the anonymization of their fields: [record, fields, pending fields, results]
+    pending = deque()
+
+    def texts():
+        for record in records:
+            if input_format == "txt":
+                record_fields = [None]
+                values = [record]
+            else:
+                record_fields = [field for field in fields if isinstance(_get_field(record, field), str)]
+                values = [_get_field(record, field) for field in record_fields]
+            pending.append([record, record_fields, len(record_fields), []])
+            yield from values
+
+    def write_completed():
+        while pending and pending[0][2] == 0:
+            record, record_fields, _, results = pending.popleft()
+            index = stats.records
+            stats.records += 1
+            errors = [result.error for result in results if result.error is not None]
+            if errors:
+                stats.errors += 1
+                if log_file is not None:
+                    log_file.write(json.dumps({"record": index, "error": errors[0]}, ensure_ascii=False) + "\n")
+            else:
+                if input_format == "txt":
+                    record = results[0].text
+                for field, result in zip(record_fields, results):
+                    if field is not None:
+                        _set_field(record, field, result.text)
+                writer.write(record)
+                if log_file is not None:
+                    for field, result in zip(record_fields, results):
+                        log_file.write(json.dumps({"record": index, "field": field, "log": _log_entries(result.log)},
+                                                  ensure_ascii=False) + "\n")
+
+            # Failed records count towards the checkpoints too, so a resume never replays more than checkpoint_every
+            if checkpoint_path is not None and stats.records % checkpoint_every == 0:
+                save_checkpoint()
+
+    def save_checkpoint():
+        log_size = None
+        if log_file is not None:
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            log_size = log_file.tell()
+        checkpoint.save({"records": stats.records, "output_size": writer.flush(), "log_size": log_size})
+
+    if executor is None:
+        executor = "thread" if workers == 1 else "process"
+    runner = CorpusRunner(mode=mode, workers=workers, executor=executor, shard_size=shard_size,
+                          batch_size=batch_size, progress=progress, **anonymizer_kwargs)
+    try:
+        for result in runner.run(texts()):
+            # Records without text to anonymize are written as soon as they are at the head
+            write_completed()
+            pending[0][3].append(result)
+            pending[0][2] -= 1
+            write_completed()
+        write_completed()
+    finally:
+        writer.close()
+        if log_file is not None:
+            log_file.close()
+        stats.corpus = runner.stats
+
+    if checkpoint_path is not None:
+        checkpoint.remove()
+    return stats
@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+import math
+
+STRATEGIES = ("longest", "score", "priority")
+
+# From this number of entities, the "longest" strategy is resolved on NumPy arrays (see `SpanTable`)
+COLUMNAR_MIN_ENTITIES = 256
+
+
+def resolve_overlaps(entities, strategy="longest", priority=None):
+    """
+    Drop duplicate entities and entities included in other entities.
+
+    Entities which only partially overlap are all kept. When two entities are nested, the one kept depends
+    on the strategy:
+        - "longest": the including entity. Among identical spans, the last one of the list is kept.
+        - "score": the entity with the highest score, then the longest one.
+        - "priority": the entity whose "source" comes first in `priority`, then the longest one.
+    Remaining ties are broken in favour of the last entity of the list.
+
+    The entities are sorted once, then "longest" is resolved in a single linear scan and the other strategies
+    with a binary search in the sorted list of kept entities, instead of repeated pairwise comparisons. Long lists
+    are resolved with "longest" by vectorized NumPy operations instead.
+
+    Args:
+        entities (list): A list of dictionaries, where each dictionary represents an entity.
+        strategy (str): How nested entities are resolved (default: "longest").
+        priority (list): Sources from the highest to the lowest priority, used by the "priority" strategy.
+            Sources which are not listed come last.
+
+    Returns:
+        list: The kept entities, sorted by start position.
+    """
+    if strategy == "longest":
+        if len(entities) >= COLUMNAR_MIN_ENTITIES:
+            from .spans import SpanTable
+            return SpanTable.from_entities(entities).resolve_longest().to_entities()
+        return _resolve_longest(entities)
+    elif strategy == "score":
+        rank = lambda i: (-entities[i]["score"], _length(entities[i]), -i)
+    elif strategy == "priority":
+        priority = {source: position for position, source in enumerate(priority or [])}
+        rank = lambda i: (priority.get(entities[i].get("source"), len(priority)), _length(entities[i]), -i)
+    else:
+        raise ValueError(f"Unsupported overlap strategy: {strategy}. Expected one of {STRATEGIES}")
+
+    # Kept entities are never nested, so sorted by start they are also sorted by end
+    kept = []
+    for i in sorted(range(len(entities)), key=rank):
+        start, end = entities[i]["start"], entities[i]["end"]
+
+        # Last kept entity starting before: it includes the current one if it ends after
+        position = bisect_right(kept, (start, math.inf))
+        if position > 0 and kept[position - 1][1] >= end:
+            continue
+        # First kept entity starting after: it is included in the current one if it ends before
+        position = bisect_left(kept, (start,))
+        if position < len(kept) and kept[position][1] <= end:
+            continue
+
+        kept.insert(position, (start, end, i))
+    return [entities[i] for _, _, i in kept]
+
+
+def _length(entity):
+    # Negated so that the longest entities come first in ascending sorts
+    return entity["start"] - entity["end"]
+
+
+def _resolve_longest(entities):
+    # Sorted by start then longest first, so an entity is included in a previous one iff one of them ends after it
+    order = sorted(range(len(entities)), key=lambda i: (entities[i]["start"], -entities[i]["end"], -i))
+
+    kept = []
+    max_end = None
+    for i in order:
+        if max_end is None or entities[i]["end"] > max_end:
+            kept.append(entities[i])
+            max_end = entities[i]["end"]
+    return kept
@@ -0,0 +1,288 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+MODES = ("replace", "redact")
+
+# Anonymizer of the current worker, created once by the pool initializer
+_worker = threading.local()
+
+
+class CorpusResult:
+    """
+    Anonymization result of one document of a corpus.
+
+    Attributes:
+        index (int): Position of the document in the input.
+        text (str): The anonymized text, None if the document failed.
+        log (list): The `LogEntry` of each anonymized entity of the document, None if the document failed.
+        error (str): The error raised by the document, None if it succeeded.
+    """
+    __slots__ = ("index", "text", "log", "error")
+
+    def __init__(self, index, text=None, log=None, error=None):
+        self.index = index
+        self.text = text
+        self.log = log
+        self.error = error
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"CorpusResult(index={self.index}, error={self.error!r})"
+        return f"CorpusResult(index={self.index}, text={self.text!r})"
+
+
+class CorpusStats:
+    """
+    Progress of a corpus run.
+
+    Attributes:
+        documents (int): Number of documents processed.
+        errors (int): Number of documents which failed.
+        characters (int): Number of characters of the processed documents.
+        elapsed (float): Seconds since the start of the run.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.errors = 0
+        self.characters = 0
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def docs_per_second(self):
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"CorpusStats(documents={self.documents}, errors={self.errors}, "
+                f"elapsed={self.elapsed:.2f}s, docs_per_second={self.docs_per_second:.1f})")
+
+
+def _init_worker(mode, anonymizer_kwargs, torch_threads):
+    from .anonymizer.redact_anonymizer import RedactAnonymizer
+    from .anonymizer.replace_anonymizer import ReplaceAnonymizer
+
+    anonymizer_class = ReplaceAnonymizer if mode == "replace" else RedactAnonymizer
+    _worker.mode = mode
+    try:
+        # Workers are long-lived: the models are loaded and run once now rather than by the first shard
+        _worker.anonymizer = anonymizer_class(**anonymizer_kwargs).warmup()
+        _worker.error = None
+    except Exception as error:
+        # Kept for `_check_worker`: an initializer which raises only breaks the pool, without the error
+        _worker.error = error
+        return
+
+    # Regex only anonymizers never import torch, there is nothing to configure then
+    if torch_threads is not None and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(torch_threads)
+
+
+def _check_worker():
+    if _worker.error is not None:
+        raise _worker.error
+
+
+def _anonymize_shard(items, batch_size):
+    _check_worker()
+    anonymizer = _worker.anonymizer
+    if _worker.mode == "replace":
+        anonymize_batch, anonymize = anonymizer.replace_batch, anonymizer.replace
+    else:
+        anonymize_batch, anonymize = anonymizer.redact_batch, anonymizer.redact
+
+    indexes = [index for index, _ in items]
+    try:
+        results = anonymize_batch([text for _, text in items], batch_size=batch_size, return_result=True)
+        return [CorpusResult(index, result.text, result.log) for index, result in zip(indexes, results)]
+    except Exception:
+        pass
+
+    # The batch failed, documents are anonymized one by one so that only the faulty ones are reported
+    results = []
+    for index, text in items:
+        try:
+            result = anonymize(text, return_result=True)
+            results.append(CorpusResult(index, result.text, result.log))
+        except Exception as error:
+            results.append(CorpusResult(index, error=f"{type(error).__name__}: {error}"))
+    return results
+
+
+class CorpusRunner:
+    """
+    Anonymizes a corpus in parallel with a pool of worker processes (or threads).
+
+    Every worker creates its own anonymizer, and so loads the models, once. Documents are sent to the workers in
+    shards which are anonymized with the batched API. Results are yielded in the input order. At most
+    `max_pending` shards are in flight, so the input is read lazily and memory does not grow with the corpus.
+
+    A document raising an exception is reported in its result without stopping the run. Errors starting the
+    workers, such as invalid anonymizer arguments, are raised by `run` before any document is sent. If a worker
+    process dies, the pool is restarted and the documents of every shard in flight are anonymized again one at a
+    time, so that a document is only reported as failed once it has killed a worker by itself.
+
+    Args:
+        mode (str): "replace" or "redact" (default: "replace").
+        workers (int): Number of worker processes or threads (default: the number of CPUs).
+        executor (str): "process" or "thread" (default: "process"). Threads share the models of the registry.
+        shard_size (int): Number of documents sent at once to a worker (default: 32).
+        batch_size (int): Batch size of the NER pipelines in the workers (default: 8).
+        max_pending (int): Maximum number of shards in flight (default: twice the number of workers).
+        torch_threads (int): Number of torch threads of each worker (default: the number of CPUs divided by
+            the number of workers).
+        start_method (str): Start method of the worker processes (default: "spawn").
+        progress (callable): Called with the `CorpusStats` after each shard (default: None).
+        **anonymizer_kwargs: Arguments of `ReplaceAnonymizer` or `RedactAnonymizer` (e.g. entities). With
+            processes they are pickled, so they cannot hold a registry or a SQLite cache.
+
+    Attributes:
+        stats (CorpusStats): Progress of the current or last run.
+    """
+
+    def __init__(self, mode="replace", workers=None, executor="process", shard_size=32, batch_size=8,
+                 max_pending=None, torch_threads=None, start_method="spawn", progress=None, **anonymizer_kwargs):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported mode: {mode}. Expected one of {MODES}")
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unsupported executor: {executor}. Expected 'process' or 'thread'")
+        if executor == "process":
+            # The arguments are pickled to every worker, better fail now than in the pool initializer
+            try:
+                pickle.dumps(anonymizer_kwargs)
+            except Exception as error:
+                raise ValueError(f"The anonymizer arguments cannot be sent to worker processes ({error}), "
+                                 f"use executor='thread' or arguments which can be pickled") from error
+
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.shard_size = shard_size
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * self.workers
+        if torch_threads is None and executor == "process":
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.torch_threads = torch_threads
+        self.start_method = start_method
+        self.progress = progress
+        self.anonymizer_kwargs = anonymizer_kwargs
+        self.stats = CorpusStats()
+
+    def _create_executor(self):
+        initargs = (self.mode, self.anonymizer_kwargs, self.torch_threads)
+        if self.executor == "thread":
+            executor = ThreadPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs)
+        else:
+            executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(self.start_method),
+                                           initializer=_init_worker, initargs=initargs)
+        # A pool whose workers cannot start fails the run now with its error, before any document is blamed for it
+        try:
+            executor.submit(_check_worker).result()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor
+
+    def run(self, texts):
+        """
+        Anonymize the documents of a corpus.
+
+        Args:
+            texts (iterable): The documents, read lazily.
+
+        Yields:
+            CorpusResult: The result of each document, in the input order.
+        """
+        self.stats = CorpusStats()
+        items = enumerate(texts)
+        shards = iter(lambda: list(itertools.islice(items, self.shard_size)), [])
+
+        executor = self._create_executor()
+        pending = deque()
+
+        def submit(shard):
+            try:
+                future = executor.submit(_anonymize_shard, shard, self.batch_size)
+            except BrokenProcessPool as error:
+                # The pool broke on a previous shard, this one is recovered when it reaches the head of the queue
+                future = Future()
+                future.set_exception(error)
+            pending.append((shard, future))
+
+        try:
+            for shard in itertools.islice(shards, self.max_pending):
+                submit(shard)
+
+            while pending:
+                shard, future = pending[0]
+                try:
+                    done = [(shard, future.result())]
+                    pending.popleft()
+                except BrokenProcessPool:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor, done = self._recover([pending_shard for pending_shard, _ in pending])
+                    pending.clear()
+
+                for shard, results in done:
+                    next_shard = next(shards, None)
+                    if next_shard is not None:
+                        submit(next_shard)
+
+                    self._update_stats(shard, results)
+                    yield from results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _recover(self, shards):
+        # Any shard in flight may have killed the worker: their documents are sent alone to a new pool, one at a time,
+        # so a document which kills a worker now did it by itself
+        executor = self._create_executor()
+        done = []
+        try:
+            for shard in shards:
+                results = []
+                for item in shard:
+                    try:
+                        results.extend(executor.submit(_anonymize_shard, [item], self.batch_size).result())
+                    except BrokenProcessPool:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = self._create_executor()
+                        results.append(CorpusResult(item[0], error="The worker process died while anonymizing "
+                                                                   "this document"))
+                done.append((shard, results))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor, done
+
+    def _update_stats(self, shard, results):
+        self.stats.documents += len(results)
+        self.stats.errors += sum(result.error is not None for result in results)
+        self.stats.characters += sum(len(text) for _, text in shard if isinstance(text, str))
+        self.stats.elapsed = time.perf_counter() - self.stats.start
+        if self.progress is not None:
+            self.progress(self.stats)
+
+
+def anonymize_corpus(texts, mode="replace", workers=None, **kwargs):
+    """
+    Anonymize a corpus in parallel, see `CorpusRunner` for the available options.
+
+    Args:
+        texts (iterable): The documents, read lazily.
+        mode (str): "replace" or "redact" (default: "replace").
+        workers (int): Number of worker processes (default: the number of CPUs).
+        **kwargs: Options of `CorpusRunner` and arguments of the anonymizer.
+
+    Yields:
+        CorpusResult: The result of each document, in the input order.
+    """
+    yield from CorpusRunner(mode=mode, workers=workers, **kwargs).run(texts)
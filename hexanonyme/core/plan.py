@@ -0,0 +1,46 @@
+class ExecutionPlan:
+    """
+    Models and patterns run by an anonymizer to find its requested entities.
+
+    Labels found by a registered pattern (TEL, MAIL, ...) are left to the regexes. A model is run only if its
+    filter contains one of the other requested labels, so a configuration with pattern labels only runs no model.
+
+    The entities of a skipped model no longer take part in the overlap resolution: a requested entity included in
+    an unrequested entity of a skipped model (e.g. the LOC "Lyon" in the ORG "Banque de Lyon") used to be dropped
+    with it, and is now anonymized. Requesting the label of the including entity restores the former resolution.
+
+    Args:
+        entities (list): The requested entity types.
+        models (list): Names of the available NER models.
+        filters (list): For each model, the labels kept from its predictions.
+        pattern_labels (list): Labels of the registered patterns.
+
+    Attributes:
+        models (list): Names of the models to run.
+        filters (list): For each model to run, the labels kept from its predictions.
+        pattern_labels (list): Requested labels found by the regexes.
+        skipped_models (list): Names of the models which cannot produce a requested label.
+    """
+
+    def __init__(self, entities, models, filters, pattern_labels):
+        self.entities = list(entities)
+        self.pattern_labels = [label for label in self.entities if label in pattern_labels]
+        model_labels = set(self.entities) - set(pattern_labels)
+
+        self.models, self.filters, self.skipped_models = [], [], []
+        for model, filtre in zip(models, filters):
+            if model_labels & set(filtre):
+                self.models.append(model)
+                self.filters.append(filtre)
+            else:
+                self.skipped_models.append(model)
+
+    def __repr__(self):
+        lines = [f"ExecutionPlan(entities={self.entities})"]
+        for model, filtre in zip(self.models, self.filters):
+            lines.append(f"  model {model}: {filtre}")
+        if self.pattern_labels:
+            lines.append(f"  regex: {self.pattern_labels}")
+        for model in self.skipped_models:
+            lines.append(f"  skipped {model}")
+        return "\n".join(lines)
@@ -0,0 +1,183 @@
+import re
+import threading
+
+from .detectors import get_detector
+from .sentences import split_sentences
+
+# Score of each signal of a sentence, a sentence is sent to the models if its highest score reaches the threshold
+SIGNALS = {
+    "pattern": 1.0,      # A match of the regex detector (TEL, MAIL, ...)
+    "digits": 0.9,       # A number, e.g. a date, a street number or a postcode
+    "capitalized": 0.8,  # A capitalized word inside the sentence, e.g. a name or a place
+    "gazetteer": 0.7,    # A word announcing an entity, e.g. "rue", "madame" or a month
+    "acronym": 0.7,      # A word in capitals, e.g. an organization
+    "first_word": 0.5,   # A capitalized first word which is not a common French word
+}
+
+WORD_REGEX = re.compile(r"[^\W\d_]+")
+DIGITS_REGEX = re.compile(r"\d")
+
+# Words which announce a PII entity: titles, address types, dates
+GAZETTEER = {
+    "monsieur", "madame", "mademoiselle", "docteur", "maître", "professeur", "mr", "mme", "mlle", "dr", "pr",
+    "rue", "avenue", "boulevard", "bd", "av", "chemin", "allée", "impasse", "quai", "square", "cedex", "bp",
+    "janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août", "septembre", "octobre", "novembre",
+    "décembre", "lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche",
+    "hier", "demain", "aujourd",
+    "né", "née", "habite", "domicilié", "domiciliée", "nom", "prénom", "adresse", "téléphone", "tél", "mail",
+    "courriel", "email", "iban", "siret", "sécurité",
+}
+
+# Common first words of sentences without PII, a capitalized first word outside this list is a weak signal
+COMMON_WORDS = {
+    "le", "la", "les", "l", "un", "une", "des", "du", "de", "d", "au", "aux", "ce", "cet", "cette", "ces", "mon", "ma",
+    "mes", "ton", "ta", "tes", "son", "sa", "ses", "notre", "nos", "votre", "vos", "leur", "leurs",
+    "je", "j", "tu", "il", "elle", "on", "nous", "vous", "ils", "elles", "c", "ça", "cela", "ceci", "qui", "que",
+    "qu", "quoi", "quel", "quelle", "quels", "quelles", "tout", "tous", "toute", "toutes", "rien", "personne",
+    "et", "ou", "mais", "donc", "car", "ni", "or", "si", "quand", "comme", "puis", "ensuite", "enfin", "alors",
+    "pour", "par", "avec", "sans", "sous", "sur", "dans", "en", "chez", "vers", "depuis", "pendant", "après",
+    "avant", "entre", "selon", "malgré",
+    "à", "oui", "non", "ok", "merci", "bon", "bonne", "bonjour", "bonsoir", "salut", "bienvenue", "cordialement",
+    "bravo", "désolé", "désolée", "pardon", "attention", "veuillez", "voici", "voilà", "bien", "très", "trop",
+    "plus", "moins", "encore", "déjà", "toujours", "jamais", "parfois", "souvent", "ici", "là", "maintenant",
+    "est", "sont", "était", "a", "ont", "avait", "fait", "peut", "faut", "y", "ne", "n", "s", "pas", "aucun",
+    "aucune", "ceux", "celles", "chaque", "certains", "plusieurs", "statut", "erreur", "succès", "échec",
+    "terminé", "envoyé", "reçu", "validé", "annulé", "cliquez", "consultez",
+}
+
+
+class PIIPrefilter:
+    """
+    Cheap screening of the sentences of a text, only the sentences which may contain a PII entity are sent to the
+    NER models.
+
+    Each sentence is scored with heuristics: matches of the regex detector, digits, capitalized words, words in
+    capitals and words of a gazetteer announcing an entity (see `SIGNALS`). Sentences whose highest score reaches
+    `threshold` are candidates. Lowering the threshold trades speed for recall: at 0 every sentence is a candidate.
+    Consecutive candidate sentences are sent together, so the models keep their context.
+
+    Args:
+        threshold (float): Lowest score of a candidate sentence (default: 0.5, only sentences without any digit,
+            capitalized word, pattern or gazetteer word are skipped).
+        gazetteer (set): Extra lowercase words announcing an entity, e.g. company specific terms (default: None).
+        detector (PatternDetector): Regex detector of TEL, MAIL and the registered patterns (default: the process-wide
+            detector).
+
+    Attributes:
+        sentences (int): Number of sentences screened.
+        skipped (int): Number of sentences which were not sent to the models.
+        characters (int): Number of characters of the screened texts.
+        skipped_characters (int): Number of characters of the skipped sentences.
+    """
+
+    def __init__(self, threshold=0.5, gazetteer=None, detector=None):
+        self.threshold = threshold
+        self.gazetteer = GAZETTEER | {word.lower() for word in (gazetteer or ())}
+        self.detector = detector if detector is not None else get_detector()
+
+        self.sentences = 0
+        self.skipped = 0
+        self.characters = 0
+        self.skipped_characters = 0
+        self._counter_lock = threading.Lock()
+
+    def __getstate__(self):
+        # The counters are copied, not the lock guarding them
+        state = self.__dict__.copy()
+        del state["_counter_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter_lock = threading.Lock()
+
+    @property
+    def signature(self):
+        """
+        Description of the screening configuration, which changes whenever the candidates may.
+        """
+        return repr((self.threshold, sorted(self.gazetteer), self.detector.signature))
+
+    def score(self, sentence):
+        """
+        Score of the strongest PII signal of a sentence.
+
+        Args:
+            sentence (str): The sentence.
+
+        Returns:
+            float: The score of its strongest signal (see `SIGNALS`), 0 if it has none.
+        """
+        if self.detector.find(sentence):
+            return SIGNALS["pattern"]
+        if DIGITS_REGEX.search(sentence):
+            return SIGNALS["digits"]
+
+        score = 0.0
+        for i, match in enumerate(WORD_REGEX.finditer(sentence)):
+            if score >= SIGNALS["capitalized"]:
+                break
+            word = match.group()
+            lower = word.lower()
+            if lower in self.gazetteer:
+                score = max(score, SIGNALS["gazetteer"])
+            if not word[0].isupper():
+                continue
+            if len(word) > 1 and word.isupper():
+                score = max(score, SIGNALS["acronym"])
+            elif i > 0:
+                score = max(score, SIGNALS["capitalized"])
+            elif lower not in COMMON_WORDS:
+                score = max(score, SIGNALS["first_word"])
+        return score
+
+    def candidates(self, text):
+        """
+        Segments of a text to send to the models.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            list: The (start, end) offsets of the segments, each one a run of consecutive candidate sentences.
+        """
+        segments = []
+        sentences = skipped = skipped_characters = 0
+        for start, end in split_sentences(text):
+            sentences += 1
+            if self.threshold > 0 and self.score(text[start:end]) < self.threshold:
+                skipped += 1
+                skipped_characters += end - start
+            elif segments and segments[-1][2] == sentences - 1:
+                segments[-1][1:] = [end, sentences]
+            else:
+                segments.append([start, end, sentences])
+
+        with self._counter_lock:
+            self.sentences += sentences
+            self.skipped += skipped
+            self.characters += len(text)
+            self.skipped_characters += skipped_characters
+        return [(start, end) for start, end, _ in segments]
+
+    def reset_stats(self):
+        """
+        Reset the counters of screened and skipped sentences.
+        """
+        with self._counter_lock:
+            self.sentences = self.skipped = self.characters = self.skipped_characters = 0
+
+    def stats(self):
+        """
+        Screening statistics.
+
+        Returns:
+            dict: Number of screened and skipped sentences, share of skipped sentences and of skipped characters.
+        """
+        with self._counter_lock:
+            return {
+                "sentences": self.sentences,
+                "skipped": self.skipped,
+                "skip_rate": self.skipped / self.sentences if self.sentences else 0.0,
+                "character_skip_rate": self.skipped_characters / self.characters if self.characters else 0.0,
+            }
@@ -0,0 +1,339 @@
+import bisect
+import contextlib
+import sys
+import threading
+import time
+import tracemalloc
+
+# Upper bounds of the histogram buckets of the durations in seconds and of the counts
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(16, 34, 2))
+
+# Context manager of the anonymizers when profiling is disabled
+NULL_CONTEXT = contextlib.nullcontext()
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values, in the Prometheus sense.
+
+    Args:
+        buckets (tuple): Upper bounds of the buckets, in increasing order.
+
+    Attributes:
+        counts (list): Number of observations in each bucket, the last one counting the values above every bound.
+        count (int): Number of observations.
+        sum (float): Sum of the observed values.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def cumulative_counts(self):
+        """
+        Number of observations lower than or equal to each bound, then the total.
+
+        Returns:
+            list: The (bound, cumulative count) pairs, the last bound being infinity.
+        """
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        cumulative = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class CallProfile:
+    """
+    Measures of one call of an anonymizer.
+
+    Attributes:
+        name (str): The method called, e.g. "replace" or "redact_batch".
+        stages (dict): Seconds spent in each stage, e.g. "inference", "regex" or "rewrite".
+        counts (dict): Number of texts, characters, tokens sent to the models and entities found.
+        duration (float): Seconds of the whole call.
+        peak_memory (int): Peak of the Python allocations during the call in bytes, None if not tracked.
+        peak_gpu_memory (int): Peak of the CUDA allocations of torch during the call in bytes, None if not tracked.
+    """
+    __slots__ = ("name", "stages", "counts", "duration", "peak_memory", "peak_gpu_memory", "_start")
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}
+        self.counts = {}
+        self.duration = 0.0
+        self.peak_memory = None
+        self.peak_gpu_memory = None
+        self._start = time.perf_counter()
+
+    def __repr__(self):
+        stages = ", ".join(f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in self.stages.items())
+        return f"CallProfile({self.name}, {self.duration * 1000:.2f}ms, {stages}, counts={self.counts})"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _cuda():
+    # torch is only queried if it is already imported and its CUDA context initialized
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+        return torch.cuda
+    return None
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of the anonymizers: time of each stage, token and entity counts, and peak memory per call.
+
+    Pass a profiler to an anonymizer (`ReplaceAnonymizer(profiler=Profiler())`) to record every call of its public
+    methods. Each call gives a `CallProfile`, which is aggregated into histograms and given to the callbacks.
+    Without a profiler, the instrumentation points only enter a shared null context.
+
+    Stages:
+        - "cache": lookup of the entity cache
+        - "prefilter": screening of the sentences
+        - "inference": the NER models, and "model <name>" for each pipeline when they run one after the other
+        - "merge": `merge_overlapping_entities` and the label filters
+        - "regex": the pattern detector
+        - "resolve": `drop_duplicates_and_included_entities`
+        - "rewrite": the rewriting of the text, including "faker": the generation of fake values
+
+    Args:
+        callbacks (list): Functions called with the `CallProfile` of each call (default: None).
+        count_tokens (bool): Whether the tokens sent to the models are counted, with the tokenizer of the first
+            model, which costs an extra tokenization (default: True).
+        track_memory (bool): Whether the peak memory of each call is measured with `tracemalloc`, which slows down
+            Python allocations (default: False). Calls running at the same time share the peak.
+
+    Attributes:
+        calls (dict): Histogram of the durations of the calls, by method.
+        stages (dict): Histogram of the time spent in each stage per call, by stage.
+        counts (dict): Histogram of each count per call, by (method, count) pair.
+        memory (dict): Histogram of the peak memory per call, by method.
+    """
+
+    def __init__(self, callbacks=None, count_tokens=True, track_memory=False):
+        self.callbacks = list(callbacks or [])
+        self.count_tokens = count_tokens
+        self.track_memory = track_memory
+
+        self.calls = {}
+        self.stages = {}
+        self.counts = {}
+        self.memory = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # The lock and the calls in progress of each thread stay in this process
+        state = self.__dict__.copy()
+        del state["_lock"], state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add_callback(self, callback):
+        """
+        Call a function with the `CallProfile` of each call.
+
+        Args:
+            callback (callable): The function.
+        """
+        self.callbacks.append(callback)
+
+    def current(self):
+        """
+        Profile of the call running in the current thread.
+
+        Returns:
+            CallProfile: The innermost call, None outside of a call.
+        """
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextlib.contextmanager
+    def call(self, name, texts=()):
+        """
+        Profile a call of an anonymizer.
+
+        A call made inside another one in the same thread is recorded as part of the outer call. The calls of
+        `replace_stream` and `redact_stream` last until their last piece is read, so a call made by the reader
+        in between is recorded as part of the stream.
+
+        Args:
+            name (str): The method called.
+            texts (list): The input texts, counted (default: none).
+
+        Yields:
+            CallProfile: The profile of the call.
+        """
+        outer = self.current()
+        if outer is not None:
+            yield outer
+            return
+
+        profile = CallProfile(name)
+        profile.counts["texts"] = len(texts)
+        profile.counts["characters"] = sum(len(text) for text in texts if isinstance(text, str))
+
+        cuda = _cuda()
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        if cuda is not None:
+            cuda.reset_peak_memory_stats()
+
+        self._local.stack = [profile]
+        try:
+            yield profile
+        finally:
+            self._local.stack = []
+            profile.duration = time.perf_counter() - profile._start
+            if self.track_memory:
+                profile.peak_memory = tracemalloc.get_traced_memory()[1]
+            if cuda is not None:
+                profile.peak_gpu_memory = cuda.max_memory_allocated()
+            self._record(profile)
+
+    @contextlib.contextmanager
+    def stage(self, name, call=None):
+        """
+        Time a stage of the current call.
+
+        Args:
+            name (str): The stage.
+            call (CallProfile): The call the stage belongs to, for stages running on another thread
+                (default: the call of the current thread). Outside of a call, the stage is recorded alone.
+        """
+        call = call if call is not None else self.current()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if call is None:
+                self._histogram(self.stages, name, DURATION_BUCKETS).observe(elapsed)
+            else:
+                # Stages of a call are summed and observed once when the call ends
+                call.stages[name] = call.stages.get(name, 0.0) + elapsed
+
+    def count(self, name, value, call=None):
+        """
+        Add to a count of the current call.
+
+        Args:
+            name (str): The count, e.g. "tokens" or "entities".
+            value (int): The value added.
+            call (CallProfile): The call (default: the call of the current thread).
+        """
+        call = call if call is not None else self.current()
+        if call is not None:
+            call.counts[name] = call.counts.get(name, 0) + value
+
+    def _histogram(self, histograms, key, buckets):
+        histogram = histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def _record(self, profile):
+        self._histogram(self.calls, profile.name, DURATION_BUCKETS).observe(profile.duration)
+        for stage, seconds in list(profile.stages.items()):
+            self._histogram(self.stages, stage, DURATION_BUCKETS).observe(seconds)
+        for name, value in profile.counts.items():
+            self._histogram(self.counts, (profile.name, name), COUNT_BUCKETS).observe(value)
+        if profile.peak_memory is not None:
+            self._histogram(self.memory, profile.name, MEMORY_BUCKETS).observe(profile.peak_memory)
+        for callback in self.callbacks:
+            callback(profile)
+
+    def summary(self):
+        """
+        Number of observations, total and mean of each histogram.
+
+        Returns:
+            dict: The calls, stages, counts and memory histograms, summarized.
+        """
+        summarize = lambda histograms: {key if isinstance(key, str) else "/".join(key):
+                                        {"count": histogram.count, "sum": histogram.sum, "mean": histogram.mean}
+                                        for key, histogram in list(histograms.items())}
+        return {"calls": summarize(self.calls), "stages": summarize(self.stages),
+                "counts": summarize(self.counts), "memory": summarize(self.memory)}
+
+    def reset(self):
+        """
+        Forget every observation.
+        """
+        with self._lock:
+            self.calls, self.stages, self.counts, self.memory = {}, {}, {}, {}
+
+    def to_prometheus(self, prefix="hexanonyme"):
+        """
+        Histograms in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix of the metric names (default: "hexanonyme").
+
+        Returns:
+            str: The metrics, ready to be served on a /metrics endpoint.
+        """
+        lines = []
+
+        def write(name, documentation, histograms, labels):
+            if not histograms:
+                return
+            lines.append(f"# HELP {prefix}_{name} {documentation}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, histogram in sorted(histograms.items()):
+                label = ",".join(f'{label}="{_escape(value)}"'
+                                 for label, value in zip(labels, key if isinstance(key, tuple) else (key,)))
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{prefix}_{name}_bucket{{{label},le="{_format_bound(bound)}"}} {count}')
+                lines.append(f"{prefix}_{name}_sum{{{label}}} {histogram.sum!r}")
+                lines.append(f"{prefix}_{name}_count{{{label}}} {histogram.count}")
+
+        write("call_seconds", "Duration of the calls of the anonymizers.", dict(self.calls), ["method"])
+        write("stage_seconds", "Time spent in each stage per call.", dict(self.stages), ["stage"])
+        write("call_items", "Texts, characters, tokens and entities per call.", dict(self.counts),
+              ["method", "item"])
+        write("call_peak_memory_bytes", "Peak of the Python allocations per call.", dict(self.memory), ["method"])
+        return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,193 @@
+import itertools
+import sqlite3
+import threading
+from collections import deque
+
+SCOPES = ("document", "batch", "global")
+
+
+class FakerPool:
+    """
+    Pools of pre-generated fake values, one per entity type, refilled in bulk.
+
+    Taking a value is a pop from a deque. When a pool falls below `refill_threshold` of its size, a background
+    thread generates a new batch of values, so Faker is rarely called on the request path. An empty pool is refilled
+    synchronously. Values are generated under a lock, so the generators (and their Faker instance) are never called
+    from two threads at once.
+
+    Args:
+        generators (dict): The function generating a value of each entity type.
+        pool_size (int): Number of values generated at once for an entity type (default: 256).
+        refill_threshold (float): Fraction of `pool_size` under which a pool is refilled (default: 0.25).
+        background (bool): Whether pools are refilled by a background thread (default: True).
+    """
+
+    def __init__(self, generators, pool_size=256, refill_threshold=0.25, background=True):
+        self.generators = dict(generators)
+        self.pool_size = pool_size
+        self.low_water = max(1, int(pool_size * refill_threshold))
+        self.background = background
+
+        self._pools = {label: deque() for label in self.generators}
+        self._generate_lock = threading.Lock()
+        self._refilling = set()
+        self._refilling_lock = threading.Lock()
+
+    def __contains__(self, label):
+        return label in self.generators
+
+    def take(self, label):
+        """
+        Take a fake value of an entity type.
+
+        Args:
+            label (str): The entity type.
+
+        Returns:
+            str: A fake value.
+        """
+        pool = self._pools[label]
+        while True:
+            try:
+                value = pool.popleft()
+                break
+            except IndexError:
+                self._refill(label, only_if_empty=True)
+
+        if len(pool) < self.low_water:
+            if self.background:
+                self._refill_in_background(label)
+            else:
+                self._refill(label)
+        return value
+
+    def _refill(self, label, only_if_empty=False):
+        generator = self.generators[label]
+        with self._generate_lock:
+            # A background refill may have completed while waiting for the lock
+            if only_if_empty and self._pools[label]:
+                return
+            self._pools[label].extend(generator() for _ in range(self.pool_size))
+
+    def _refill_in_background(self, label):
+        with self._refilling_lock:
+            if label in self._refilling:
+                return
+            self._refilling.add(label)
+
+        def refill():
+            try:
+                self._refill(label)
+            finally:
+                with self._refilling_lock:
+                    self._refilling.discard(label)
+
+        threading.Thread(target=refill, name=f"hexanonyme-faker-{label}", daemon=True).start()
+
+    def prefill(self, labels=None):
+        """
+        Fill the pools ahead of their first use.
+
+        Args:
+            labels (list): The entity types to fill (default: every entity type).
+        """
+        for label in (labels or self.generators):
+            if len(self._pools[label]) < self.low_water:
+                self._refill(label)
+
+    def __len__(self):
+        return sum(len(pool) for pool in self._pools.values())
+
+
+class PseudonymMap:
+    """
+    Consistent mapping of original values to pseudonyms: each distinct (entity type, value) pair always gets the same
+    pseudonym, and two distinct values never share one.
+
+    The mapping can be persisted in a SQLite database, so pseudonyms stay the same across runs. The database then
+    holds the original values and must be protected like the data itself.
+
+    Args:
+        path (str): Path of the database file (default: None, in memory only).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._pseudonyms = {}
+        self._used = set()
+        self._lock = threading.Lock()
+        self._connection = None
+
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS pseudonyms "
+                                     "(label TEXT, original TEXT, pseudonym TEXT, PRIMARY KEY (label, original))")
+            for label, original, pseudonym in self._connection.execute("SELECT * FROM pseudonyms"):
+                self._pseudonyms[(label, original)] = pseudonym
+                self._used.add(pseudonym)
+
+    def get(self, label, original, generate, max_attempts=10):
+        """
+        Get the pseudonym of a value, generating it on first use.
+
+        Args:
+            label (str): The entity type.
+            original (str): The original value.
+            generate (callable): Function returning a new fake value.
+            max_attempts (int): Number of fake values tried to find one not used by another value (default: 10).
+                If they are all taken, the last one is made unique with a number suffix (" 2", " 3", ...).
+
+        Returns:
+            str: The pseudonym of the value.
+        """
+        key = (label, original)
+        pseudonym = self._pseudonyms.get(key)
+        if pseudonym is not None:
+            return pseudonym
+
+        with self._lock:
+            pseudonym = self._pseudonyms.get(key)
+            if pseudonym is not None:
+                return pseudonym
+
+            for _ in range(max_attempts):
+                pseudonym = generate()
+                if pseudonym not in self._used and pseudonym != original:
+                    break
+            else:
+                base = pseudonym
+                for suffix in itertools.count(2):
+                    pseudonym = f"{base} {suffix}"
+                    if pseudonym not in self._used and pseudonym != original:
+                        break
+            self._pseudonyms[key] = pseudonym
+            self._used.add(pseudonym)
+            if self._connection is not None:
+                self._connection.execute("INSERT OR REPLACE INTO pseudonyms VALUES (?, ?, ?)",
+                                         (label, original, pseudonym))
+        return pseudonym
+
+    def clear(self):
+        """
+        Forget every pseudonym, in the database too.
+        """
+        with self._lock:
+            self._pseudonyms.clear()
+            self._used.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM pseudonyms")
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __len__(self):
+        return len(self._pseudonyms)
+
+    def __contains__(self, key):
+        return key in self._pseudonyms
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .backends import load_pipeline
+
+
+def load_transformers_pipeline(model, task, device=None, use_safetensors=None, **kwargs):
+    """
+    Build a `transformers` pipeline running on PyTorch. This is the "torch" backend of the model registry.
+
+    Args:
+        model (str): Name or path of the model.
+        task (str): The pipeline task (e.g. "token-classification").
+        device (int or str): Device on which the model is loaded. The transformers default is used if None.
+        use_safetensors (bool): Whether the weights must be read from a safetensors file, memory-mapped rather than
+            copied into memory (default: None, safetensors when the model has them).
+
+    Returns:
+        Pipeline: The loaded pipeline.
+    """
+    from transformers import pipeline
+
+    if device is not None:
+        kwargs["device"] = device
+    if use_safetensors is not None:
+        kwargs["model_kwargs"] = {**kwargs.get("model_kwargs", {}), "use_safetensors": use_safetensors}
+    return pipeline(task, model=model, **kwargs)
+
+
+class _Entry:
+    __slots__ = ("pipeline", "last_used")
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded pipelines, shared by every anonymizer instance and thread.
+
+    A pipeline is loaded once per (model, task, device, options) key. Concurrent requests for a key
+    that is being loaded wait for the first load instead of loading another copy.
+
+    Args:
+        max_models (int): Maximum number of resident pipelines. The least recently used ones are evicted
+            above this limit (default: None, no limit).
+        idle_timeout (float): Pipelines not used for this many seconds are evicted (default: None, never).
+        loader (callable): Function called as `loader(model, task, device, **kwargs)` to build a pipeline
+            (default: `load_pipeline`, which also handles the `backend` option).
+
+    Evicting a pipeline only drops the reference held by the registry: anonymizers which already use it
+    keep it alive until they are garbage collected.
+    """
+
+    def __init__(self, max_models=None, idle_timeout=None, loader=None):
+        self.max_models = max_models
+        self.idle_timeout = idle_timeout
+        self.loader = loader or load_pipeline
+
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(model, task, device, kwargs):
+        return (model, task, device, tuple(sorted(kwargs.items())))
+
+    def get(self, model, task="token-classification", device=None, **kwargs):
+        """
+        Return the pipeline of a model, loading it if it is not resident yet.
+
+        Args:
+            model (str): Name or path of the model.
+            task (str): The pipeline task (default: "token-classification").
+            device (int or str): Device on which the model is loaded (default: None).
+            **kwargs: Extra arguments given to the loader, part of the registry key (e.g. aggregation_strategy).
+
+        Returns:
+            Pipeline: The shared pipeline.
+        """
+        key = self._key(model, task, device, kwargs)
+        with self._lock:
+            self.evict_idle()
+            entry = self._entries.get(key)
+            if entry is not None:
+                return self._touch(key, entry)
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return self._touch(key, entry)
+
+            pipeline = self.loader(model, task, device, **kwargs)
+
+            with self._lock:
+                self._entries[key] = _Entry(pipeline)
+                self._loading.pop(key, None)
+                self._evict_lru()
+        return pipeline
+
+    def _touch(self, key, entry):
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry.pipeline
+
+    def preload(self, models, task="token-classification", device=None, **kwargs):
+        """
+        Load several models ahead of their first use.
+
+        Args:
+            models (list): Names or paths of the models.
+            task (str): The pipeline task (default: "token-classification").
+            device (int or str): Device on which the models are loaded (default: None).
+            **kwargs: Extra arguments given to the loader.
+
+        Returns:
+            list: The loaded pipelines, in the order of `models`.
+        """
+        return [self.get(model, task=task, device=device, **kwargs) for model in models]
+
+    def warmup(self, text="Bonjour, je m'appelle Jean Dupont et j'habite à Paris."):
+        """
+        Run every resident pipeline once so that lazy initialisations do not slow down the first real call.
+
+        Args:
+            text (str): The text given to the pipelines.
+        """
+        with self._lock:
+            pipelines = [entry.pipeline for entry in self._entries.values()]
+        for pipeline in pipelines:
+            pipeline(text)
+
+    def evict_idle(self):
+        """
+        Evict the pipelines which have not been used for more than `idle_timeout` seconds.
+
+        Returns:
+            int: The number of evicted pipelines.
+        """
+        if self.idle_timeout is None:
+            return 0
+        limit = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle_keys = [key for key, entry in self._entries.items() if entry.last_used < limit]
+            for key in idle_keys:
+                del self._entries[key]
+        return len(idle_keys)
+
+    def _evict_lru(self):
+        if self.max_models is None:
+            return
+        while len(self._entries) > self.max_models:
+            self._entries.popitem(last=False)
+
+    def evict(self, model=None):
+        """
+        Evict the pipelines of a model, or every pipeline if no model is given.
+
+        Args:
+            model (str): Name or path of the model (default: None).
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if model is None or key[0] == model:
+                    del self._entries[key]
+
+    def resident_models(self):
+        """
+        List the resident pipelines.
+
+        Returns:
+            list: The (model, task, device) of the resident pipelines, from the least to the most recently used.
+        """
+        with self._lock:
+            return [key[:3] for key in self._entries]
+
+    def memory_footprint(self):
+        """
+        Size of the parameters and buffers of the resident models (of the graph files for ONNX models).
+
+        Returns:
+            int: The memory footprint in bytes.
+        """
+        with self._lock:
+            pipelines = [entry.pipeline for entry in self._entries.values()]
+        return sum(_model_size(pipeline) for pipeline in pipelines)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, model):
+        with self._lock:
+            return any(key[0] == model for key in self._entries)
+
+
+def _model_size(pipeline):
+    model = getattr(pipeline, "model", None)
+    if model is not None and getattr(model, "model_path", None) is not None:
+        # ONNX Runtime models: the weights are the graph file
+        return os.path.getsize(model.model_path)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+default_registry = ModelRegistry()
+
+
+def get_registry():
+    """
+    Get the process-wide model registry.
+
+    Returns:
+        ModelRegistry: The registry shared by the anonymizers created without an explicit registry.
+    """
+    return default_registry
@@ -0,0 +1,166 @@
+import re
+
+# Indexed placeholders written by the anonymizers with `indexed_placeholders`
+PLACEHOLDER_REGEX = re.compile(r"<[A-Za-z]\w*_\d+>|\[REDACTED_\d+\]")
+
+class LogEntry:
+    """
+    Record of one anonymized entity.
+
+    Attributes:
+        entity_group (str): The entity type.
+        original (str): The original value.
+        replacement (str): The value written in the anonymized text (a fake value, a placeholder or "[REDACTED]").
+        start (int): Start of the original value in the input text.
+        end (int): End of the original value in the input text.
+        output_start (int): Start of the replacement in the anonymized text.
+        output_end (int): End of the replacement in the anonymized text.
+
+    Unpacking an entry gives its (original, replacement) pair, like the entries of `log_replacements`.
+    """
+    __slots__ = ("entity_group", "original", "replacement", "start", "end", "output_start", "output_end")
+
+    def __init__(self, entity_group, original, replacement, start, end, output_start, output_end):
+        self.entity_group = entity_group
+        self.original = original
+        self.replacement = replacement
+        self.start = start
+        self.end = end
+        self.output_start = output_start
+        self.output_end = output_end
+
+    def __iter__(self):
+        yield self.original
+        yield self.replacement
+
+    def shifted(self, offset, output_offset):
+        """
+        Copy of the entry with its offsets moved, e.g. from a window of a stream to the whole text.
+
+        Args:
+            offset (int): Added to the input offsets.
+            output_offset (int): Added to the output offsets.
+
+        Returns:
+            LogEntry: The moved entry.
+        """
+        return LogEntry(self.entity_group, self.original, self.replacement, self.start + offset, self.end + offset,
+                        self.output_start + output_offset, self.output_end + output_offset)
+
+    def __eq__(self, other):
+        if not isinstance(other, LogEntry):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return (f"LogEntry({self.entity_group}, {self.original!r} -> {self.replacement!r}, "
+                f"{self.start}:{self.end} -> {self.output_start}:{self.output_end})")
+
+
+class AnonymizationResult:
+    """
+    An anonymized text with its own log, independent of the anonymizer which produced it.
+
+    Attributes:
+        text (str): The anonymized text.
+        log (list): The `LogEntry` of each anonymized entity, by position.
+
+    Unpacking a result gives its (text, log) pair.
+    """
+    __slots__ = ("text", "log")
+
+    def __init__(self, text, log):
+        self.text = text
+        self.log = log
+
+    def __iter__(self):
+        yield self.text
+        yield self.log
+
+    def __str__(self):
+        return self.text
+
+    def __eq__(self, other):
+        if not isinstance(other, AnonymizationResult):
+            return NotImplemented
+        return self.text == other.text and self.log == other.log
+
+    def __repr__(self):
+        return f"AnonymizationResult(text={self.text!r}, entities={len(self.log)})"
+
+
+def _pairs(entries):
+    # (original, replacement) pairs of LogEntry records or of the legacy logs
+    for entry in entries:
+        if isinstance(entry, dict):
+            # Entry of `log_redactions`
+            yield entry["word"], "[REDACTED]"
+        else:
+            original, replacement = entry
+            yield original, replacement
+
+
+def _restore_at_offsets(text, entries):
+    pieces = []
+    cursor = 0
+    for entry in sorted(entries, key=lambda entry: entry.output_start):
+        pieces.append(text[cursor:entry.output_start])
+        pieces.append(entry.original)
+        cursor = entry.output_end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def _restore_placeholders(text, mapping):
+    # One generic pattern, the scan does not depend on the number of placeholders
+    return PLACEHOLDER_REGEX.sub(lambda match: mapping.get(match.group(), match.group()), text)
+
+
+def _restore_in_order(text, pairs):
+    pieces = []
+    cursor = 0
+    for original, replacement in pairs:
+        position = text.find(replacement, cursor)
+        if position < 0:
+            continue
+        pieces.append(text[cursor:position])
+        pieces.append(original)
+        cursor = position + len(replacement)
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def restore_text(text, log):
+    """
+    Put the original values of a log back in an anonymized text, in a single pass.
+
+    - If the text is the one produced by the anonymization, the replacements are found at the output offsets
+      recorded in the log, so only the anonymized spans are restored, whatever the rest of the text contains.
+    - Otherwise (e.g. the text is an LLM response which moved or repeated the replacements), if the replacements
+      are indexed placeholders (`<PER_1>`, `[REDACTED_1]`), each standing for a single original value, every
+      occurrence of a placeholder is restored.
+    - Otherwise the replacements are searched in the order of the log, each one after the previous one. Fake
+      values are never substituted everywhere, since they may also occur in the text as genuine words.
+
+    Args:
+        text (str): The anonymized text.
+        log (AnonymizationResult or list): The result of the anonymization, its log, or a legacy log
+            (`log_replacements` or `log_redactions`).
+
+    Returns:
+        str: The text with the original values restored.
+    """
+    entries = log.log if isinstance(log, AnonymizationResult) else list(log)
+    if not entries:
+        return text
+
+    if all(isinstance(entry, LogEntry) and text[entry.output_start:entry.output_end] == entry.replacement
+           for entry in entries):
+        return _restore_at_offsets(text, entries)
+
+    pairs = list(_pairs(entries))
+    mapping = {}
+    for original, replacement in pairs:
+        if not PLACEHOLDER_REGEX.fullmatch(replacement) or mapping.setdefault(replacement, original) != original:
+            return _restore_in_order(text, pairs)
+    return _restore_placeholders(text, mapping)
@@ -0,0 +1,116 @@
+import re
+
+# Words and single punctuation marks, the units in which repeated values are looked up
+_TOKEN_REGEX = re.compile(r"\w+|\S")
+_WORD_CHAR_REGEX = re.compile(r"\w")
+
+
+def entity_bounds(text, entity):
+    """
+    Offsets of an entity in the text, without the surrounding whitespaces.
+
+    The token classification pipelines sometimes include the space preceding a word in the entity offsets.
+
+    Args:
+        text (str): The text in which the entity was found.
+        entity (dict): The entity, with its "start" and "end" offsets.
+
+    Returns:
+        tuple: The (start, end) offsets of the entity.
+    """
+    start, end = entity["start"], entity["end"]
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def rewrite_spans(text, spans):
+    """
+    Replace spans of a text in a single left to right pass.
+
+    The output is built from a list of slices joined once, so the cost is linear in the size of the text
+    whatever the number of spans. A span overlapping a previous one (by start position, then input order)
+    is left out.
+
+    Args:
+        text (str): The text to be rewritten.
+        spans (list): List of (start, end, replacement) tuples.
+
+    Returns:
+        str: The rewritten text.
+        list: For each input span, the (start, end) offsets of its replacement in the rewritten text,
+            or None if the span was left out.
+    """
+    order = sorted(range(len(spans)), key=lambda i: spans[i][0])
+    output_offsets = [None] * len(spans)
+
+    parts = []
+    cursor = 0
+    output_length = 0
+    for i in order:
+        start, end, replacement = spans[i]
+        if start < cursor:
+            continue
+        parts.append(text[cursor:start])
+        output_length += start - cursor
+        output_offsets[i] = (output_length, output_length + len(replacement))
+        parts.append(replacement)
+        output_length += len(replacement)
+        cursor = end
+    parts.append(text[cursor:])
+
+    return "".join(parts), output_offsets
+
+
+def repeated_spans(text, spans):
+    """
+    Find the other occurrences of the values of spans, as the former `re.sub` of each value rewrote them all.
+
+    Only whole words are matched: an occurrence must not be preceded or followed by a word character. The parts of
+    the text not covered by a span are cut into tokens in a single pass, and each token is looked up among the first
+    tokens of the values, so the cost is linear in the size of the text whatever the number of values. Among the
+    values starting with a token, the longest one found at this position wins.
+
+    Args:
+        text (str): The text in which the spans were found.
+        spans (list): List of (start, end, replacement) tuples.
+
+    Returns:
+        list: List of (start, end, index) tuples, one for each other occurrence, where index is the position in
+            `spans` of the first span (by start position) with the same value.
+    """
+    values = {}
+    for i in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+        start, end, _ = spans[i]
+        if start < end:
+            values.setdefault(text[start:end], i)
+
+    # Values by first token, longest first
+    candidates = {}
+    for value in sorted(values, key=len, reverse=True):
+        first_token = _TOKEN_REGEX.match(value)
+        if first_token is not None:
+            candidates.setdefault(first_token.group(), []).append(value)
+    if not candidates:
+        return []
+
+    repeats = []
+    cursor = 0
+    for gap_end, end in sorted(span[:2] for span in spans) + [(len(text), len(text))]:
+        position = cursor
+        for token in _TOKEN_REGEX.finditer(text, cursor, gap_end):
+            start = token.start()
+            if start < position or token.group() not in candidates:
+                continue
+            if start > 0 and _WORD_CHAR_REGEX.match(text, start - 1):
+                continue
+            for value in candidates[token.group()]:
+                stop = start + len(value)
+                if stop <= gap_end and text.startswith(value, start) and not _WORD_CHAR_REGEX.match(text, stop):
+                    repeats.append((start, stop, values[value]))
+                    position = stop
+                    break
+        cursor = max(cursor, end)
+    return repeats
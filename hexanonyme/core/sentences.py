@@ -0,0 +1,49 @@
+import re
+
+# Whitespaces after a final punctuation, or line breaks
+BOUNDARY_REGEX = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+# Words ending with a period which do not end a sentence (e.g. "M. Dupont")
+ABBREVIATIONS = {"m", "mm", "mme", "mmes", "mlle", "mlles", "dr", "pr", "me", "st", "ste", "av", "bd", "fg",
+                 "n", "no", "tel", "tél", "cf", "etc", "ex", "p"}
+
+
+def _is_abbreviation(text, end):
+    # Last word before the period at `end - 1`
+    start = end - 1
+    while start > 0 and text[start - 1].isalpha():
+        start -= 1
+    word = text[start:end - 1]
+    return word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper())
+
+
+def split_sentences(text):
+    """
+    Split a text into sentences, on final punctuations followed by a whitespace and on line breaks.
+
+    Periods of common abbreviations and initials ("M. Dupont", "J. Dupont") do not end a sentence.
+    Surrounding whitespaces are left out of the sentences.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        list: The (start, end) offsets of the sentences in the text.
+    """
+    sentences = []
+    start = 0
+    for boundary in BOUNDARY_REGEX.finditer(text):
+        end = boundary.start()
+        if "\n" not in boundary.group() and text[end - 1] == "." and _is_abbreviation(text, end):
+            continue
+        sentences.append((start, end))
+        start = boundary.end()
+    sentences.append((start, len(text)))
+
+    # Whitespaces at the beginning and the end of the text, and empty sentences
+    trimmed = []
+    for start, end in sentences:
+        sentence = text[start:end]
+        if sentence.strip():
+            trimmed.append((start + len(sentence) - len(sentence.lstrip()), start + len(sentence.rstrip())))
+    return trimmed
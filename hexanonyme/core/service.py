@@ -0,0 +1,272 @@
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("replace", "redact")
+
+
+class ServiceMetrics:
+    """
+    Metrics of an `AsyncAnonymizer`.
+
+    Args:
+        window (int): Number of recent requests kept to compute the latency percentiles (default: 10000).
+
+    Attributes:
+        requests (int): Number of completed requests.
+        errors (int): Number of requests which raised an exception.
+        batches (int): Number of batches sent to the anonymizers.
+        batch_sizes (Counter): Number of batches of each size.
+        latencies (deque): Latencies of the recent requests in milliseconds, from submission to result.
+    """
+
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self._queues = []
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the counters, the histogram and the latencies, e.g. after a warm up.
+        """
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.latencies.clear()
+
+    @property
+    def queue_depth(self):
+        """
+        Number of requests waiting to be batched.
+        """
+        return sum(queue.qsize() for queue in self._queues)
+
+    def latency_percentile(self, q):
+        """
+        Percentile of the recent latencies.
+
+        Args:
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency in milliseconds, 0 if no request completed yet.
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(round(q / 100 * (len(latencies) - 1))))]
+
+    def snapshot(self):
+        """
+        Current values of the metrics.
+
+        Returns:
+            dict: Queue depth, counters, batch size histogram and latency percentiles.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "latency_ms": {f"p{q}": self.latency_percentile(q) for q in (50, 95, 99)},
+        }
+
+    def __repr__(self):
+        return f"ServiceMetrics({self.snapshot()})"
+
+
+class _Request:
+    __slots__ = ("text", "future", "submitted")
+
+    def __init__(self, text, future):
+        self.text = text
+        self.future = future
+        self.submitted = time.perf_counter()
+
+
+class AsyncAnonymizer:
+    """
+    Asyncio front-end of the anonymizers, gathering concurrent requests into micro-batches.
+
+    Requests wait in a queue until `max_batch_size` of them are gathered or the oldest one has waited `max_wait_ms`.
+    The batch is then anonymized with the batched API on an executor, so the event loop is never blocked, and each
+    request is resolved with its own `AnonymizationResult`. Requests arriving while a batch runs make up the next one, so
+    batches grow with the load. A request raising an exception fails alone.
+
+    Args:
+        replace_anonymizer (ReplaceAnonymizer): Anonymizer of `replace` (default: one created on first use with
+            `anonymizer_kwargs`).
+        redact_anonymizer (RedactAnonymizer): Anonymizer of `redact` (default: one created on first use with
+            `anonymizer_kwargs`).
+        max_batch_size (int): Maximum number of requests in a batch (default: 16).
+        max_wait_ms (float): Maximum time a request waits for other requests in milliseconds (default: 5).
+        executor (Executor): Executor running the batches (default: a thread pool owned by this instance).
+        **anonymizer_kwargs: Arguments of the anonymizers created on first use (e.g. entities, registry). `faker` and
+            `replacement_dict` only apply to `replace`.
+
+    Attributes:
+        metrics (ServiceMetrics): Queue depth, batch sizes and latencies.
+
+    Example:
+        async with AsyncAnonymizer(entities=["PER", "TEL"]) as anonymizer:
+            text, log = await anonymizer.replace("Appelez Jean Dupont au 06 12 34 56 78")
+    """
+
+    def __init__(self, replace_anonymizer=None, redact_anonymizer=None, max_batch_size=16, max_wait_ms=5,
+                 executor=None, **anonymizer_kwargs):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.anonymizer_kwargs = anonymizer_kwargs
+        self.metrics = ServiceMetrics()
+
+        self._anonymizers = {"replace": replace_anonymizer, "redact": redact_anonymizer}
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queues = {}
+        self._workers = {}
+
+    async def replace(self, text):
+        """
+        Replace the PII entities of a text with fake or specified values.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            AnonymizationResult: The anonymized text and its replacement log, which can be unpacked as (text, log).
+        """
+        return await self._submit("replace", text)
+
+    async def redact(self, text):
+        """
+        Redact the PII entities of a text.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            AnonymizationResult: The redacted text and its redaction log, which can be unpacked as (text, log).
+        """
+        return await self._submit("redact", text)
+
+    async def _submit(self, mode, text):
+        queue = self._queues.get(mode)
+        if queue is None:
+            queue = self._queues[mode] = asyncio.Queue()
+            self.metrics._queues.append(queue)
+            self._workers[mode] = asyncio.ensure_future(self._batch_loop(mode, queue))
+
+        request = _Request(text, asyncio.get_running_loop().create_future())
+        await queue.put(request)
+        return await request.future
+
+    async def _batch_loop(self, mode, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests cancelled while waiting are not anonymized
+            batch = [request for request in batch if not request.future.done()]
+            if not batch:
+                continue
+            self.metrics.batches += 1
+            self.metrics.batch_sizes[len(batch)] += 1
+
+            try:
+                results = await loop.run_in_executor(self._get_executor(), self._anonymize_batch, mode,
+                                                     [request.text for request in batch])
+            except Exception as error:
+                # e.g. the anonymizer could not be created, every request of the batch fails
+                results = [(None, error)] * len(batch)
+            now = time.perf_counter()
+            for request, (result, error) in zip(batch, results):
+                self.metrics.requests += 1
+                self.metrics.latencies.append((now - request.submitted) * 1000)
+                if request.future.done():
+                    continue
+                if error is not None:
+                    self.metrics.errors += 1
+                    request.future.set_exception(error)
+                else:
+                    request.future.set_result(result)
+
+    def _get_executor(self):
+        if self._executor is None:
+            # One thread per mode: the batches of a mode run one after the other on the same anonymizer
+            self._executor = ThreadPoolExecutor(max_workers=len(MODES), thread_name_prefix="hexanonyme-service")
+        return self._executor
+
+    def _get_anonymizer(self, mode):
+        anonymizer = self._anonymizers[mode]
+        if anonymizer is None:
+            from .anonymizer.redact_anonymizer import RedactAnonymizer
+            from .anonymizer.replace_anonymizer import ReplaceAnonymizer
+
+            kwargs = dict(self.anonymizer_kwargs)
+            if mode == "replace":
+                anonymizer_class = ReplaceAnonymizer
+            else:
+                # Options of the replacements only
+                anonymizer_class = RedactAnonymizer
+                kwargs.pop("faker", None)
+                kwargs.pop("replacement_dict", None)
+            anonymizer = self._anonymizers[mode] = anonymizer_class(**kwargs)
+        return anonymizer
+
+    def _anonymize_batch(self, mode, texts):
+        # Runs on the executor, returns one (result, error) pair per text
+        anonymizer = self._get_anonymizer(mode)
+        if mode == "replace":
+            anonymize_batch, anonymize = anonymizer.replace_batch, anonymizer.replace
+        else:
+            anonymize_batch, anonymize = anonymizer.redact_batch, anonymizer.redact
+
+        try:
+            return [(result, None) for result in anonymize_batch(texts, batch_size=len(texts), return_result=True)]
+        except Exception:
+            pass
+
+        # The batch failed, texts are anonymized one by one so that only the faulty requests fail
+        results = []
+        for text in texts:
+            try:
+                results.append((anonymize(text, return_result=True), None))
+            except Exception as error:
+                results.append((None, error))
+        return results
+
+    async def close(self):
+        """
+        Stop the batching tasks and the executor owned by this instance. Pending requests are cancelled.
+        """
+        for worker in self._workers.values():
+            worker.cancel()
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+        self._workers, self._queues = {}, {}
+        self.metrics._queues = []
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,80 @@
+from operator import itemgetter
+
+import numpy as np
+
+_start = itemgetter("start")
+_end = itemgetter("end")
+
+
+class SpanTable:
+    """
+    Columnar view of a list of entities: NumPy arrays of their offsets.
+
+    Resolving nested entities is a vectorized operation on the arrays, which selects rows by index instead of
+    comparing dictionaries one by one. Each row refers to an entity dictionary: the dictionaries are read once by
+    `from_entities` and given back unchanged by `to_entities`.
+
+    Reading the columns out of the dictionaries costs about as much as one pass of the dictionary code, so the
+    table pays off on long lists of entities, where the sort dominates.
+
+    Args:
+        entities (list): The entity dictionaries the rows refer to.
+        rows (np.ndarray): Index in `entities` of the dictionary of each row.
+        starts (np.ndarray): Start offset of each row.
+        ends (np.ndarray): End offset of each row.
+    """
+    __slots__ = ("entities", "rows", "starts", "ends")
+
+    def __init__(self, entities, rows, starts, ends):
+        self.entities = entities
+        self.rows = rows
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_entities(cls, entities):
+        """
+        Build a table from entity dictionaries.
+
+        Args:
+            entities (list): Dictionaries with the "start" and "end" of each entity.
+
+        Returns:
+            SpanTable: The table, with one row per entity in the order of the list.
+        """
+        entities = list(entities)
+        count = len(entities)
+        return cls(entities, np.arange(count), np.fromiter(map(_start, entities), dtype=np.int64, count=count),
+                   np.fromiter(map(_end, entities), dtype=np.int64, count=count))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def resolve_longest(self):
+        """
+        Drop the rows included in another row, keeping the last one among identical rows.
+
+        Same result as `resolve_overlaps` with the "longest" strategy: sorted by start, then longest first, a row is
+        included in a previous one iff one of the previous rows ends after it, which is a cumulative maximum.
+
+        Returns:
+            SpanTable: The kept rows, sorted by start.
+        """
+        if len(self) < 2:
+            return self
+        order = np.lexsort((-np.arange(len(self)), -self.ends, self.starts))
+        ends = self.ends[order]
+        kept = np.empty(len(self), dtype=bool)
+        kept[0] = True
+        np.greater(ends[1:], np.maximum.accumulate(ends)[:-1], out=kept[1:])
+        kept = order[kept]
+        return SpanTable(self.entities, self.rows[kept], self.starts[kept], self.ends[kept])
+
+    def to_entities(self):
+        """
+        Entity dictionaries of the rows.
+
+        Returns:
+            list: The dictionary of each row, in the order of the rows.
+        """
+        return list(map(self.entities.__getitem__, self.rows.tolist()))
@@ -0,0 +1,41 @@
+def iter_chunks(source, chunk_size=65536):
+    """
+    Iterate over the text of a source in chunks of bounded size.
+
+    Args:
+        source (str, file-like object or iterable): A text, an object with a `read` method (e.g. an open file),
+            or an iterable of text chunks.
+        chunk_size (int): Maximum size of the yielded chunks.
+
+    Yields:
+        str: The successive chunks of the text.
+    """
+    if isinstance(source, str):
+        chunks = [source]
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), "")
+    else:
+        chunks = source
+
+    for chunk in chunks:
+        # Large chunks are split so that the consumer never has to slice a huge buffer
+        for i in range(0, len(chunk), chunk_size):
+            yield chunk[i:i + chunk_size]
+
+
+def shift_entity(entity, offset, start=None):
+    """
+    Copy an entity with its offsets moved by `offset`.
+
+    Args:
+        entity (dict): The entity.
+        offset (int): Value added to the offsets.
+        start (int): If given, the shifted start is raised to this value.
+
+    Returns:
+        dict: The shifted copy of the entity.
+    """
+    shifted_start = entity["start"] + offset
+    if start is not None:
+        shifted_start = max(shifted_start, start)
+    return dict(entity, start=shifted_start, end=entity["end"] + offset)
@@ -23,8 +23,16 @@ setup(
         'sentencepiece>=0.1.99',
         'faker>=19.3.1', 
         'torch>=2.0.1',
+        'numpy>=1.21',
 
     ],
+    extras_require={
+        'onnx': ['optimum[onnxruntime]>=1.13.0'],
+        'parquet': ['pyarrow>=10.0.0'],
+    },
+    entry_points={
+        'console_scripts': ['hexanonyme=hexanonyme.cli:main'],
+    },
     license="MIT",
     classifiers=[
         "Intended Audience :: Developers",
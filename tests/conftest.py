@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline
+
+
+class SlowPipeline(FakePipeline):
+    """
+    Fake pipeline taking a fixed time per call, and recording the (start, end) time of each call.
+    """
+
+    def __init__(self, model, delay, timings):
+        super().__init__(model)
+        self.delay = delay
+        self.timings = timings
+
+    def __call__(self, inputs, **kwargs):
+        start = time.perf_counter()
+        time.sleep(self.delay)
+        self.timings.append((start, time.perf_counter()))
+        return super().__call__(inputs, **kwargs)
+
+
+@pytest.fixture
+def slow_registry():
+    """
+    Build registries of slow fake pipelines.
+
+    Returns:
+        callable: Called with the delay of each call in seconds, returns the registry and the list in which the
+            (start, end) time of every call of its pipelines is recorded.
+    """
+    def make(delay):
+        # list.append is atomic, the pipelines may run on several threads
+        calls = []
+        return ModelRegistry(loader=lambda model, task, device, **kwargs: SlowPipeline(model, delay, calls)), calls
+
+    return make
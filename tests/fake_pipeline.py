@@ -0,0 +1,44 @@
+import re
+from hexanonyme.core.registry import ModelRegistry
+
+# Entities recognised by the fake pipelines, by label
+GAZETTEER = {
+    "PER": ["Jean Dupont", "Marie Curie", "John Doe"],
+    "LOC": ["Paris", "Lyon"],
+    "ORG": ["Renault"],
+}
+
+
+class FakePipeline:
+    """
+    Stand-in for a token classification pipeline, finding the entities of a small gazetteer.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def _classify(self, text):
+        entities = []
+        for label, words in GAZETTEER.items():
+            for word in words:
+                for match in re.finditer(re.escape(word), text):
+                    entities.append({"entity_group": label, "score": 0.9, "word": word,
+                                     "start": match.start(), "end": match.end()})
+        return sorted(entities, key=lambda x: x["start"])
+
+    def __call__(self, inputs, **kwargs):
+        self.calls += 1
+        if isinstance(inputs, str):
+            return self._classify(inputs)
+        return [self._classify(text) for text in inputs]
+
+
+def fake_registry():
+    """
+    Build a model registry for tests which do not download the NER models.
+
+    Returns:
+        ModelRegistry: A registry loading fake pipelines instead of the NER models.
+    """
+    return ModelRegistry(loader=lambda model, task, device, **kwargs: FakePipeline(model))
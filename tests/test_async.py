@@ -0,0 +1,67 @@
+import asyncio
+import time
+import unittest
+import pytest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.service import AsyncAnonymizer
+
+TEXTS = [
+    "Jean Dupont habite à Paris.",
+    "Appelez Marie Curie au 06 12 34 56 78.",
+    "Merci.",
+    "John Doe travaille chez Renault à Lyon, écrivez à john.doe@example.fr.",
+]
+
+
+class TestAsyncAnonymizer(unittest.IsolatedAsyncioTestCase):
+
+    @pytest.fixture(autouse=True)
+    def registry(self, slow_registry):
+        self.registry, _ = slow_registry(0.02)
+
+    async def test_results_match_the_synchronous_api(self):
+        replace_anonymizer = ReplaceAnonymizer(faker=False, registry=self.registry)
+        redact_anonymizer = RedactAnonymizer(registry=self.registry)
+        expected_replace = [replace_anonymizer.replace(text, return_result=True) for text in TEXTS]
+        expected_redact = [redact_anonymizer.redact(text, return_result=True) for text in TEXTS]
+
+        async with AsyncAnonymizer(faker=False, registry=self.registry, max_batch_size=8, max_wait_ms=20) as service:
+            replaced = await asyncio.gather(*[service.replace(text) for text in TEXTS * 5])
+            redacted = await asyncio.gather(*[service.redact(text) for text in TEXTS * 5])
+
+        self.assertEqual(replaced, expected_replace * 5)
+        self.assertEqual(redacted, expected_redact * 5)
+
+    async def test_micro_batches(self):
+        async with AsyncAnonymizer(registry=self.registry, max_batch_size=4, max_wait_ms=50) as service:
+            await asyncio.gather(*[service.redact(text) for text in TEXTS * 3])
+            metrics = service.metrics.snapshot()
+
+        self.assertEqual(metrics["requests"], 12)
+        self.assertEqual(metrics["batch_sizes"], {4: 3})
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertGreater(metrics["latency_ms"]["p99"], 0)
+
+    async def test_failing_request_fails_alone(self):
+        async with AsyncAnonymizer(registry=self.registry, max_wait_ms=20) as service:
+            results = await asyncio.gather(service.redact(TEXTS[0]), service.redact(None), service.redact(TEXTS[1]),
+                                           return_exceptions=True)
+
+        self.assertEqual(results[0].text, "[REDACTED] habite à [REDACTED].")
+        self.assertIsInstance(results[1], Exception)
+        self.assertEqual(results[2].text, "Appelez [REDACTED] au [REDACTED].")
+        self.assertEqual(service.metrics.errors, 1)
+
+    async def test_event_loop_is_not_blocked(self):
+        async with AsyncAnonymizer(registry=self.registry, max_wait_ms=1) as service:
+            await service.redact(TEXTS[0])  # The anonymizer is created by the first request
+            task = asyncio.ensure_future(service.redact(TEXTS[1]))
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            self.assertLess(time.perf_counter() - start, 0.01)
+            await task
+
+
+if __name__ == '__main__':
+    unittest.main()
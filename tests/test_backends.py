@@ -0,0 +1,63 @@
+import importlib.util
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline
+
+HAS_ONNX = importlib.util.find_spec("optimum") is not None and importlib.util.find_spec("onnxruntime") is not None
+
+CORPUS = [
+    "Bonjour, je m'appelle Jean Dupont et j'habite au 10 rue Victor Hugo, 75001 Paris.",
+    "Mme Claire Martin travaille chez Renault à Lyon depuis le 3 janvier 2023.",
+    "Merci de rappeler Pierre Lefèvre au 06 12 34 56 78 ou d'écrire à pierre.lefevre@example.fr.",
+    "Le rendez-vous avec le docteur Sophie Bernard est fixé au 12 mars à Marseille.",
+    "La société Air France a ouvert un bureau au 45 avenue des Champs-Élysées.",
+]
+
+
+def spans(anonymizer):
+    return [[(entity["entity_group"], entity["start"], entity["end"]) for entity in anonymizer._detect_entities(text)]
+            for text in CORPUS]
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_backend_is_given_to_the_loader(self):
+        loaded = []
+
+        def loader(model, task, device, **kwargs):
+            loaded.append(kwargs)
+            return FakePipeline(model)
+
+        registry = ModelRegistry(loader=loader)
+        RedactAnonymizer(registry=registry).warmup()
+        RedactAnonymizer(registry=registry, backend="onnx-int8").warmup()
+        self.assertEqual(loaded[0], {"aggregation_strategy": "simple"})
+        self.assertEqual(loaded[-1], {"aggregation_strategy": "simple", "backend": "onnx-int8"})
+        self.assertEqual(len(registry), 6)
+
+    def test_unsupported_backend(self):
+        with self.assertRaises(ValueError):
+            RedactAnonymizer(registry=ModelRegistry(loader=lambda *args, **kwargs: None), backend="tensorrt")
+
+
+@unittest.skipUnless(HAS_ONNX, "optimum[onnxruntime] is not installed")
+class TestOnnxParity(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = spans(RedactAnonymizer())
+
+    def test_onnx_matches_torch(self):
+        self.assertEqual(spans(RedactAnonymizer(backend="onnx")), self.reference)
+
+    def test_onnx_int8_keeps_the_entities(self):
+        reference = {(i, span) for i, text_spans in enumerate(self.reference) for span in text_spans}
+        quantized = {(i, span) for i, text_spans in enumerate(spans(RedactAnonymizer(backend="onnx-int8")))
+                     for span in text_spans}
+        f1 = 2 * len(reference & quantized) / (len(reference) + len(quantized))
+        self.assertGreaterEqual(f1, 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from benchmarks.compare import compare
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.suite import Suite
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        text, entities = CorpusGenerator(seed=3).document(2000, index=1)
+
+        self.assertEqual(CorpusGenerator(seed=3).document(2000, index=1), (text, entities))
+        self.assertNotEqual(CorpusGenerator(seed=4).document(2000, index=1)[0], text)
+        self.assertNotEqual(CorpusGenerator(seed=3).document(2000, index=2)[0], text)
+        self.assertGreaterEqual(len(text), 2000)
+
+    def test_corpus_spans(self):
+        text, entities = CorpusGenerator().document(5000)
+
+        self.assertTrue(entities)
+        for entity in entities:
+            self.assertEqual(text[entity["start"]:entity["end"]], entity["word"])
+        self.assertEqual(CorpusGenerator(pii_rate=0).document(1000)[1], [])
+
+    def test_scenarios_without_models(self):
+        suite = Suite([1000], repeat=2)
+        results = suite.run(["resolve", "regex_all", "deanonymize_offsets", "deanonymize_placeholders"])
+
+        self.assertEqual([result["name"] for result in results],
+                         ["resolve", "regex_all", "deanonymize_offsets", "deanonymize_placeholders"])
+        for result in results:
+            self.assertEqual(result["repeat"], 2)
+            self.assertLessEqual(result["min_ms"], result["median_ms"])
+        self.assertGreater(results[1]["recall"], 0.5)
+
+    def test_compare(self):
+        old = {("replace", 1000): {"min_ms": 10.0}, ("resolve", 1000): {"min_ms": 1.0},
+               ("redact", 1000): {"min_ms": 10.0}, ("regex_all", 1000): {"min_ms": 1.0}}
+        new = {("replace", 1000): {"min_ms": 12.0}, ("resolve", 1000): {"min_ms": 0.5},
+               ("redact", 1000): {"min_ms": 10.5}}
+        rows = compare(old, new, threshold=0.1)
+
+        self.assertEqual([(name, status) for name, _, _, _, _, status in rows],
+                         [("redact", ""), ("replace", "regression"), ("resolve", "improvement")])
+        self.assertAlmostEqual(rows[1][4], 1.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
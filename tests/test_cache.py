@@ -0,0 +1,132 @@
+import os
+import tempfile
+import time
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.cache import MemoryCache, SqliteCache, cache_key
+from hexanonyme.core.sentences import split_sentences
+from tests.fake_pipeline import fake_registry
+
+ENTITIES = [{"entity_group": "PER", "score": 0.9, "source": "model", "word": "Jean Dupont", "start": 0, "end": 11}]
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.put("a", ENTITIES)
+        cache.put("b", [])
+        cache.get("a")
+        cache.put("c", [])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ENTITIES)
+        self.assertEqual(len(cache), 2)
+
+    def test_size_eviction(self):
+        cache = MemoryCache(max_entries=None, max_bytes=1000)
+        for i in range(100):
+            cache.put(str(i), ENTITIES)
+        self.assertLessEqual(cache.size, 1000)
+        self.assertIsNotNone(cache.get("99"))
+        self.assertIsNone(cache.get("0"))
+
+    def test_ttl(self):
+        cache = MemoryCache(ttl=0.05)
+        cache.put("a", ENTITIES)
+        self.assertIsNotNone(cache.get("a"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_counters_and_copies(self):
+        cache = MemoryCache()
+        cache.put("a", ENTITIES)
+        cache.get("a")[0]["start"] = 5
+        cache.get("b")
+        self.assertEqual(cache.get("a"), ENTITIES)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "entries": 1, "hit_rate": 2 / 3})
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def test_persistence_and_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "entities.db")
+            cache = SqliteCache(path, max_entries=2)
+            cache.put_many([("a", ENTITIES), ("b", []), ("c", [])])
+            self.assertEqual(len(cache), 2)
+            cache.close()
+
+            cache = SqliteCache(path)
+            self.assertEqual(cache.get("c"), [])
+            self.assertIsNone(cache.get("missing"))
+            self.assertEqual(cache.hits, 1)
+            cache.close()
+
+    def test_ttl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SqliteCache(os.path.join(directory, "entities.db"), ttl=0.05)
+            cache.put("a", ENTITIES)
+            self.assertEqual(cache.get("a"), ENTITIES)
+            time.sleep(0.1)
+            self.assertIsNone(cache.get("a"))
+            cache.close()
+
+
+class TestSentences(unittest.TestCase):
+
+    def test_split_sentences(self):
+        text = " Bonjour. M. Dupont est né le 12.03.2024 !\nMerci  "
+        self.assertEqual([text[start:end] for start, end in split_sentences(text)],
+                         ["Bonjour.", "M. Dupont est né le 12.03.2024 !", "Merci"])
+
+
+class TestAnonymizerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = fake_registry()
+        self.text = "Jean Dupont habite à Paris. Appelez le 06 12 34 56 78."
+
+    def calls(self, anonymizer):
+        return sum(classifier.calls for classifier, _ in anonymizer.classifier_filtres)
+
+    def test_hit_skips_inference(self):
+        cache = MemoryCache()
+        anonymizer = RedactAnonymizer(registry=self.registry, cache=cache)
+        uncached = RedactAnonymizer(registry=self.registry)
+
+        expected = uncached.redact(self.text)
+        self.assertEqual(anonymizer.redact(self.text), expected)
+        calls = self.calls(anonymizer)
+        self.assertEqual(anonymizer.redact("  " + self.text), "  " + expected)
+        self.assertEqual(anonymizer.log_redactions[0]["start"], 2)
+        self.assertEqual(self.calls(anonymizer), calls)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cached_entities_are_not_replacements(self):
+        cache = MemoryCache()
+        anonymizer = ReplaceAnonymizer(registry=self.registry, cache=cache)
+        anonymizer.replace(self.text)
+        entities = cache.get(cache_key(self.text, anonymizer._cache_signature()))
+        self.assertEqual([entity["word"] for entity in entities], ["Jean Dupont", "Paris", "06 12 34 56 78"])
+
+    def test_sentences_partial_reuse(self):
+        cache = MemoryCache()
+        anonymizer = RedactAnonymizer(registry=self.registry, cache=cache, cache_sentences=True)
+        uncached = RedactAnonymizer(registry=self.registry)
+
+        anonymizer.redact(self.text)
+        text = "Marie Curie vit à Lyon. " + self.text
+        self.assertEqual(anonymizer.redact_batch([text, text]), uncached.redact_batch([text, text]))
+        self.assertEqual(anonymizer.log_redactions_batch, uncached.log_redactions_batch)
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+    def test_configuration_changes_the_key(self):
+        cache = MemoryCache()
+        RedactAnonymizer(registry=self.registry, cache=cache).redact(self.text)
+        RedactAnonymizer(["TEL"], registry=self.registry, cache=cache).redact(self.text)
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from hexanonyme.cli import main
+from hexanonyme.core import files
+from hexanonyme.core.files import anonymize_file
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.records = [{"id": i, "text": f"Appelez le 06 12 34 {10 + i:02d} 78", "meta": {"note": f"mail{i}@exemple.fr"}}
+                        for i in range(25)]
+        self.records[3]["text"] = None
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_jsonl(self, name, records):
+        with open(self.path(name), "w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+        return self.path(name)
+
+    def read_jsonl(self, name):
+        with open(self.path(name), encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_jsonl_fields_and_log(self):
+        input_path = self.write_jsonl("input.jsonl", self.records)
+        code = main([input_path, self.path("output.jsonl"), "--fields", "text", "meta.note", "--mode", "redact",
+                     "--entities", "TEL", "MAIL", "--log", self.path("log.jsonl"), "--quiet"])
+
+        self.assertEqual(code, 0)
+        output = self.read_jsonl("output.jsonl")
+        self.assertEqual([record["id"] for record in output], list(range(25)))
+        self.assertEqual(output[0], {"id": 0, "text": "Appelez le [REDACTED]", "meta": {"note": "[REDACTED]"}})
+        self.assertIsNone(output[3]["text"])
+
+        log = self.read_jsonl("log.jsonl")
+        self.assertEqual(len(log), 49)
+        self.assertEqual(log[0]["field"], "text")
+        self.assertEqual(log[0]["log"][0]["original"], "06 12 34 10 78")
+
+    def test_csv_with_workers(self):
+        with open(self.path("input.csv"), "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=["id", "text"])
+            writer.writeheader()
+            writer.writerows({"id": i, "text": f"Écrivez à jean{i}@exemple.fr"} for i in range(40))
+
+        stats = anonymize_file(self.path("input.csv"), self.path("output.csv"), fields=["text"], workers=3,
+                               executor="thread", shard_size=4, entities=["MAIL"], faker=False)
+
+        with open(self.path("output.csv"), encoding="utf-8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(stats.records, 40)
+        self.assertEqual([row["id"] for row in rows], [str(i) for i in range(40)])
+        self.assertTrue(all(row["text"] == "Écrivez à <MAIL>" for row in rows))
+
+    def test_text_lines(self):
+        with open(self.path("input.txt"), "w", encoding="utf-8") as file:
+            file.write("Appelez le 06 12 34 56 78\n\nÉcrivez à jean@exemple.fr\n")
+
+        anonymize_file(self.path("input.txt"), self.path("output.txt"), mode="redact", entities=["TEL", "MAIL"])
+
+        with open(self.path("output.txt"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "Appelez le [REDACTED]\n\nÉcrivez à [REDACTED]\n")
+
+    def test_resume_from_checkpoint(self):
+        input_path = self.write_jsonl("input.jsonl", self.records)
+        expected_path = self.path("expected.jsonl")
+        anonymize_file(input_path, expected_path, mode="redact", entities=["TEL"], log_path=self.path("log1.jsonl"))
+
+        # The run is interrupted after 12 records, with a checkpoint every 5 records
+        original_write = files.RecordWriter.write
+        calls = []
+
+        def interrupted_write(writer, record):
+            calls.append(record)
+            if len(calls) > 12:
+                raise KeyboardInterrupt
+            original_write(writer, record)
+
+        checkpoint_path = self.path("run.ckpt")
+        with mock.patch.object(files.RecordWriter, "write", interrupted_write):
+            with self.assertRaises(KeyboardInterrupt):
+                anonymize_file(input_path, self.path("output.jsonl"), mode="redact", entities=["TEL"],
+                               checkpoint_path=checkpoint_path, checkpoint_every=5, log_path=self.path("log2.jsonl"))
+        with open(checkpoint_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["records"], 10)
+
+        stats = anonymize_file(input_path, self.path("output.jsonl"), mode="redact", entities=["TEL"],
+                               checkpoint_path=checkpoint_path, checkpoint_every=5, log_path=self.path("log2.jsonl"))
+
+        self.assertEqual(stats.skipped, 10)
+        self.assertEqual(stats.records, 25)
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assertEqual(self.read_jsonl("output.jsonl"), self.read_jsonl("expected.jsonl"))
+        self.assertEqual(self.read_jsonl("log2.jsonl"), self.read_jsonl("log1.jsonl"))
+
+    def test_checkpoint_on_a_failing_record(self):
+        input_path = self.write_jsonl("input.jsonl", [{"id": i, "text": f"Appelez le 06 12 34 {10 + i:02d} 78"}
+                                                      for i in range(25)])
+        original_run = files.CorpusRunner.run
+        original_write = files.RecordWriter.write
+        calls = []
+
+        def run(runner, texts):
+            for result in original_run(runner, texts):
+                if result.index == 4:
+                    result.text, result.error = None, "ValueError: failed"
+                yield result
+
+        def interrupted_write(writer, record):
+            calls.append(record)
+            if len(calls) > 7:
+                raise KeyboardInterrupt
+            original_write(writer, record)
+
+        # The fifth record fails, the checkpoint of the first five records is saved all the same
+        checkpoint_path = self.path("run.ckpt")
+        with mock.patch.object(files.CorpusRunner, "run", run), \
+                mock.patch.object(files.RecordWriter, "write", interrupted_write):
+            with self.assertRaises(KeyboardInterrupt):
+                anonymize_file(input_path, self.path("output.jsonl"), mode="redact", entities=["TEL"],
+                               checkpoint_path=checkpoint_path, checkpoint_every=5)
+        with open(checkpoint_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["records"], 5)
+
+    def test_failing_record_is_dropped(self):
+        input_path = self.write_jsonl("input.jsonl", self.records[:4])
+        original = files.CorpusRunner.run
+
+        def run(runner, texts):
+            for result in original(runner, texts):
+                if result.index == 1:
+                    result.text, result.error = None, "ValueError: failed"
+                yield result
+
+        with mock.patch.object(files.CorpusRunner, "run", run):
+            code = main([input_path, self.path("output.jsonl"), "--entities", "TEL", "--quiet"])
+
+        self.assertEqual(code, 1)
+        self.assertEqual([record["id"] for record in self.read_jsonl("output.jsonl")], [0, 2, 3])
+
+    def test_unknown_format(self):
+        self.assertEqual(main([self.path("input.xml"), self.path("output.xml"), "--quiet"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import pytest
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+
+
+class TestConcurrentModels(unittest.TestCase):
+
+    @pytest.fixture(autouse=True)
+    def registry(self, slow_registry):
+        self.registry, self.calls = slow_registry(0.1)
+
+    def setUp(self):
+        self.text = "Jean Dupont travaille chez Renault à Paris, tel 06 12 34 56 78."
+
+    def test_concurrent_mode_matches_sequential_mode(self):
+        sequential = ReplaceAnonymizer(faker=False, registry=self.registry)
+        concurrent = ReplaceAnonymizer(faker=False, registry=self.registry, concurrent_models=True)
+
+        self.assertEqual(concurrent.replace(self.text), sequential.replace(self.text))
+        self.assertEqual(concurrent.log_replacements, sequential.log_replacements)
+        self.assertEqual(concurrent._detect_entities_batch([self.text, "Merci."]),
+                         sequential._detect_entities_batch([self.text, "Merci."]))
+
+    def test_models_run_at_the_same_time(self):
+        anonymizer = ReplaceAnonymizer(faker=False, registry=self.registry, concurrent_models=True)
+        self.assertEqual(len(anonymizer.classifier_filtres), 3)
+
+        anonymizer.replace(self.text)
+        # Every call started before any of them ended
+        self.assertEqual(len(self.calls), 3)
+        self.assertLess(max(start for start, _ in self.calls), min(end for _, end in self.calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
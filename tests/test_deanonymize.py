@@ -0,0 +1,96 @@
+import random
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.result import LogEntry, restore_text
+from tests.fake_pipeline import fake_registry
+
+
+def large_document(size):
+    rng = random.Random(0)
+    sentences = ["Jean Dupont a rencontré Marie Curie à Paris.", "Appelez le 06 12 34 56 78\n",
+                 "Bonjour,\n\n  merci  de votre retour.", "Renault ouvre une usine à Lyon.",
+                 "Écrivez à john.doe@example.fr ou à John Doe."]
+    parts, length = [], 0
+    while length < size:
+        parts.append(rng.choice(sentences))
+        length += len(parts[-1]) + 1
+    return " ".join(parts)
+
+
+class TestDeanonymize(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = fake_registry()
+
+    def test_replacement_occurring_in_the_text(self):
+        anonymizer = ReplaceAnonymizer(["PER"], faker=False, replacement_dict={"PER": "Lyon"}, registry=self.registry)
+        text = "Lyon est loin. Jean Dupont habite à Lyon."
+        result = anonymizer.replace(text, return_result=True)
+        self.assertEqual(result.text, "Lyon est loin. Lyon habite à Lyon.")
+        self.assertEqual(anonymizer.deanonymize(result.text, result), text)
+
+    def test_fake_value_occurring_in_the_text_without_log(self):
+        anonymizer = ReplaceAnonymizer(["PER"], registry=self.registry)
+        anonymizer._get_faker_value = lambda entity_type: "Lyon"
+        text = "Lyon est loin. Jean Dupont habite à Lyon."
+        anonymized_text = anonymizer.replace(text)
+        self.assertEqual(anonymized_text, "Lyon est loin. Lyon habite à Lyon.")
+        self.assertEqual(anonymizer.deanonymize(anonymized_text), text)
+        # The fake value is not restored everywhere in a text which was moved around either
+        self.assertEqual(anonymizer.deanonymize("Lyon, Lyon ?"), "Jean Dupont, Lyon ?")
+
+        anonymizer = RedactAnonymizer(["PER"], registry=self.registry)
+        text = "[REDACTED] par Jean Dupont."
+        redacted_text = anonymizer.redact(text)
+        self.assertEqual(anonymizer.deanonymize(redacted_text), text)
+
+    def test_stream_without_log(self):
+        text = large_document(20000)
+        for anonymizer in [ReplaceAnonymizer(registry=self.registry), RedactAnonymizer(registry=self.registry)]:
+            stream = anonymizer.replace_stream if isinstance(anonymizer, ReplaceAnonymizer) else anonymizer.redact_stream
+            anonymized_text = "".join(stream(text, window_size=500, overlap=50))
+            self.assertEqual(anonymizer.deanonymize(anonymized_text), text)
+
+    def test_multi_word_redaction_keeps_the_spacing(self):
+        anonymizer = RedactAnonymizer(registry=self.registry)
+        text = "Jean Dupont\n\thabite   à Paris."
+        result = anonymizer.redact(text, return_result=True)
+        self.assertEqual(anonymizer.deanonymize(result.text, result), text)
+
+    def test_megabyte_round_trip(self):
+        text = large_document(1_000_000)
+        for anonymizer in [ReplaceAnonymizer(registry=self.registry), RedactAnonymizer(registry=self.registry)]:
+            anonymize = anonymizer.replace if isinstance(anonymizer, ReplaceAnonymizer) else anonymizer.redact
+            result = anonymize(text, return_result=True)
+            self.assertGreater(len(result.log), 10000)
+            self.assertEqual(anonymizer.deanonymize(result.text, result.log), text)
+
+    def test_indexed_placeholders(self):
+        anonymizer = ReplaceAnonymizer(registry=self.registry, indexed_placeholders=True)
+        text = "Jean Dupont a vu Marie Curie à Paris. Jean Dupont repart à Lyon."
+        result = anonymizer.replace(text, return_result=True)
+        self.assertEqual(result.text, "<PER_1> a vu <PER_2> à <LOC_1>. <PER_1> repart à <LOC_2>.")
+
+        # An LLM answer moving and repeating the placeholders
+        answer = "<LOC_2> et <LOC_1> : <PER_2> a vu <PER_1>, puis <PER_1> est parti."
+        self.assertEqual(anonymizer.deanonymize(answer, result),
+                         "Lyon et Paris : Marie Curie a vu Jean Dupont, puis Jean Dupont est parti.")
+
+    def test_indexed_redactions(self):
+        anonymizer = RedactAnonymizer(registry=self.registry, indexed_placeholders=True)
+        text = "Jean Dupont habite à Paris, Jean Dupont travaille à Lyon."
+        result = anonymizer.redact(text, return_result=True)
+        self.assertEqual(result.text, "[REDACTED_1] habite à [REDACTED_2], [REDACTED_1] travaille à [REDACTED_3].")
+        self.assertEqual(anonymizer.deanonymize("[REDACTED_3] puis [REDACTED_1]", result), "Lyon puis Jean Dupont")
+
+    def test_legacy_logs(self):
+        self.assertEqual(restore_text("a [REDACTED] b [REDACTED]", [{"word": "x y", "entity_group": "PER",
+                                                                    "start": 2, "end": 5}, {"word": "z"}]),
+                         "a x y b z")
+        self.assertEqual(restore_text("<PER> et <PER>", [("Jean", "<PER>"), ("Marie", "<PER>")]), "Jean et Marie")
+        self.assertEqual(restore_text("moved text", [LogEntry("PER", "Jean", "<PER_1>", 0, 4, 0, 7)]), "moved text")
+
+
+if __name__ == '__main__':
+    unittest.main()
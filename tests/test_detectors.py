@@ -0,0 +1,53 @@
+import re
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.detectors import PatternDetector
+from tests.fake_pipeline import fake_registry
+
+
+class TestPatternDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PatternDetector()
+
+    def spans(self, text, **kwargs):
+        return [(entity["entity_group"], entity["start"], entity["end"]) for entity in self.detector.find(text, **kwargs)]
+
+    def test_repeated_matches_have_their_own_offsets(self):
+        text = "Appelez le 06 12 34 56 78, je répète : 06 12 34 56 78. Ou a.b@c.fr, a.b@c.fr."
+        self.assertEqual(self.spans(text), [("TEL", 11, 25), ("TEL", 39, 53), ("MAIL", 58, 66), ("MAIL", 68, 76)])
+
+    def test_email_starting_with_a_number(self):
+        self.assertEqual(self.spans("0612345678@free.fr"), [("MAIL", 0, 18)])
+
+    def test_labels_filter(self):
+        text = "06 12 34 56 78 a.b@c.fr"
+        self.assertEqual(self.spans(text, labels=["MAIL"]), [("MAIL", 15, 23)])
+
+    def test_builtin_patterns(self):
+        detector = PatternDetector(["MAIL", "IBAN", "SIRET", "NIR", "TEL"])
+        text = "IBAN FR76 3000 6000 0112 3456 7890 189, SIRET 584 042 105 00083, NIR 1 85 05 78 006 084 36"
+        labels = [(entity["entity_group"], entity["word"]) for entity in detector.find(text)]
+
+        self.assertEqual(labels, [("IBAN", "FR76 3000 6000 0112 3456 7890 189"), ("SIRET", "584 042 105 00083"),
+                                  ("NIR", "1 85 05 78 006 084 36")])
+
+    def test_register_custom_pattern(self):
+        self.detector.register("DOSSIER", r"dossier n°\d+", flags=re.IGNORECASE, first=True)
+        self.assertEqual(self.detector.labels, ["DOSSIER", "MAIL", "TEL"])
+        self.assertEqual(self.spans("Dossier N°0612345678"), [("DOSSIER", 0, 20)])
+
+        self.detector.unregister("DOSSIER")
+        self.assertEqual(self.spans("Dossier N°0612345678"), [("TEL", 10, 20)])
+
+    def test_anonymizer_with_registered_pattern(self):
+        detector = PatternDetector(["MAIL", "IBAN", "TEL"])
+        anonymizer = RedactAnonymizer(entities=["IBAN"], registry=fake_registry(), detector=detector)
+
+        self.assertIn("IBAN", anonymizer.supported_entities)
+        self.assertEqual(anonymizer.redact("IBAN : FR7630006000011234567890189, tel 06 12 34 56 78"),
+                         "IBAN : [REDACTED], tel 06 12 34 56 78")
+
+
+if __name__ == '__main__':
+    unittest.main()
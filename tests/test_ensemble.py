@@ -0,0 +1,60 @@
+import unittest
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.ensemble import SharedTokenizationEnsemble, tokenizer_signature
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline
+from tests.tiny_models import tiny_model, tiny_pipeline, tiny_tokenizer
+
+TEXTS = [
+    "Bonjour, je m'appelle Jean Dupont et j'habite au 10 rue Victor Hugo à Paris.",
+    "Marie Curie travaille chez Renault depuis le 3 janvier 2023.",
+    "Merci de rappeler Jean.",
+]
+
+
+class TestSharedTokenization(unittest.TestCase):
+
+    def setUp(self):
+        self.pipelines = [tiny_pipeline(tiny_model(seed)) for seed in range(3)]
+
+    def test_tokenizer_signature(self):
+        self.assertEqual(tokenizer_signature(tiny_tokenizer()), tokenizer_signature(tiny_tokenizer()))
+        self.assertNotEqual(tokenizer_signature(tiny_tokenizer()), tokenizer_signature(tiny_tokenizer(64)))
+
+    def test_groups(self):
+        pipelines = self.pipelines + [tiny_pipeline(tiny_model(3), tiny_tokenizer(64)), FakePipeline("fake")]
+        self.assertEqual(SharedTokenizationEnsemble(pipelines).groups, [[0, 1, 2], [3], [4]])
+
+    def test_matches_separate_pipelines(self):
+        ensemble = SharedTokenizationEnsemble(self.pipelines)
+        for text in TEXTS:
+            self.assertEqual(ensemble(text), [pipeline(text) for pipeline in self.pipelines])
+
+    def test_shared_encoder(self):
+        encoder = self.pipelines[0].model
+        pipelines = [self.pipelines[0], tiny_pipeline(tiny_model(1, encoder=encoder)), self.pipelines[2]]
+        ensemble = SharedTokenizationEnsemble(pipelines, shared_encoder=True)
+        self.assertEqual(ensemble.encoder_groups, [[[0, 1], [2]]])
+        for text in TEXTS:
+            for entities, expected in zip(ensemble(text), [pipeline(text) for pipeline in pipelines]):
+                self.assertEqual([(e["entity_group"], e["start"], e["end"]) for e in entities],
+                                 [(e["entity_group"], e["start"], e["end"]) for e in expected])
+                for entity, expected_entity in zip(entities, expected):
+                    self.assertAlmostEqual(float(entity["score"]), float(expected_entity["score"]), places=5)
+
+    def test_anonymizer_output_is_unchanged(self):
+        pipelines = {}
+        registry = ModelRegistry(loader=lambda model, task, device, **kwargs: pipelines.setdefault(
+            model, tiny_pipeline(tiny_model(len(pipelines)))))
+        shared = ReplaceAnonymizer(faker=False, registry=registry)
+        separate = ReplaceAnonymizer(faker=False, registry=registry, shared_tokenization=False)
+        concurrent = ReplaceAnonymizer(faker=False, registry=registry, concurrent_models=True)
+        self.assertIsNotNone(shared._get_ensemble())
+
+        for text in TEXTS:
+            self.assertEqual(shared._detect_entities(text), separate._detect_entities(text))
+            self.assertEqual(concurrent._detect_entities(text), separate._detect_entities(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
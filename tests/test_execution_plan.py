@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.plan import ExecutionPlan
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import fake_registry
+
+
+class TestExecutionPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.models = ["model-dates", "model-ner", "model-address"]
+        self.filters = [["ORG", "MISC", "DATE"], ["ADDRESS", "PER", "LOC", "DATE"], ["ADDRESS", "PER", "LOC", "DATE"]]
+
+    def test_models_are_selected_from_their_filters(self):
+        plan = ExecutionPlan(["PER", "TEL"], self.models, self.filters, ["MAIL", "TEL"])
+        self.assertEqual(plan.models, ["model-ner", "model-address"])
+        self.assertEqual(plan.skipped_models, ["model-dates"])
+        self.assertEqual(plan.pattern_labels, ["TEL"])
+
+        plan = ExecutionPlan(["DATE"], self.models, self.filters, ["MAIL", "TEL"])
+        self.assertEqual(plan.models, self.models)
+
+    def test_pattern_labels_run_no_model(self):
+        plan = ExecutionPlan(["TEL", "MAIL"], self.models, self.filters, ["MAIL", "TEL"])
+        self.assertEqual(plan.models, [])
+        self.assertIn("regex: ['TEL', 'MAIL']", repr(plan))
+
+    def test_anonymizer_loads_only_the_plan_models(self):
+        registry = fake_registry()
+        anonymizer = ReplaceAnonymizer(entities=["ORG"], faker=False, registry=registry)
+        self.assertEqual(anonymizer.plan.models, ["Jean-Baptiste/camembert-ner-with-dates", "DioulaD/birdi-finetuned-ner",
+                                                  "DioulaD/birdi-finetuned-ner-address-v2"])
+
+        anonymizer = ReplaceAnonymizer(entities=["TEL", "MAIL"], faker=False, registry=fake_registry())
+        self.assertEqual(anonymizer.classifier_filtres, [])
+        self.assertEqual(anonymizer.replace("Jean Dupont : 06 12 34 56 78, jean@exemple.fr"),
+                         "Jean Dupont : <TEL>, <MAIL>")
+
+    def test_skipped_model_does_not_hide_included_entities(self):
+        # The ORG model sees the whole bank name, the other models only the city
+        predictions = {"Jean-Baptiste/camembert-ner-with-dates": [{"entity_group": "ORG", "score": 0.9,
+                                                                   "word": "Banque de Lyon", "start": 0, "end": 14}]}
+        city = [{"entity_group": "LOC", "score": 0.9, "word": "Lyon", "start": 10, "end": 14}]
+        registry = ModelRegistry(loader=lambda model, task, device, **kwargs:
+                                 lambda texts, **kwargs: [predictions.get(model, city) for _ in texts])
+        text = "Banque de Lyon"
+
+        anonymizer = RedactAnonymizer(entities=["LOC"], registry=registry)
+        self.assertEqual(anonymizer.plan.skipped_models, ["Jean-Baptiste/camembert-ner-with-dates"])
+        self.assertEqual(anonymizer.redact(text), "Banque de [REDACTED]")
+
+        # With every model run, the city is part of the bank name
+        anonymizer = RedactAnonymizer(entities=["LOC", "ORG"], registry=registry)
+        self.assertEqual(anonymizer.plan.skipped_models, [])
+        self.assertEqual(anonymizer.redact(text), "[REDACTED]")
+
+    def test_regex_only_anonymizer_does_not_import_torch(self):
+        code = ("import sys\n"
+                "from hexanonyme import RedactAnonymizer\n"
+                "anonymizer = RedactAnonymizer(entities=['TEL', 'MAIL'])\n"
+                "assert anonymizer.redact('Tel : 06 12 34 56 78') == 'Tel : [REDACTED]'\n"
+                "assert 'torch' not in sys.modules and 'transformers' not in sys.modules\n")
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
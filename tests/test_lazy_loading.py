@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import hexanonyme
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline
+
+
+class TestLazyLoading(unittest.TestCase):
+
+    def setUp(self):
+        self.loaded = []
+
+        def loader(model, task, device, **kwargs):
+            self.loaded.append((model, kwargs))
+            return FakePipeline(model)
+
+        self.registry = ModelRegistry(loader=loader)
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        code = ("import sys, hexanonyme\n"
+                "anonymizer = hexanonyme.RedactAnonymizer(entities=['TEL', 'MAIL'])\n"
+                "assert anonymizer.redact('Appelez le 06 12 34 56 78.') == 'Appelez le [REDACTED].'\n"
+                "print(sorted(module for module in ('faker', 'transformers', 'torch') if module in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_lazy_exports(self):
+        self.assertIs(hexanonyme.ReplaceAnonymizer, ReplaceAnonymizer)
+        self.assertIn("AsyncAnonymizer", dir(hexanonyme))
+        with self.assertRaises(AttributeError):
+            hexanonyme.UnknownAnonymizer
+
+    def test_models_are_not_loaded_when_the_prefilter_skips_everything(self):
+        anonymizer = RedactAnonymizer(entities=["PER", "TEL"], registry=self.registry, prefilter=True)
+
+        self.assertEqual(anonymizer.redact("merci, à bientôt."), "merci, à bientôt.")
+        self.assertEqual(anonymizer.redact_batch(["", "bonne journée."]), ["", "bonne journée."])
+        self.assertEqual(self.loaded, [])
+        self.assertIsNone(anonymizer._classifier_filtres)
+
+    def test_models_are_loaded_on_first_use(self):
+        anonymizer = ReplaceAnonymizer(entities=["PER"], registry=self.registry)
+
+        self.assertEqual(self.loaded, [])
+        self.assertIsNone(anonymizer._fake)
+
+        anonymizer.replace("Jean Dupont habite à Paris.")
+        self.assertEqual([model for model, _ in self.loaded], anonymizer.plan.models)
+        self.assertIsNotNone(anonymizer._fake)
+        anonymizer.replace("Jean Dupont habite à Paris.")
+        self.assertEqual(len(self.loaded), len(anonymizer.plan.models))
+
+    def test_warmup(self):
+        anonymizer = RedactAnonymizer(entities=["PER", "LOC"], registry=self.registry)
+
+        self.assertIs(anonymizer.warmup(), anonymizer)
+        self.assertEqual(len(self.loaded), len(anonymizer.plan.models))
+        self.assertTrue(all(classifier.calls == 1 for classifier, _ in anonymizer.classifier_filtres))
+
+    def test_model_dir(self):
+        with tempfile.TemporaryDirectory() as model_dir:
+            os.mkdir(os.path.join(model_dir, "DioulaD--birdi-finetuned-ner"))
+            anonymizer = RedactAnonymizer(entities=["PER", "DATE"], registry=self.registry, model_dir=model_dir,
+                                          safetensors=True)
+            anonymizer.warmup()
+
+            self.assertEqual([model for model, _ in self.loaded],
+                             ["Jean-Baptiste/camembert-ner-with-dates",
+                              os.path.join(model_dir, "DioulaD--birdi-finetuned-ner"),
+                              "DioulaD/birdi-finetuned-ner-address-v2"])
+            self.assertTrue(all(kwargs["use_safetensors"] for _, kwargs in self.loaded))
+            # The entities of a local copy are not shared in the cache with the published model
+            self.assertNotEqual(anonymizer._cache_signature(),
+                                RedactAnonymizer(entities=["PER", "DATE"], registry=self.registry)._cache_signature())
+
+    def test_safetensors_needs_torch_backend(self):
+        with self.assertRaises(ValueError):
+            RedactAnonymizer(registry=self.registry, backend="onnx", safetensors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
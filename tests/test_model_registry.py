@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from hexanonyme.core.registry import ModelRegistry
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+
+
+class FakePipeline:
+    def __init__(self, model):
+        self.model_name = model
+
+    def __call__(self, text, **kwargs):
+        return []
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.loaded = []
+
+        def loader(model, task, device, **kwargs):
+            self.loaded.append(model)
+            return FakePipeline(model)
+
+        self.loader = loader
+
+    def test_pipeline_is_loaded_once(self):
+        registry = ModelRegistry(loader=self.loader)
+        first = registry.get("model-a", aggregation_strategy="simple")
+        second = registry.get("model-a", aggregation_strategy="simple")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loaded, ["model-a"])
+
+    def test_key_includes_task_and_device(self):
+        registry = ModelRegistry(loader=self.loader)
+        registry.get("model-a")
+        registry.get("model-a", device="cpu")
+        registry.get("model-a", task="ner")
+
+        self.assertEqual(len(registry), 3)
+        self.assertEqual(self.loaded, ["model-a"] * 3)
+
+    def test_concurrent_get_loads_a_single_copy(self):
+        def slow_loader(model, task, device, **kwargs):
+            time.sleep(0.05)
+            return self.loader(model, task, device, **kwargs)
+
+        registry = ModelRegistry(loader=slow_loader)
+        pipelines = []
+        threads = [threading.Thread(target=lambda: pipelines.append(registry.get("model-a"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loaded, ["model-a"])
+        self.assertTrue(all(pipeline is pipelines[0] for pipeline in pipelines))
+
+    def test_lru_cap(self):
+        registry = ModelRegistry(max_models=2, loader=self.loader)
+        registry.preload(["model-a", "model-b"])
+        registry.get("model-a")
+        registry.get("model-c")
+
+        self.assertEqual([key[0] for key in registry.resident_models()], ["model-a", "model-c"])
+
+    def test_idle_eviction(self):
+        registry = ModelRegistry(idle_timeout=0.01, loader=self.loader)
+        registry.get("model-a")
+        time.sleep(0.02)
+
+        self.assertEqual(registry.evict_idle(), 1)
+        self.assertNotIn("model-a", registry)
+
+    def test_anonymizers_share_pipelines(self):
+        registry = ModelRegistry(loader=self.loader)
+        replace_anonymizer = ReplaceAnonymizer(entities=["PER"], registry=registry)
+        redact_anonymizer = RedactAnonymizer(entities=["LOC"], registry=registry)
+
+        # The models are loaded on first use
+        self.assertEqual(self.loaded, [])
+        for (first, _), (second, _) in zip(replace_anonymizer.classifier_filtres, redact_anonymizer.classifier_filtres):
+            self.assertIs(first, second)
+        self.assertEqual(len(self.loaded), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+from hexanonyme.core.overlap import resolve_overlaps
+
+
+def legacy_drop_duplicates_and_included_entities(list_of_dicts):
+    # Former implementation of BaseAnonymizer.drop_duplicates_and_included_entities, used as reference
+    list_of_dicts = sorted(list_of_dicts, key=lambda x: x['start'])
+
+    def is_included(entity1, entity2):
+        return entity1['start'] >= entity2['start'] and entity1['end'] <= entity2['end']
+
+    changes_made = True
+    while changes_made:
+        changes_made = False
+        i = 0
+        while i < len(list_of_dicts):
+            current_entity = list_of_dicts[i]
+            for j in range(i + 1, len(list_of_dicts)):
+                if is_included(current_entity, list_of_dicts[j]):
+                    list_of_dicts.pop(i)
+                    changes_made = True
+                    break
+                elif is_included(list_of_dicts[j], current_entity):
+                    list_of_dicts.pop(j)
+                    changes_made = True
+                    break
+            else:
+                i += 1
+    return list_of_dicts
+
+
+def random_entities(rng, n, text_length=60):
+    entities = []
+    for _ in range(n):
+        start = rng.randrange(text_length)
+        end = rng.randint(start + 1, min(text_length, start + 15))
+        entities.append({
+            "entity_group": rng.choice(["PER", "LOC", "ORG"]),
+            "score": rng.choice([0.5, 0.8, 0.9, 1]),
+            "source": rng.choice(["model-a", "model-b", "regex"]),
+            "start": start,
+            "end": end,
+        })
+    return entities
+
+
+def is_included(entity1, entity2):
+    return entity1["start"] >= entity2["start"] and entity1["end"] <= entity2["end"]
+
+
+class TestResolveOverlaps(unittest.TestCase):
+
+    def test_longest_matches_legacy_implementation(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            entities = random_entities(rng, rng.randint(0, 30))
+            expected = legacy_drop_duplicates_and_included_entities(entities)
+            result = resolve_overlaps(entities)
+
+            # Same dictionaries (not only same spans) in the same order
+            self.assertEqual([id(entity) for entity in result], [id(entity) for entity in expected])
+
+    def test_kept_entities_are_not_nested(self):
+        rng = random.Random(1)
+        for strategy in ["longest", "score", "priority"]:
+            for _ in range(200):
+                entities = random_entities(rng, rng.randint(0, 30))
+                result = resolve_overlaps(entities, strategy=strategy, priority=["regex", "model-a"])
+
+                self.assertEqual(result, sorted(result, key=lambda x: x["start"]))
+                for i, entity in enumerate(result):
+                    for other in result[i + 1:]:
+                        self.assertFalse(is_included(entity, other) or is_included(other, entity))
+                # Every dropped entity is nested with a kept one
+                for entity in entities:
+                    if not any(entity is kept for kept in result):
+                        self.assertTrue(any(is_included(entity, kept) or is_included(kept, entity) for kept in result))
+
+    def test_score_strategy(self):
+        entities = [
+            {"entity_group": "ADDRESS", "score": 0.6, "start": 0, "end": 30},
+            {"entity_group": "PER", "score": 0.9, "start": 10, "end": 20},
+        ]
+        self.assertEqual(resolve_overlaps(entities, strategy="score"), [entities[1]])
+        self.assertEqual(resolve_overlaps(entities, strategy="longest"), [entities[0]])
+
+    def test_priority_strategy(self):
+        entities = [
+            {"entity_group": "ORG", "score": 1, "source": "model-a", "start": 0, "end": 30},
+            {"entity_group": "TEL", "score": 1, "source": "regex", "start": 10, "end": 20},
+        ]
+        self.assertEqual(resolve_overlaps(entities, strategy="priority", priority=["regex", "model-a"]), [entities[1]])
+
+    def test_unsupported_strategy(self):
+        with self.assertRaises(ValueError):
+            resolve_overlaps([], strategy="shortest")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import pickle
+import time
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.cache import MemoryCache
+from hexanonyme.core.detectors import PatternDetector
+from hexanonyme.core.parallel import CorpusRunner, anonymize_corpus
+from hexanonyme.core.prefilter import PIIPrefilter
+from hexanonyme.core.profiling import Profiler
+from tests.fake_pipeline import fake_registry
+
+
+class CrashingDetector(PatternDetector):
+    """
+    Detector killing its worker process on the documents containing "CRASH", and slow on the ones containing "SLOW".
+    """
+
+    def find(self, text, labels=None):
+        if "CRASH" in text:
+            os._exit(1)
+        if "SLOW" in text:
+            time.sleep(0.5)
+        return super().find(text, labels)
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.texts = [f"Jean Dupont, tel 06 12 34 {10 + i:02d} 78, mail jean{i}@exemple.fr" for i in range(50)]
+
+    def test_thread_executor_keeps_input_order(self):
+        registry = fake_registry()
+        expected = [RedactAnonymizer(registry=registry).redact(text) for text in self.texts]
+
+        runner = CorpusRunner(mode="redact", workers=4, executor="thread", shard_size=3, max_pending=2,
+                              registry=registry)
+        results = list(runner.run(iter(self.texts)))
+
+        self.assertEqual([result.index for result in results], list(range(len(self.texts))))
+        self.assertEqual([result.text for result in results], expected)
+        self.assertEqual(runner.stats.documents, len(self.texts))
+        self.assertEqual(len(results[0].log), 3)
+
+    def test_failing_document_does_not_stop_the_run(self):
+        texts = self.texts[:5] + [None] + self.texts[5:10]
+        results = list(anonymize_corpus(texts, mode="replace", workers=2, executor="thread", shard_size=4,
+                                        entities=["TEL", "MAIL"], faker=False))
+
+        self.assertEqual(len(results), len(texts))
+        self.assertIsNotNone(results[5].error)
+        self.assertTrue(all(result.error is None for i, result in enumerate(results) if i != 5))
+        self.assertEqual(results[6].text, "Jean Dupont, tel <TEL>, mail <MAIL>")
+
+    def test_process_executor(self):
+        stats = []
+        runner = CorpusRunner(mode="redact", workers=2, shard_size=8, progress=stats.append, entities=["TEL", "MAIL"])
+        results = list(runner.run(self.texts))
+
+        self.assertEqual([result.text for result in results], ["Jean Dupont, tel [REDACTED], mail [REDACTED]"] * 50)
+        self.assertEqual(stats[-1].documents, 50)
+        self.assertGreater(stats[-1].docs_per_second, 0)
+
+    def test_process_executor_with_custom_detector(self):
+        detector = PatternDetector(["MAIL"])
+        detector.register("DOSSIER", r"\bD-\d{4}\b")
+        texts = [f"Dossier D-{1000 + i} de jean{i}@exemple.fr" for i in range(6)]
+        results = list(anonymize_corpus(texts, mode="redact", workers=2, shard_size=2, entities=["DOSSIER", "MAIL"],
+                                        detector=detector, cache=MemoryCache(), profiler=Profiler(),
+                                        prefilter=PIIPrefilter(detector=detector)))
+
+        self.assertEqual([result.text for result in results], ["Dossier [REDACTED] de [REDACTED]"] * 6)
+
+    def test_crashing_document_which_is_not_the_head_shard(self):
+        texts = [f"tel 06 12 34 {10 + i:02d} 78" for i in range(12)]
+        # The head shard is still running when the third document kills the other worker
+        texts[0] = "SLOW " + texts[0]
+        texts[3] = "CRASH " + texts[3]
+        results = list(anonymize_corpus(texts, mode="redact", workers=2, shard_size=2, max_pending=4,
+                                        entities=["TEL"], detector=CrashingDetector(["TEL"])))
+
+        self.assertEqual([result.index for result in results], list(range(12)))
+        self.assertIn("died", results[3].error)
+        self.assertEqual([result.error for i, result in enumerate(results) if i != 3], [None] * 11)
+        self.assertEqual(results[1].text, "tel [REDACTED]")
+
+    def test_workers_which_cannot_start_fail_the_run(self):
+        for executor in ("process", "thread"):
+            runner = CorpusRunner(mode="redact", workers=2, executor=executor, shard_size=2, entities=["TEL"],
+                                  overlap_strategy="unknown")
+            with self.assertRaises(ValueError):
+                list(runner.run(self.texts[:6]))
+
+    def test_objects_holding_locks_can_be_pickled(self):
+        detector = PatternDetector(["MAIL"])
+        for instance in [detector, MemoryCache(), Profiler(), PIIPrefilter(detector=detector)]:
+            copy = pickle.loads(pickle.dumps(instance))
+            self.assertIsInstance(copy, type(instance))
+        self.assertEqual(pickle.loads(pickle.dumps(detector)).find("a@b.fr")[0]["entity_group"], "MAIL")
+
+    def test_arguments_which_cannot_be_pickled(self):
+        with self.assertRaises(ValueError):
+            CorpusRunner(mode="redact", registry=fake_registry())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.detectors import PatternDetector
+from hexanonyme.core.prefilter import PIIPrefilter
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "data", "prefilter_sample.jsonl")
+
+
+class RecordingPipeline(FakePipeline):
+    """
+    Fake pipeline keeping the texts it was given.
+    """
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.inputs = []
+
+    def __call__(self, inputs, **kwargs):
+        self.inputs.extend([inputs] if isinstance(inputs, str) else inputs)
+        return super().__call__(inputs, **kwargs)
+
+
+def recording_registry():
+    return ModelRegistry(loader=lambda model, task, device, **kwargs: RecordingPipeline(model))
+
+
+class TestPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        with open(SAMPLE_PATH, encoding="utf-8") as file:
+            self.sample = [json.loads(line) for line in file]
+
+    def test_recall_on_labeled_sample(self):
+        # Every sentence of the labeled French sample holding an entity must reach the models
+        prefilter = PIIPrefilter()
+        missed = [record["text"] for record in self.sample
+                  if record["entities"] and not prefilter.candidates(record["text"])]
+        self.assertEqual(missed, [])
+
+        clean = [record["text"] for record in self.sample if not record["entities"]]
+        skipped = sum(not prefilter.candidates(text) for text in clean)
+        self.assertGreaterEqual(skipped / len(clean), 0.9)
+
+    def test_candidates_are_runs_of_sentences(self):
+        text = "Bonjour. Jean Dupont a appelé. Il rappellera au 06 12 34 56 78. Merci. Votre dossier est complet."
+        prefilter = PIIPrefilter()
+        segments = prefilter.candidates(text)
+
+        self.assertEqual([text[start:end] for start, end in segments],
+                         ["Jean Dupont a appelé. Il rappellera au 06 12 34 56 78."])
+        self.assertEqual(prefilter.stats()["sentences"], 5)
+        self.assertEqual(prefilter.stats()["skipped"], 3)
+        self.assertAlmostEqual(prefilter.stats()["skip_rate"], 0.6)
+
+        prefilter.reset_stats()
+        self.assertEqual(prefilter.stats()["sentences"], 0)
+
+    def test_threshold(self):
+        text = "Jean est venu."
+        self.assertEqual(PIIPrefilter().candidates(text), [(0, len(text))])
+        self.assertEqual(PIIPrefilter(threshold=0.6).candidates(text), [])
+        self.assertEqual(PIIPrefilter(threshold=0).candidates("ok. merci."), [(0, 10)])
+
+    def test_gazetteer_and_patterns(self):
+        detector = PatternDetector()
+        detector.register("DOSSIER", r"dossier-[a-z]+")
+        prefilter = PIIPrefilter(gazetteer={"matricule"}, detector=detector)
+
+        self.assertEqual(prefilter.score("le matricule est inconnu."), 0.7)
+        self.assertEqual(prefilter.score("voir le dossier-abc."), 1.0)
+        self.assertEqual(prefilter.score("tout va bien."), 0.0)
+
+    def test_anonymizer_sends_candidate_sentences_only(self):
+        text = ("Votre demande est en cours de traitement. Nous revenons vers vous rapidement. "
+                "Jean Dupont habite à Paris. Le paiement a bien été reçu. Écrivez à contact@exemple.fr.")
+        expected = RedactAnonymizer(registry=recording_registry()).redact(text, return_result=True)
+
+        registry = recording_registry()
+        anonymizer = RedactAnonymizer(registry=registry, prefilter=True)
+        result = anonymizer.redact(text, return_result=True)
+
+        self.assertEqual(result, expected)
+        self.assertEqual(result.text, "Votre demande est en cours de traitement. Nous revenons vers vous rapidement. "
+                                      "[REDACTED] habite à [REDACTED]. Le paiement a bien été reçu. "
+                                      "Écrivez à [REDACTED].")
+        for classifier, _ in anonymizer.classifier_filtres:
+            self.assertEqual(classifier.inputs, ["Jean Dupont habite à Paris.", "Écrivez à contact@exemple.fr."])
+        self.assertAlmostEqual(anonymizer.prefilter.stats()["skip_rate"], 0.6)
+
+    def test_texts_without_candidates_skip_the_models(self):
+        registry = recording_registry()
+        anonymizer = RedactAnonymizer(registry=registry, prefilter=0.5)
+
+        results = anonymizer.redact_batch(["Merci pour votre réponse.", "ok", "appelez le 06 12 34 56 78"])
+
+        self.assertEqual(results, ["Merci pour votre réponse.", "ok", "appelez le [REDACTED]"])
+        self.assertEqual(anonymizer.classifier_filtres[0][0].inputs, ["appelez le 06 12 34 56 78"])
+        self.assertEqual(anonymizer.redact_batch(["ok"]), ["ok"])
+        self.assertIs(anonymizer.prefilter.detector, anonymizer.detector)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import re
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.profiling import Histogram, Profiler
+from hexanonyme.core.registry import ModelRegistry
+from tests.fake_pipeline import FakePipeline, fake_registry
+
+
+class TokenizingPipeline(FakePipeline):
+    """
+    Fake pipeline with a tokenizer splitting on whitespaces.
+    """
+
+    def tokenizer(self, texts):
+        return {"input_ids": [text.split() for text in texts]}
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.texts = ["Jean Dupont habite à Paris.", "Appelez Marie Curie au 06 12 34 56 78.", "Merci."]
+
+    def test_stages_and_counts_of_a_call(self):
+        profiles = []
+        profiler = Profiler(callbacks=[profiles.append])
+        anonymizer = ReplaceAnonymizer(registry=fake_registry(), profiler=profiler)
+        results = anonymizer.replace_batch(self.texts, return_result=True)
+
+        self.assertEqual(len(profiles), 1)
+        profile = profiles[0]
+        self.assertEqual(profile.name, "replace_batch")
+        self.assertEqual(set(profile.stages), {"inference", "merge", "regex", "resolve", "rewrite", "faker"}
+                         | {f"model {model}" for model in anonymizer.plan.models})
+        self.assertEqual(profile.counts["texts"], 3)
+        self.assertEqual(profile.counts["characters"], sum(len(text) for text in self.texts))
+        self.assertEqual(profile.counts["entities"], sum(len(result.log) for result in results))
+        self.assertGreaterEqual(profile.duration, profile.stages["inference"])
+        self.assertGreaterEqual(profile.stages["rewrite"], profile.stages["faker"])
+        self.assertIsNone(profile.peak_memory)
+
+        self.assertEqual(profiler.calls["replace_batch"].count, 1)
+        self.assertEqual(profiler.stages["regex"].count, 1)
+        self.assertEqual(profiler.counts[("replace_batch", "entities")].sum, profile.counts["entities"])
+
+    def test_same_results_without_profiler(self):
+        registry = fake_registry()
+        expected = RedactAnonymizer(registry=registry).redact_batch(self.texts, return_result=True)
+        profiled = RedactAnonymizer(registry=registry, profiler=Profiler())
+
+        self.assertEqual(profiled.redact_batch(self.texts, return_result=True), expected)
+        self.assertEqual([profiled.redact(text) for text in self.texts], [result.text for result in expected])
+        self.assertEqual(profiled.profiler.calls["redact"].count, 3)
+
+    def test_tokens_and_memory(self):
+        registry = ModelRegistry(loader=lambda model, task, device, **kwargs: TokenizingPipeline(model))
+        profiles = []
+        profiler = Profiler(callbacks=[profiles.append], track_memory=True)
+        anonymizer = RedactAnonymizer(registry=registry, profiler=profiler, concurrent_models=True)
+        anonymizer.redact(self.texts[0])
+
+        self.assertEqual(profiles[0].counts["tokens"], 5)
+        self.assertGreater(profiles[0].peak_memory, 0)
+        # The models ran on the thread pool, their stages belong to the call
+        self.assertIn(f"model {anonymizer.plan.models[0]}", profiles[0].stages)
+        self.assertEqual(profiler.memory["redact"].count, 1)
+
+        profiler.reset()
+        self.assertEqual(profiler.summary(), {"calls": {}, "stages": {}, "counts": {}, "memory": {}})
+
+    def test_streams_are_one_call(self):
+        profiles = []
+        profiler = Profiler(callbacks=[profiles.append])
+        text = " ".join(self.texts * 20)
+        for anonymizer, stream in [(RedactAnonymizer(registry=fake_registry(), profiler=profiler), "redact_stream"),
+                                   (ReplaceAnonymizer(registry=fake_registry(), profiler=profiler), "replace_stream")]:
+            "".join(getattr(anonymizer, stream)(text, window_size=200, overlap=20))
+
+            self.assertEqual(profiles[-1].name, stream)
+            self.assertEqual(profiles[-1].counts["characters"], len(text))
+            self.assertGreater(profiles[-1].counts["entities"], 20)
+            self.assertEqual(profiler.calls[stream].count, 1)
+        # The stages of every window are observed once per stream
+        self.assertEqual(profiler.stages["inference"].count, 2)
+
+    def test_prometheus_format(self):
+        profiler = Profiler()
+        anonymizer = RedactAnonymizer(registry=fake_registry(), profiler=profiler)
+        for text in self.texts:
+            anonymizer.redact(text)
+        metrics = profiler.to_prometheus()
+
+        self.assertIn("# TYPE hexanonyme_call_seconds histogram", metrics)
+        self.assertIn('hexanonyme_call_seconds_count{method="redact"} 3', metrics)
+        self.assertIn('hexanonyme_stage_seconds_bucket{stage="regex",le="+Inf"} 3', metrics)
+        self.assertIn('hexanonyme_call_items_count{method="redact",item="entities"} 3', metrics)
+        line = re.compile(r'(# (HELP|TYPE) .+|[a-z_]+\{[^}]*\} [0-9.e+-]+)')
+        self.assertTrue(all(line.fullmatch(row) for row in metrics.splitlines()))
+        self.assertEqual(Profiler().to_prometheus(), "")
+
+    def test_histogram(self):
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative_counts(), [(1, 2), (5, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.mean, 3.625)
+
+
+if __name__ == '__main__':
+    unittest.main()
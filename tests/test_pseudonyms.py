@@ -0,0 +1,108 @@
+import itertools
+import os
+import tempfile
+import time
+import unittest
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.pseudonyms import FakerPool, PseudonymMap
+from tests.fake_pipeline import fake_registry
+
+TEXT = "Jean Dupont a appelé Marie Curie. Jean Dupont rappellera Marie Curie demain, Jean Dupont est à Paris."
+
+
+class TestFakerPool(unittest.TestCase):
+
+    def test_values_are_generated_in_bulk(self):
+        counter = itertools.count()
+        pool = FakerPool({"PER": lambda: f"name{next(counter)}"}, pool_size=10, background=False)
+        values = [pool.take("PER") for _ in range(25)]
+        self.assertEqual(values, [f"name{i}" for i in range(25)])
+        self.assertEqual(next(counter), 30)
+
+    def test_background_refill(self):
+        counter = itertools.count()
+        pool = FakerPool({"PER": lambda: f"name{next(counter)}"}, pool_size=8, refill_threshold=0.5)
+        pool.prefill()
+        values = [pool.take("PER") for _ in range(5)]
+        deadline = time.monotonic() + 5
+        while len(pool) < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), 11)
+        self.assertEqual(len(set(values + [pool.take("PER") for _ in range(11)])), 16)
+
+
+class TestPseudonymMap(unittest.TestCase):
+
+    def test_consistent_and_unique(self):
+        pseudonyms = PseudonymMap()
+        values = iter(["Paul", "Paul", "Luc"])
+        self.assertEqual(pseudonyms.get("PER", "Jean", lambda: next(values)), "Paul")
+        self.assertEqual(pseudonyms.get("PER", "Jean", lambda: next(values)), "Paul")
+        self.assertEqual(pseudonyms.get("PER", "Marie", lambda: next(values)), "Luc")
+
+    def test_constant_generator(self):
+        pseudonyms = PseudonymMap()
+        values = [pseudonyms.get("PER", original, lambda: "Paul") for original in ["Jean", "Marie", "Luc", "Paul"]]
+        self.assertEqual(values, ["Paul", "Paul 2", "Paul 3", "Paul 4"])
+        self.assertEqual(pseudonyms.get("PER", "Marie", lambda: "Paul"), "Paul 2")
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pseudonyms.db")
+            pseudonyms = PseudonymMap(path)
+            pseudonyms.get("PER", "Jean", lambda: "Paul")
+            pseudonyms.close()
+
+            pseudonyms = PseudonymMap(path)
+            self.assertEqual(pseudonyms.get("PER", "Jean", lambda: "Luc"), "Paul")
+            pseudonyms.close()
+
+
+class TestReplaceAnonymizerPseudonyms(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = fake_registry()
+
+    def replacements(self, result):
+        return {entry.original: entry.replacement for entry in result.log}, len(set(entry.replacement
+                                                                                    for entry in result.log))
+
+    def test_document_scope(self):
+        anonymizer = ReplaceAnonymizer(registry=self.registry, pseudonym_scope="document", faker_pool_size=16)
+        result = anonymizer.replace(TEXT, return_result=True)
+        mapping, distinct = self.replacements(result)
+        self.assertEqual(len(result.log), 6)
+        self.assertEqual(distinct, 3)
+        self.assertEqual(result.text.count(mapping["Jean Dupont"]), 3)
+        self.assertEqual(anonymizer.deanonymize(result.text, result), TEXT)
+
+        other = anonymizer.replace(TEXT, return_result=True)
+        self.assertNotEqual(self.replacements(other)[0], mapping)
+
+    def test_batch_scope(self):
+        anonymizer = ReplaceAnonymizer(registry=self.registry, pseudonym_scope="batch")
+        first, second = anonymizer.replace_batch(["Jean Dupont est là.", "Jean Dupont est parti."], return_result=True)
+        self.assertEqual(first.log[0].replacement, second.log[0].replacement)
+
+        anonymizer = ReplaceAnonymizer(registry=self.registry, pseudonym_scope="document")
+        first, second = anonymizer.replace_batch(["Jean Dupont est là.", "Jean Dupont est parti."], return_result=True)
+        self.assertNotEqual(first.log[0].replacement, second.log[0].replacement)
+
+    def test_persistent_global_scope(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pseudonyms.db")
+            anonymizer = ReplaceAnonymizer(registry=self.registry, pseudonyms=path)
+            first = anonymizer.replace("Bonjour Jean Dupont.")
+            anonymizer.pseudonyms.close()
+
+            anonymizer = ReplaceAnonymizer(registry=self.registry, pseudonyms=path, faker_pool_size=4)
+            self.assertEqual(anonymizer.replace("Bonjour Jean Dupont."), first)
+            anonymizer.pseudonyms.close()
+
+    def test_unsupported_scope(self):
+        with self.assertRaises(ValueError):
+            ReplaceAnonymizer(registry=self.registry, pseudonym_scope="session")
+
+
+if __name__ == '__main__':
+    unittest.main()
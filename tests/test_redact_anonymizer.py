@@ -12,6 +12,17 @@ class TestRedactAnonymizer(unittest.TestCase):
         redacted_text = self.redact_anonymizer.redact(input_text)
         self.assertEqual(redacted_text, expected_output)
 
+    def test_redact_batch_matches_redact(self):
+        texts = ["Mon nom est Jean Dupont. J'habite au 123 rue de la Ville, Paris.", "Merci.", "Je suis Marie Curie."]
+        expected_texts, expected_logs = [], []
+        for text in texts:
+            expected_texts.append(self.redact_anonymizer.redact(text))
+            expected_logs.append(self.redact_anonymizer.log_redactions)
+
+        for batch_size in [1, 2, 8]:
+            self.assertEqual(self.redact_anonymizer.redact_batch(texts, batch_size=batch_size), expected_texts)
+            self.assertEqual(self.redact_anonymizer.log_redactions_batch, expected_logs)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -51,5 +51,18 @@ class TestReplaceAnonymizer(unittest.TestCase):
         self.assertNotEqual(text, anonymized_text)
         self.assertTrue(anonymized_text.startswith("<PER> habite à <LOC>."))
 
+    def test_replace_batch_matches_replace(self):
+        anonymizer = ReplaceAnonymizer(entities=["PER", "LOC"], faker=False)
+
+        texts = ["John Doe habite à Paris.", "Bonjour.", "Je m'appelle Marie Curie et je vis à Lyon."]
+        expected_texts, expected_logs = [], []
+        for text in texts:
+            expected_texts.append(anonymizer.replace(text))
+            expected_logs.append(anonymizer.log_replacements)
+
+        for batch_size in [1, 2, 8]:
+            self.assertEqual(anonymizer.replace_batch(texts, batch_size=batch_size), expected_texts)
+            self.assertEqual(anonymizer.log_replacements_batch, expected_logs)
+
 if __name__ == '__main__':
     unittest.main()
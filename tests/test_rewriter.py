@@ -0,0 +1,88 @@
+import time
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.rewriter import entity_bounds, repeated_spans, rewrite_spans
+from tests.fake_pipeline import fake_registry
+
+
+class TestRewriter(unittest.TestCase):
+
+    def test_rewrite_spans(self):
+        text = "Appelez Jean au +33 (0)1 23 45 67 89."
+        spans = [(16, 36, "<TEL>"), (8, 12, "<PER>")]
+        rewritten_text, output_offsets = rewrite_spans(text, spans)
+
+        self.assertEqual(rewritten_text, "Appelez <PER> au <TEL>.")
+        self.assertEqual(output_offsets, [(17, 22), (8, 13)])
+
+    def test_only_detected_occurrences_are_rewritten(self):
+        text = "a.b@c.fr et aXb@c.fr"
+        rewritten_text, _ = rewrite_spans(text, [(0, 8, "<MAIL>")])
+
+        self.assertEqual(rewritten_text, "<MAIL> et aXb@c.fr")
+
+    def test_overlapping_span_is_left_out(self):
+        text = "Jean Dupont Paris"
+        rewritten_text, output_offsets = rewrite_spans(text, [(0, 11, "<PER>"), (5, 17, "<LOC>")])
+
+        self.assertEqual(rewritten_text, "<PER> Paris")
+        self.assertEqual(output_offsets, [(0, 5), None])
+
+    def test_repeated_spans(self):
+        text = "Jean Dupont et M. Dupont, Dupontel. a.b et aXb, a.bc Dupont"
+        spans = [(18, 24, "<PER>"), (0, 11, "<PER>"), (36, 39, "<X>")]
+
+        self.assertEqual(repeated_spans(text, spans), [(len(text) - 6, len(text), 0)])
+        self.assertEqual(repeated_spans(text, []), [])
+
+    def test_repeated_spans_match_whole_words(self):
+        text = "Jean a vu Jeanne et Jean."
+        anonymizer = RedactAnonymizer(["PER"], registry=fake_registry())
+        redacted_text, log = anonymizer._redact_text(text, [{"entity_group": "PER", "word": "Jean", "start": 0,
+                                                             "end": 4}])
+
+        self.assertEqual(redacted_text, "[REDACTED] a vu Jeanne et [REDACTED].")
+        self.assertEqual([entry.original for entry in log], ["Jean", "Jean"])
+
+    def test_repeated_spans_scale_linearly(self):
+        # Thousands of distinct lowercase values, each detected once and repeated once, on about a megabyte
+        values = [f"client{i}" for i in range(8000)] + [f"user{i}@exemple.fr" for i in range(8000)]
+        detected = " ".join(values)
+        text = detected + " " + " ".join(values[::-1]) + " du texte sans valeur." * 25000
+        spans = []
+        position = 0
+        for value in values:
+            spans.append((position, position + len(value), "<X>"))
+            position += len(value) + 1
+
+        start = time.perf_counter()
+        repeats = repeated_spans(text, spans)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(repeats), len(values))
+        self.assertEqual(text[repeats[0][0]:repeats[0][1]], values[-1])
+        self.assertLess(elapsed, 5)
+
+    def test_repeated_name_is_rewritten(self):
+        # Only the first occurrence is detected, as a model may miss a name out of context
+        text = "M. Dupont a appelé. Dupont rappellera."
+        entities = [{"entity_group": "PER", "score": 0.9, "word": "Dupont", "start": 3, "end": 9}]
+
+        anonymizer = RedactAnonymizer(["PER"], registry=fake_registry())
+        redacted_text, log = anonymizer._redact_text(text, entities)
+        self.assertEqual(redacted_text, "M. [REDACTED] a appelé. [REDACTED] rappellera.")
+        self.assertEqual([(entry.start, entry.end) for entry in log], [(3, 9), (20, 26)])
+
+        anonymizer = ReplaceAnonymizer(["PER"], faker=False, registry=fake_registry())
+        replaced_text, log = anonymizer._replace_text(text, entities)
+        self.assertEqual(replaced_text, "M. <PER> a appelé. <PER> rappellera.")
+        self.assertEqual(len(log), 2)
+
+    def test_entity_bounds_strip_whitespaces(self):
+        text = "Bonjour Jean Dupont ."
+        self.assertEqual(entity_bounds(text, {"start": 7, "end": 20}), (8, 19))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import random
+import unittest
+from hexanonyme.core.overlap import COLUMNAR_MIN_ENTITIES, _resolve_longest, resolve_overlaps
+from hexanonyme.core.spans import SpanTable
+
+LABELS = ["PER", "LOC", "ORG", "DATE"]
+
+
+def make_entities(count, seed=0):
+    # Entities of one model: some are adjacent, some are nested or duplicated
+    rng = random.Random(seed)
+    entities = []
+    position = 0
+    for _ in range(count):
+        position += rng.choice([0, 0, 1, 5, -3])
+        position = max(position, 0)
+        length = rng.randint(1, 8)
+        entities.append({"entity_group": rng.choice(LABELS), "score": rng.random(), "word": "x" * length,
+                         "start": position, "end": position + length, "index": len(entities)})
+        position += length
+    return entities
+
+
+class TestSpanTable(unittest.TestCase):
+
+    def test_resolve_longest(self):
+        for count in (0, 1, 2, 50, COLUMNAR_MIN_ENTITIES * 4):
+            entities = make_entities(count, seed=count) + make_entities(count, seed=count + 1)
+            expected = _resolve_longest(entities)
+
+            self.assertEqual(SpanTable.from_entities(entities).resolve_longest().to_entities(), expected)
+            self.assertEqual(resolve_overlaps(entities), expected)
+            self.assertTrue(all(entity is other for entity, other in zip(resolve_overlaps(entities), expected)))
+
+
+if __name__ == '__main__':
+    unittest.main()
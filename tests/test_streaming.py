@@ -0,0 +1,63 @@
+import io
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.streaming import iter_chunks
+from tests.fake_pipeline import fake_registry
+
+
+def make_text(n):
+    sentences = []
+    for i in range(n):
+        sentences.append(f"Jean Dupont a appelé le 06 {10 + i // 90:02d} {10 + i % 90:02d} 56 78. ")
+        sentences.append(f"Écrire à marie.{i}@example.fr depuis Paris.\n")
+        sentences.append("Le dossier est clos. " * (i % 3))
+    return "".join(sentences)
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = fake_registry()
+        self.text = make_text(150)
+
+    def test_iter_chunks(self):
+        self.assertEqual(list(iter_chunks("abcdefg", chunk_size=3)), ["abc", "def", "g"])
+        self.assertEqual(list(iter_chunks(io.StringIO("abcdefg"), chunk_size=3)), ["abc", "def", "g"])
+        self.assertEqual(list(iter_chunks(["abcd", "ef"], chunk_size=3)), ["abc", "d", "ef"])
+
+    def test_redact_stream_matches_redact(self):
+        anonymizer = RedactAnonymizer(registry=self.registry)
+        expected_text = anonymizer.redact(self.text)
+        expected_log = anonymizer.log_redactions
+
+        for window_size, overlap in [(97, 10), (300, 60), (2000, 200)]:
+            redacted_text = "".join(anonymizer.redact_stream(io.StringIO(self.text), window_size=window_size,
+                                                             overlap=overlap))
+            self.assertEqual(redacted_text, expected_text)
+            self.assertEqual(anonymizer.log_redactions, expected_log)
+
+    def test_replace_stream_matches_replace(self):
+        anonymizer = ReplaceAnonymizer(faker=False, registry=self.registry)
+        expected_text = anonymizer.replace(self.text)
+        expected_log = anonymizer.log_replacements
+
+        chunks = [self.text[i:i + 1000] for i in range(0, len(self.text), 1000)]
+        anonymized_text = "".join(anonymizer.replace_stream(iter(chunks), window_size=300, overlap=60))
+        self.assertEqual(anonymized_text, expected_text)
+        self.assertEqual(anonymizer.log_replacements, expected_log)
+
+    def test_stream_yields_incrementally(self):
+        anonymizer = RedactAnonymizer(registry=self.registry)
+        pieces = list(anonymizer.redact_stream(self.text, window_size=300, overlap=60))
+
+        self.assertGreater(len(pieces), len(self.text) // 300)
+        self.assertTrue(all(len(piece) <= 300 + len("[REDACTED]") * 20 for piece in pieces))
+
+    def test_empty_stream(self):
+        anonymizer = RedactAnonymizer(registry=self.registry)
+        self.assertEqual(list(anonymizer.redact_stream(io.StringIO(""))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import random
+import threading
+import unittest
+from hexanonyme.core.anonymizer.redact_anonymizer import RedactAnonymizer
+from hexanonyme.core.anonymizer.replace_anonymizer import ReplaceAnonymizer
+from hexanonyme.core.result import AnonymizationResult
+from tests.fake_pipeline import GAZETTEER, fake_registry
+
+THREADS = 16
+DOCUMENTS_PER_THREAD = 50
+
+
+def make_text(rng):
+    names = [word for words in GAZETTEER.values() for word in words]
+    phone = "06 " + " ".join(f"{rng.randrange(100):02d}" for _ in range(4))
+    parts = [f"{rng.choice(names)} a écrit à {rng.choice(names)}.",
+             f"Rappelez le {phone}",
+             f"ou écrivez à contact{rng.randrange(1000)}@example.fr.\n\n",
+             f"Bien  à vous, {rng.choice(names)}"]
+    return " ".join(rng.sample(parts, rng.randint(1, len(parts))))
+
+
+class TestThreadSafety(unittest.TestCase):
+
+    def run_threads(self, anonymize, deanonymize):
+        failures = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(DOCUMENTS_PER_THREAD):
+                text = make_text(rng)
+                result = anonymize(text)
+                try:
+                    self.assertIsInstance(result, AnonymizationResult)
+                    self.assertEqual(deanonymize(result.text, result), text)
+                    for entry in result.log:
+                        self.assertEqual(text[entry.start:entry.end], entry.original)
+                        self.assertEqual(result.text[entry.output_start:entry.output_end], entry.replacement)
+                except AssertionError as error:
+                    failures.append(error)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_replace_round_trip(self):
+        anonymizer = ReplaceAnonymizer(registry=fake_registry())
+        self.run_threads(lambda text: anonymizer.replace(text, return_result=True), anonymizer.deanonymize)
+        self.assertEqual(anonymizer.log_replacements, [])
+
+    def test_redact_round_trip(self):
+        anonymizer = RedactAnonymizer(registry=fake_registry(), concurrent_models=True)
+        self.run_threads(lambda text: anonymizer.redact(text, return_result=True), anonymizer.deanonymize)
+
+    def test_batches_round_trip(self):
+        anonymizer = ReplaceAnonymizer(faker=False, registry=fake_registry())
+        rng = random.Random(0)
+        texts = [make_text(rng) for _ in range(20)]
+        results = anonymizer.replace_batch(texts, return_result=True)
+        self.assertEqual([anonymizer.deanonymize(result.text, result.log) for result in results], texts)
+
+    def test_legacy_logs(self):
+        anonymizer = RedactAnonymizer(registry=fake_registry())
+        text = "Jean Dupont  habite à Paris.\nMerci."
+        redacted = anonymizer.redact(text)
+        self.assertEqual(anonymizer.log_redactions[0], {"entity_group": "PER", "word": "Jean Dupont", "start": 0,
+                                                        "end": 11})
+        self.assertEqual(anonymizer.deanonymize(redacted), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import torch
+from transformers import CamembertConfig, CamembertForTokenClassification, PreTrainedTokenizerFast, pipeline
+
+WORDS = ("bonjour je m'appelle jean dupont et j'habite au 10 rue victor hugo à paris lyon marie curie travaille chez "
+         "renault depuis le 3 janvier 2023 merci de rappeler , .").split()
+LABELS = ["O", "B-PER", "I-PER", "B-LOC", "I-LOC", "B-ORG", "I-ORG", "B-DATE", "I-DATE"]
+
+
+def tiny_tokenizer(model_max_length=128):
+    """
+    Build a small fast tokenizer with the special tokens of CamemBERT, without any download.
+
+    Returns:
+        PreTrainedTokenizerFast: The tokenizer.
+    """
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+
+    special_tokens = ["<s>", "</s>", "<pad>", "<unk>"]
+    vocab = {token: i for i, token in enumerate(special_tokens + sorted(set(WORDS)))}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(single="<s> $A </s>",
+                                                             special_tokens=[("<s>", 0), ("</s>", 1)])
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", pad_token="<pad>",
+                                   unk_token="<unk>", cls_token="<s>", sep_token="</s>",
+                                   model_max_length=model_max_length)
+
+
+def tiny_model(seed, encoder=None):
+    """
+    Build a small randomly initialised CamemBERT token classification model.
+
+    Args:
+        seed (int): Seed of the weights.
+        encoder (PreTrainedModel): If given, the encoder weights are copied from this model, only the head differs.
+
+    Returns:
+        CamembertForTokenClassification: The model, in evaluation mode.
+    """
+    config = CamembertConfig(vocab_size=len(set(WORDS)) + 4, hidden_size=32, num_hidden_layers=2,
+                             num_attention_heads=2, intermediate_size=64, max_position_embeddings=140,
+                             pad_token_id=2, num_labels=len(LABELS), id2label=dict(enumerate(LABELS)),
+                             label2id={label: i for i, label in enumerate(LABELS)})
+    torch.manual_seed(seed)
+    model = CamembertForTokenClassification(config).eval()
+    if encoder is not None:
+        model.base_model.load_state_dict(encoder.base_model.state_dict())
+    return model
+
+
+def tiny_pipeline(model, tokenizer=None):
+    """
+    Build a token classification pipeline of a tiny model, as loaded by the registry.
+
+    Returns:
+        TokenClassificationPipeline: The pipeline.
+    """
+    return pipeline("token-classification", model=model, tokenizer=tokenizer or tiny_tokenizer(),
+                    aggregation_strategy="simple")